@@ -0,0 +1,150 @@
+"""
+Бенчмарк балансировки между репликами MCP сервера (mcp_balancer).
+
+Поднимаются --replicas серверов-заглушек; последняя реплика медленная
+(--slow-latency вместо --latency). Клиент в --threads потоках вызывает
+get_process():
+- "round_robin" — по очереди, без учета нагрузки;
+- "least_outstanding" и "ewma" — с учетом нагрузки и задержки реплик.
+Для каждого режима выводятся запросов/сек, p50/p99 и доля запросов по репликам.
+
+Затем проверяется отказ: посреди прогона вторая реплика начинает отвечать
+503 на все запросы, а позже восстанавливается. Выводится, сколько вызовов
+получили ошибку, когда реплика была исключена и когда вернулась
+(по активной проверке ping).
+
+Запуск:
+python benchmarks/bench_balancer.py [--requests 2000] [--threads 8] [--replicas 3]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client import MCPClient  # noqa: E402
+from mcp_fake_server import FakeMCPServer  # noqa: E402
+from mcp_metrics import MetricsRegistry  # noqa: E402
+
+PROCESSES = 100
+ROUTE = ('GET', '/processes/{id}/')
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def make_client(urls, threads, **balancer):
+    client = MCPClient(urls=urls, headers={}, pool_size=threads * 2, connect_timeout=1, read_timeout=5,
+                       metrics=MetricsRegistry(enabled=False), latency_policy=False, singleflight=False)
+    if client.balancer is not None and balancer:
+        for name, value in balancer.items():
+            setattr(client.balancer, name, value)
+    return client
+
+def call_many(client, total, threads, on_call=None):
+    """Вызывает get_process() total раз; возвращает задержки, число ошибок и время."""
+    errors = 0
+
+    def call(number):
+        nonlocal errors
+        if on_call is not None:
+            on_call(number)
+        started = time.perf_counter()
+        try:
+            if client.get_process(number % PROCESSES + 1) is None:
+                errors += 1
+        except Exception:
+            errors += 1
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(call, range(total)))
+    return latencies, errors, time.perf_counter() - started
+
+def run_strategies(servers, total, threads):
+    urls = [server.url for server in servers]
+    print(f"  {'режим':20s} {'запросов/с':>10s} {'p50, мс':>8s} {'p99, мс':>8s} {'ошибок':>7s}  доли реплик")
+    for strategy in ('round_robin', 'least_outstanding', 'ewma'):
+        client = make_client(urls, threads, strategy=strategy)
+        for server in servers:
+            server.requests.clear()
+        latencies, errors, elapsed = call_many(client, total, threads)
+        client.close()
+        shares = ' '.join(f"{server.requests[ROUTE] / total:5.1%}" for server in servers)
+        print(f"  {strategy:20s} {total / elapsed:10.0f} {percentile(latencies, 0.5) * 1000:8.1f} "
+              f"{percentile(latencies, 0.99) * 1000:8.1f} {errors:7d}  {shares}")
+
+def run_failover(servers, total, threads):
+    urls = [server.url for server in servers]
+    client = make_client(urls, threads, eject_after=3, eject_time=30.0, probe_interval=0.2)
+    broken = servers[1]
+    events = []
+    lock = threading.Lock()
+
+    def on_call(number):
+        # Реплика ломается на первой трети прогона и чинится на второй
+        with lock:
+            if number == total // 3:
+                broken.error_rate = 1.0
+                events.append((time.perf_counter(), "реплика 2 отвечает 503"))
+            elif number == 2 * total // 3:
+                broken.error_rate = 0.0
+                events.append((time.perf_counter(), "реплика 2 восстановлена"))
+
+    watcher_stop = threading.Event()
+    started = time.perf_counter()
+
+    def watch():
+        # Фиксирует моменты исключения и возвращения реплики
+        ejected = False
+        while not watcher_stop.is_set():
+            state = client.balancer.endpoints[1].ejected()
+            if state != ejected:
+                ejected = state
+                events.append((time.perf_counter(), "реплика 2 исключена" if state else "реплика 2 возвращена"))
+            time.sleep(0.005)
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    latencies, errors, elapsed = call_many(client, total, threads, on_call)
+    time.sleep(0.5)
+    watcher_stop.set()
+    watcher.join()
+    for moment, event in sorted(events):
+        print(f"  {(moment - started) * 1000:8.1f} мс  {event}")
+    print(f"  ошибок: {errors} из {total}, p99 {percentile(latencies, 0.99) * 1000:.1f} мс")
+    for endpoint in client.balancer.stats():
+        print(f"    {endpoint}")
+    client.close()
+
+def run(total, threads, replicas, latency, slow_latency):
+    servers = []
+    for number in range(replicas):
+        slow = number == replicas - 1 and replicas > 1
+        servers.append(FakeMCPServer(processes=PROCESSES, latency=slow_latency if slow else latency,
+                                     seed=number).start())
+    try:
+        print(f"Реплик: {replicas} (последняя отвечает за {slow_latency * 1000:.0f} мс, остальные за "
+              f"{latency * 1000:.0f} мс), вызовов: {total}, потоков: {threads}")
+        run_strategies(servers, total, threads)
+        for server in servers:
+            server.latency = latency
+        print("Отказ и восстановление реплики 2 (eject_after=3, probe_interval=0.2 с)")
+        run_failover(servers, total, threads)
+    finally:
+        for server in servers:
+            server.stop()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--replicas', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--slow-latency', type=float, default=0.2)
+    args = parser.parse_args()
+    run(args.requests, args.threads, args.replicas, args.latency, args.slow_latency)
@@ -0,0 +1,65 @@
+"""
+Бенчмарк поиска в каталоге бизнес-процессов.
+
+Сравнивает поиск процесса по ID задачи и процессов по ID типа документа:
+- перебором вложенных списков tasks / document_types (как без индексов);
+- через индексы ProcessCatalog.
+
+Запуск:
+python benchmarks/bench_catalog.py [--processes 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_catalog import ProcessCatalog  # noqa: E402
+from mcp_fake_server import make_process, make_processes  # noqa: E402
+
+def scan_process_for_task(processes, task_id):
+    for process in processes:
+        for task in process['tasks']:
+            if task['id'] == task_id:
+                return process
+    return None
+
+def scan_processes_for_document_type(processes, doc_type_id):
+    return [process for process in processes
+            if any(doc_type['id'] == doc_type_id for doc_type in process['document_types'])]
+
+def per_call_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+def run(count):
+    processes = make_processes(count)
+    started = time.perf_counter()
+    catalog = ProcessCatalog(processes)
+    print(f"Процессов: {count}, построение индексов: {time.perf_counter() - started:.3f} с")
+
+    # Ищем элементы из середины каталога
+    middle = processes[count // 2]
+    task_id = middle['tasks'][-1]['id']
+    doc_type_id = middle['document_types'][-1]['id']
+
+    cases = [
+        ("процесс по ID задачи, перебор", lambda: scan_process_for_task(processes, task_id), 20),
+        ("процесс по ID задачи, индекс", lambda: catalog.process_for_task(task_id), 100000),
+        ("процессы по типу документа, перебор",
+         lambda: scan_processes_for_document_type(processes, doc_type_id), 5),
+        ("процессы по типу документа, индекс",
+         lambda: catalog.processes_for_document_type(doc_type_id), 100000),
+        ("процесс по ID, индекс", lambda: catalog.get(middle['id']), 100000),
+        ("обновление одного процесса (upsert)", lambda: catalog.upsert(make_process(middle['id'])), 10000),
+    ]
+    for name, func, number in cases:
+        print(f"  {name:40s} {per_call_us(func, number):12.2f} мкс")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=10000)
+    args = parser.parse_args()
+    run(args.processes)
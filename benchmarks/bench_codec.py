@@ -0,0 +1,128 @@
+"""
+Бенчмарк сжатия ответов и разбора JSON (mcp_codec).
+
+Сервер-заглушка отдает большой каталог /processes/ в разных представлениях
+(без сжатия, gzip, deflate, а также br и MessagePack, если установлены
+brotli и msgpack). Для каждого выводятся:
+- байты на проводе и доля от несжатого JSON;
+- время распаковки и разбора тела стандартным json и orjson (лучшее из --repeat);
+- полное время MCPClient.iter_processes() (запрос, распаковка, разбор).
+
+Запуск:
+python benchmarks/bench_codec.py [--processes 5000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import gzip
+import os
+import sys
+import time
+import zlib
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mcp_codec  # noqa: E402
+from mcp_client import MCPClient  # noqa: E402
+from mcp_fake_server import FakeMCPServer  # noqa: E402
+from mcp_metrics import MetricsRegistry  # noqa: E402
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        # Мусор предыдущего прогона не должен собираться во время замера
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def decompressor(encoding):
+    if encoding == 'gzip':
+        return gzip.decompress
+    if encoding == 'deflate':
+        return zlib.decompress
+    if encoding == 'br':
+        import brotli
+        return brotli.decompress
+    return lambda body: body
+
+def representations():
+    modes = [("json", 'application/json', 'identity'),
+             ("json + gzip", 'application/json', 'gzip'),
+             ("json + deflate", 'application/json', 'deflate')]
+    if mcp_codec.BROTLI_AVAILABLE:
+        modes.append(("json + br", 'application/json', 'br'))
+    if mcp_codec.msgpack is not None:
+        modes.append(("msgpack", 'application/msgpack', 'identity'))
+        modes.append(("msgpack + gzip", 'application/msgpack', 'gzip'))
+    return modes
+
+def run_wire(server, repeat):
+    url = f"{server.url}/processes/"
+    plain = None
+    backends = [name for name in mcp_codec.JSON_BACKENDS if name != 'orjson' or mcp_codec.orjson is not None]
+    print(f"  {'представление':16s} {'на проводе, КБ':>15s} {'доля':>6s} "
+          + ' '.join(f"{'разбор ' + name + ', мс':>18s}" for name in backends))
+    for name, accept, encoding in representations():
+        response = requests.get(url, headers={'Accept': accept, 'Accept-Encoding': encoding}, stream=True)
+        wire = response.raw.read(decode_content=False)
+        content_type = response.headers.get('Content-Type')
+        response.close()
+        if plain is None:
+            plain = len(wire)
+        decompress = decompressor(response.headers.get('Content-Encoding'))
+        timings = []
+        for backend in backends:
+            mcp_codec.set_json_backend(backend)
+            timings.append(best_of(repeat, lambda: mcp_codec.decode(decompress(wire), content_type)))
+        print(f"  {name:16s} {len(wire) / 1024:15.1f} {len(wire) / plain:6.1%} "
+              + ' '.join(f"{elapsed * 1000:18.1f}" for elapsed in timings))
+    mcp_codec.set_json_backend('auto')
+
+def run_client(server, repeat, page_size):
+    print(f"  {'клиент':32s} {'время, мс':>10s} {'на проводе, КБ':>15s}")
+    modes = [("без сжатия, json", False, False, 'json'),
+             ("gzip, json", True, False, 'json')]
+    if mcp_codec.orjson is not None:
+        modes.append(("gzip, orjson", True, False, 'orjson'))
+    if mcp_codec.msgpack is not None:
+        modes.append(("gzip, msgpack", True, True, 'auto'))
+    for name, compression, use_msgpack, backend in modes:
+        mcp_codec.set_json_backend(backend)
+        metrics = MetricsRegistry()
+        client = MCPClient(base_url=server.url, headers={}, pool_size=2, connect_timeout=3, read_timeout=30,
+                           metrics=metrics, latency_policy=False, compression=compression, msgpack=use_msgpack)
+        count = 0
+
+        def fetch():
+            nonlocal count
+            count = sum(1 for _ in client.iter_processes(page_size=page_size))
+        elapsed = best_of(repeat, fetch)
+        wire = sum(endpoint['bytes'] for endpoint in metrics.to_dict()['endpoints']) / repeat
+        client.close()
+        print(f"  {name:32s} {elapsed * 1000:10.1f} {wire / 1024:15.1f}")
+    mcp_codec.set_json_backend('auto')
+
+def run(processes, repeat):
+    print(f"orjson: {'да' if mcp_codec.orjson is not None else 'нет'}, "
+          f"brotli: {'да' if mcp_codec.BROTLI_AVAILABLE else 'нет'}, "
+          f"msgpack: {'да' if mcp_codec.msgpack is not None else 'нет'}")
+    with FakeMCPServer(processes=processes, tasks=5, document_types=3, fields=4,
+                       compress=True, msgpack=True) as server:
+        print(f"Каталог из {processes} процессов (JSON массив)")
+        run_wire(server, repeat)
+        print("Потоковое чтение каталога (JSON массив)")
+        run_client(server, repeat, None)
+        print("Постраничное чтение каталога (page_size=500)")
+        run_client(server, repeat, 500)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.processes, args.repeat)
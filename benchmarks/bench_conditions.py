@@ -0,0 +1,98 @@
+"""
+Бенчмарк срабатывания условий запуска задач.
+
+Для каталогов разного размера с цепочками условий "задача N+1 запускается
+после завершения задачи N" и тысяч запущенных экземпляров процессов
+сравнивает время обработки одного события "задача завершена":
+- интерпретация: перебор всех условий и поиск задач по названию;
+- StartConditionIndex: скомпилированные предикаты и обратный индекс.
+
+Запуск:
+python benchmarks/bench_conditions.py [--instances 5000] [--events 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_catalog import ProcessCatalog  # noqa: E402
+from mcp_conditions import StartConditionIndex  # noqa: E402
+from mcp_fake_server import make_processes  # noqa: E402
+
+TASKS_PER_PROCESS = 5
+
+def make_conditions(processes):
+    """Условия-цепочки: каждая следующая задача ждет завершения предыдущей."""
+    conditions = []
+    for process in processes:
+        tasks = process['tasks']
+        for previous, task in zip(tasks, tasks[1:]):
+            tree = {"assignment_task": previous['name'], "operator": "equals", "value": "completed"}
+            conditions.append((len(conditions) + 1, task['id'], tree))
+    return conditions
+
+def interpret(processes_by_task, conditions, statuses, changed_task_id):
+    """Прежний способ: проверяем каждое условие, находя задачу по названию."""
+    started = []
+    for _, task_id, tree in conditions:
+        if task_id in statuses:
+            continue
+        process = processes_by_task[task_id]
+        dependency = next(task['id'] for task in process['tasks'] if task['name'] == tree['assignment_task'])
+        if dependency == changed_task_id and statuses.get(dependency) == tree['value']:
+            started.append(task_id)
+    return started
+
+def make_instances(processes, count, rng):
+    """Экземпляры процессов: первая задача каждого уже запущена."""
+    instances = []
+    for _ in range(count):
+        process = rng.choice(processes)
+        instances.append((process, {process['tasks'][0]['id']: 'started'}))
+    return instances
+
+def run_events(instances, events, rng, handle):
+    """Завершает текущую задачу в случайных экземплярах и возвращает мкс на событие."""
+    started_at = time.perf_counter()
+    for _ in range(events):
+        process, statuses = rng.choice(instances)
+        current = next((task_id for task_id, status in statuses.items() if status == 'started'), None)
+        if current is None:
+            # Экземпляр завершен — начинаем заново
+            statuses.clear()
+            statuses[process['tasks'][0]['id']] = 'started'
+            continue
+        statuses[current] = 'completed'
+        for task_id in handle(statuses, current):
+            statuses[task_id] = 'started'
+    return (time.perf_counter() - started_at) / events * 1e6
+
+def run(instances_count, events):
+    print(f"Экземпляров процессов: {instances_count}, задач в процессе: {TASKS_PER_PROCESS}")
+    print(f"  {'шаблонов':>9s} {'условий':>9s} {'интерпретация, мкс':>20s} {'индекс, мкс':>13s}")
+    for templates in (100, 1000, 10000):
+        processes = make_processes(templates, tasks=TASKS_PER_PROCESS)
+        conditions = make_conditions(processes)
+        catalog = ProcessCatalog(processes)
+        index = StartConditionIndex.from_catalog(catalog, conditions)
+        processes_by_task = {task['id']: process for process in processes for task in process['tasks']}
+
+        # Интерпретация медленная — для больших каталогов берем меньше событий
+        slow_events = max(20, events * 100 // templates // 10)
+        rng = random.Random(1)
+        slow = run_events(make_instances(processes, instances_count, rng), slow_events, rng,
+                          lambda statuses, changed: interpret(processes_by_task, conditions, statuses, changed))
+        rng = random.Random(1)
+        fast = run_events(make_instances(processes, instances_count, rng), events, rng, index.tasks_to_start)
+        print(f"  {templates:9d} {len(conditions):9d} {slow:20.1f} {fast:13.2f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--instances', type=int, default=5000)
+    parser.add_argument('--events', type=int, default=20000)
+    args = parser.parse_args()
+    run(args.instances, args.events)
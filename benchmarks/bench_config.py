@@ -0,0 +1,70 @@
+"""
+Микро-бенчмарк получения конфигурации MCP сервера.
+
+Сравнивает стоимость одного обращения get_mcp_url() + get_mcp_headers():
+- "без кэша" — как раньше, файл открывается и разбирается при каждом вызове;
+- "с кэшем" — конфигурация берется из ConfigCache.
+
+Запуск:
+python benchmarks/bench_config.py [--iterations 20000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mcp_config  # noqa: E402
+
+SAMPLE_CONFIG = {
+    "pdm": {
+        "url": "http://localhost:8001/mcp",
+        "headers": {"Authorization": "Bearer " + "x" * 64},
+    }
+}
+
+def uncached_lookup(config_file):
+    """Повторяет старое поведение: чтение файла на каждый вызов."""
+    url = mcp_config.load_config(config_file).get('pdm', {}).get('url')
+    headers = mcp_config.load_config(config_file).get('pdm', {}).get('headers', {})
+    return url, headers
+
+def cached_lookup(cache):
+    """Обращение через кэш конфигурации."""
+    pdm = cache.get().get('pdm', {})
+    return pdm.get('url'), dict(pdm.get('headers', {}))
+
+def run(iterations):
+    with tempfile.TemporaryDirectory() as tmp:
+        config_file = os.path.join(tmp, 'config.json')
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(SAMPLE_CONFIG, f)
+
+        cache = mcp_config.ConfigCache(config_file=config_file)
+        cache_stat_each_call = mcp_config.ConfigCache(config_file=config_file, check_interval=0)
+
+        cases = [
+            ("без кэша (load_config на каждый вызов)", lambda: uncached_lookup(config_file)),
+            ("кэш, проверка файла на каждый вызов", lambda: cached_lookup(cache_stat_each_call)),
+            ("кэш, проверка раз в секунду", lambda: cached_lookup(cache)),
+        ]
+
+        print(f"Итераций: {iterations}")
+        baseline = None
+        for name, func in cases:
+            func()  # прогрев
+            seconds = min(timeit.repeat(func, number=iterations, repeat=3))
+            per_call_us = seconds / iterations * 1e6
+            if baseline is None:
+                baseline = per_call_us
+            print(f"  {name:45s} {per_call_us:9.2f} мкс/вызов  (x{baseline / per_call_us:.1f})")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    run(args.iterations)
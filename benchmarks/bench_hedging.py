@@ -0,0 +1,91 @@
+"""
+Бенчмарк адаптивных таймаутов и дублирующих запросов (mcp_latency).
+
+Сервер-заглушка отвечает за --latency секунд, но в доле --spike-rate
+ответов добавляет всплеск --spike-latency ("медленный воркер"). Клиент
+запрашивает /processes/{id}/ в нескольких потоках:
+- "фиксированный таймаут" — как сейчас, без политики;
+- "адаптивный таймаут" — таймаут чтения 3 × p99, долгие ответы становятся ошибками;
+- "дублирование" — после p95 отправляется второй запрос (бюджет 10%);
+- "адаптивный таймаут + дублирование".
+
+Для каждого режима выводятся перцентили задержки вызова, число ошибок
+и сколько запросов получил сервер сверх числа вызовов.
+
+Запуск:
+python benchmarks/bench_hedging.py [--requests 1000] [--threads 4] [--spike-rate 0.03] [--spike-latency 0.5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client import MCPClient  # noqa: E402
+from mcp_fake_server import FakeMCPServer  # noqa: E402
+from mcp_latency import LatencyPolicy  # noqa: E402
+from mcp_metrics import MetricsRegistry  # noqa: E402
+
+PROCESSES = 100
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def run_mode(server, policy, total, threads):
+    client = MCPClient(base_url=server.url, headers={}, pool_size=threads * 2, connect_timeout=3,
+                       read_timeout=10, metrics=MetricsRegistry(enabled=False), latency_policy=policy)
+    errors = 0
+
+    def call(number):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            client.get_process(number % PROCESSES + 1)
+        except requests.exceptions.RequestException:
+            errors += 1
+        return time.perf_counter() - started
+
+    server.requests.clear()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(call, range(total)))
+    sent = sum(server.requests.values())
+    client.close()
+    return latencies, errors, sent
+
+def run(total, threads, latency, spike_rate, spike_latency):
+    modes = [
+        ("фиксированный таймаут", lambda: False),
+        ("адаптивный таймаут", lambda: LatencyPolicy(adaptive_timeout=True)),
+        ("дублирование", lambda: LatencyPolicy(adaptive_timeout=False, hedge=True)),
+        ("адаптивный таймаут + дублирование", lambda: LatencyPolicy(adaptive_timeout=True, hedge=True)),
+    ]
+    print(f"Вызовов: {total}, потоков: {threads}, задержка {latency * 1000:.0f} мс, "
+          f"всплески {spike_rate:.1%} по {spike_latency * 1000:.0f} мс")
+    print(f"  {'режим':36s} {'p50, мс':>8s} {'p95, мс':>8s} {'p99, мс':>8s} {'макс, мс':>9s} "
+          f"{'ошибок':>7s} {'лишних запросов':>16s}")
+    for name, make_policy in modes:
+        # Одинаковый seed — одинаковая последовательность всплесков в каждом режиме
+        with FakeMCPServer(processes=PROCESSES, latency=latency, spike_rate=spike_rate,
+                           spike_latency=spike_latency, seed=1) as server:
+            policy = make_policy()
+            latencies, errors, sent = run_mode(server, policy, total, threads)
+        extra = (sent - total) / total
+        print(f"  {name:36s} {percentile(latencies, 0.5) * 1000:8.1f} {percentile(latencies, 0.95) * 1000:8.1f} "
+              f"{percentile(latencies, 0.99) * 1000:8.1f} {latencies[-1] * 1000:9.1f} {errors:7d} {extra:16.1%}")
+        if policy:
+            print(f"    {policy.stats.to_dict()}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--spike-rate', type=float, default=0.03)
+    parser.add_argument('--spike-latency', type=float, default=0.5)
+    args = parser.parse_args()
+    run(args.requests, args.threads, args.latency, args.spike_rate, args.spike_latency)
@@ -0,0 +1,105 @@
+"""
+Бенчмарк импорта документов из CSV (mcp_import).
+
+Генерирует CSV на --rows строк типа "Заявка" (доля --invalid с ошибками)
+и загружает его на сервер-заглушку с задержкой ответа --latency:
+- с разным числом потоков загрузки (--workers, через запятую) — строк/с;
+- с остановкой посреди импорта и продолжением по контрольной точке —
+  сколько строк прочитано повторно, сколько пакетов отправлено еще раз
+  и нет ли дубликатов на сервере.
+
+Запуск:
+python benchmarks/bench_import.py [--rows 200000] [--workers 1,4,8] [--latency 0.005]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client import MCPClient  # noqa: E402
+from mcp_fake_server import FakeMCPServer  # noqa: E402
+from mcp_import import DocumentImporter, find_document_type  # noqa: E402
+from mcp_metrics import MetricsRegistry  # noqa: E402
+from mcp_snapshot import read_processes  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTE = ('POST', '/documents/')
+
+def make_csv(path, rows, invalid, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Номер заявки', 'Дата', 'Название', 'Описание'])
+        for number in range(rows):
+            row = [f"З-{number:07d}", f"{1 + number % 28:02d}.{1 + number % 12:02d}.2023",
+                   f"Заявка на оборудование №{number}", "Описание заявки" if number % 3 == 0 else ""]
+            if rng.random() < invalid:
+                row[rng.randrange(3)] = ""
+            writer.writerow(row)
+
+def make_importer(server, workers):
+    document_type = find_document_type(read_processes(os.path.join(ROOT, 'mcp_processes_info.json')), 'Заявка')
+    client = MCPClient(base_url=server.url, headers={}, pool_size=workers, connect_timeout=1, read_timeout=10,
+                       metrics=MetricsRegistry(enabled=False), latency_policy=False, singleflight=False)
+    mapping = {'Номер заявки': 'номер', 'Дата': 'дата', 'Название': 'название', 'Описание': 'описание'}
+    return DocumentImporter(document_type, client=client, mapping=mapping, workers=workers, progress_interval=0)
+
+def run_workers(path, rows, workers_list, latency, directory):
+    print(f"  {'потоков загрузки':18s} {'строк/с':>9s} {'время, с':>9s} {'загружено':>10s} {'отклонено':>10s}")
+    for workers in workers_list:
+        with FakeMCPServer(latency=latency) as server:
+            importer = make_importer(server, workers)
+            stats = importer.run(path, checkpoint=os.path.join(directory, f'workers-{workers}.checkpoint'))
+            importer.client.close()
+        print(f"  {workers:<18d} {rows / stats.elapsed:9.0f} {stats.elapsed:9.2f} "
+              f"{stats.imported:10d} {stats.rejected:10d}")
+
+def run_resume(path, rows, workers, latency, directory):
+    checkpoint = os.path.join(directory, 'resume.checkpoint')
+    with FakeMCPServer(latency=latency) as server:
+        importer = make_importer(server, workers)
+        # Останавливаем на середине ожидаемого времени импорта
+        timer = threading.Timer(0.5 * rows / 30000, importer.stop)
+        timer.start()
+        first = importer.run(path, checkpoint=checkpoint)
+        timer.cancel()
+        sent_before = server.requests[ROUTE]
+        print(f"  остановлен: прочитано {first.rows} строк, позиция {first.imported + first.rejected} строк, "
+              f"за {first.elapsed:.2f} с")
+
+        started = time.perf_counter()
+        second = make_importer(server, workers).run(path, checkpoint=checkpoint)
+        elapsed = time.perf_counter() - started
+        expected = second.imported + second.rejected
+        stored = server.documents.get(1, [])
+        print(f"  продолжен: пропущено {second.skipped_rows} строк, прочитано {second.rows}, "
+              f"за {elapsed:.2f} с")
+        print(f"  всего строк обработано: {expected} из {rows}; запросов: {server.requests[ROUTE]} "
+              f"(до остановки {sent_before}); документов на сервере: {len(stored)}, "
+              f"уникальных номеров: {len({document['номер'] for document in stored})}")
+
+def run(rows, workers_list, latency, invalid):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'applications.csv')
+        make_csv(path, rows, invalid)
+        print(f"Строк: {rows} ({os.path.getsize(path) / 1e6:.1f} МБ), задержка ответа {latency * 1000:.0f} мс, "
+              f"пакет по 500 строк")
+        run_workers(path, rows, workers_list, latency, directory)
+        print(f"Остановка и продолжение ({workers_list[-1]} потоков)")
+        run_resume(path, rows, workers_list[-1], latency, directory)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--workers', default='1,4,8')
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--invalid', type=float, default=0.01)
+    args = parser.parse_args()
+    run(args.rows, [int(value) for value in args.workers.split(',')], args.latency, args.invalid)
@@ -0,0 +1,71 @@
+"""
+Бенчмарк накладных расходов метрик запросов (mcp_metrics).
+
+Сравнивает:
+- время записи одного замера (start → headers_received → finish) без сети;
+- число запросов в секунду к серверу-заглушке с метриками и без них.
+
+Запуск:
+python benchmarks/bench_metrics.py [--requests 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client import MCPClient  # noqa: E402
+from mcp_fake_server import serve  # noqa: E402
+from mcp_metrics import MetricsRegistry  # noqa: E402
+
+class _Response:
+    """Ответ-заглушка с полями, которые читает MetricsRegistry."""
+
+    status_code = 200
+    elapsed = timedelta(milliseconds=3)
+    raw = None
+
+def record_overhead(count):
+    """Возвращает мкс на запись одного замера."""
+    metrics = MetricsRegistry(enabled=True, trace=False)
+    response = _Response()
+    base_url = "http://127.0.0.1:8001/mcp"
+    url = f"{base_url}/processes/12/"
+    started = time.perf_counter()
+    for _ in range(count):
+        span = metrics.start('GET', url, base_url)
+        metrics.headers_received(span, response)
+        metrics.finish(span, response)
+    return (time.perf_counter() - started) / count * 1e6
+
+def requests_per_second(base_url, metrics, total):
+    client = MCPClient(base_url=base_url, headers={}, pool_size=1, connect_timeout=3,
+                       read_timeout=10, metrics=metrics)
+    client.get("processes/1/")
+    started = time.perf_counter()
+    for _ in range(total):
+        client.get("processes/1/").content
+    client.close()
+    return total / (time.perf_counter() - started)
+
+def run(total):
+    print(f"Запись одного замера: {record_overhead(100000):.2f} мкс")
+    with serve() as base_url:
+        # Чередуем прогоны, чтобы шум машины одинаково влиял на оба варианта
+        plain, measured = [], []
+        for _ in range(3):
+            plain.append(requests_per_second(base_url, MetricsRegistry(enabled=False), total))
+            measured.append(requests_per_second(base_url, MetricsRegistry(enabled=True, trace=False), total))
+    plain, measured = max(plain), max(measured)
+    print(f"Запросов: {total}")
+    print(f"  без метрик: {plain:8.0f} запросов/сек ({1e6 / plain:.0f} мкс на запрос)")
+    print(f"  с метриками: {measured:7.0f} запросов/сек ({1e6 / measured:.0f} мкс на запрос)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.requests)
@@ -0,0 +1,113 @@
+"""
+Бенчмарк памяти и скорости разбора каталога: словари против моделей mcp_models.
+
+Каталог сериализуется в JSON, как его отдает сервер, и загружается:
+- словарями (json.loads, как сейчас);
+- моделями Process/TaskTemplate/DocumentType/Field;
+- моделями с отложенным разбором типов документов (lazy=True).
+
+Для каждого способа выводится память, которая остается занятой
+после загрузки (tracemalloc), и время загрузки.
+
+Перед замером проверяется, что модели записываются в отчет ndjson
+(mcp_report) и в снимок (mcp_snapshot, все форматы) так же, как словари.
+
+Запуск:
+python benchmarks/bench_models.py [--processes 10000] [--tasks 3] [--document-types 3] [--fields 4]
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_fake_server import make_catalog  # noqa: E402
+from mcp_models import clear_shared, decode_processes  # noqa: E402
+from mcp_report import render  # noqa: E402
+from mcp_snapshot import FORMATS, write_processes  # noqa: E402
+
+def load_dicts(data):
+    return json.loads(data)
+
+def load_models(data):
+    return list(decode_processes(json.loads(data)))
+
+def load_lazy(data):
+    return list(decode_processes(json.loads(data), lazy=True))
+
+def measure(load, data):
+    """Возвращает (занятая память в байтах, время загрузки в секундах)."""
+    clear_shared()
+    gc.collect()
+    started = time.perf_counter()
+    load(data)
+    seconds = time.perf_counter() - started
+
+    clear_shared()
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = load(data)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return retained, seconds
+
+def serialize(processes):
+    """Отчет ndjson и снимки во всех форматах в виде строк."""
+    output = io.StringIO()
+    render(processes, out=output, fmt='ndjson')
+    results = [output.getvalue()]
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in FORMATS:
+            path = os.path.join(directory, f'snapshot.{fmt}')
+            write_processes(processes, path, fmt=fmt)
+            with open(path, encoding='utf-8') as f:
+                results.append(f.read())
+    return results
+
+def check_serialization(data):
+    dicts = json.loads(data)[:100]
+    for lazy in (False, True):
+        models = list(decode_processes(dicts, lazy=lazy))
+        if serialize(models) != serialize(dicts):
+            raise SystemExit(f"✗ Модели (lazy={lazy}) записываются не так, как словари")
+    print("Модели записываются в отчет ndjson и снимки (" + ", ".join(FORMATS) + ") так же, как словари")
+
+def run(count, tasks, document_types, fields):
+    processes = make_catalog(count, tasks=tasks, document_types=document_types, fields=fields)
+    data = json.dumps(processes, ensure_ascii=False).encode('utf-8')
+    del processes
+
+    print(f"Процессов: {count} (задач {tasks}, типов документов {document_types}, полей {fields}), "
+          f"JSON: {len(data) / 1024 / 1024:.1f} МБ")
+    check_serialization(data)
+    print(f"  {'способ':32s} {'память, МБ':>11s} {'на процесс, Б':>14s} {'загрузка, с':>12s}")
+    dict_bytes = None
+    for name, load in (("словари (json.loads)", load_dicts),
+                       ("модели", load_models),
+                       ("модели, lazy=True", load_lazy)):
+        retained, seconds = measure(load, data)
+        if dict_bytes is None:
+            dict_bytes = retained
+            ratio = ""
+        else:
+            ratio = f"  ({retained / dict_bytes:.0%} от словарей)"
+        print(f"  {name:32s} {retained / 1024 / 1024:11.1f} {retained / count:14.0f} {seconds:12.3f}{ratio}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=10000)
+    parser.add_argument('--tasks', type=int, default=3)
+    parser.add_argument('--document-types', type=int, default=3)
+    parser.add_argument('--fields', type=int, default=4)
+    args = parser.parse_args()
+    run(args.processes, args.tasks, args.document_types, args.fields)
@@ -0,0 +1,63 @@
+"""
+Бенчмарк пула соединений MCP клиента.
+
+Сравнивает число запросов в секунду к локальному серверу-заглушке mcp_fake_server:
+- "без пула" — requests.get() на каждый вызов, новое соединение каждый раз;
+- "с пулом" — MCPClient с общим requests.Session (keep-alive).
+
+Запуск:
+python benchmarks/bench_pooling.py [--requests 500] [--threads 1]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client import MCPClient  # noqa: E402
+from mcp_fake_server import serve  # noqa: E402
+
+HEADERS = {"Authorization": "Bearer benchmark"}
+
+def measure(func, total, threads):
+    """Выполняет func total раз в threads потоках и возвращает запросов/сек."""
+    started = time.perf_counter()
+    if threads == 1:
+        for _ in range(total):
+            func()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda _: func(), range(total)))
+    return total / (time.perf_counter() - started)
+
+def run(total, threads):
+    with serve() as base_url:
+        url = f"{base_url}/processes/1/"
+
+        def without_pool():
+            requests.get(url, headers=HEADERS, timeout=10).json()
+
+        client = MCPClient(base_url=base_url, headers=HEADERS, pool_size=max(threads, 1),
+                           connect_timeout=3, read_timeout=10)
+
+        def with_pool():
+            client.get("processes/1/").json()
+
+        print(f"Запросов: {total}, потоков: {threads}")
+        plain = measure(without_pool, total, threads)
+        print(f"  без пула: {plain:8.0f} запросов/сек")
+        pooled = measure(with_pool, total, threads)
+        print(f"  с пулом:  {pooled:8.0f} запросов/сек  (x{pooled / plain:.1f})")
+        client.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+    run(args.requests, args.threads)
@@ -0,0 +1,124 @@
+"""
+Нагрузочная проверка объединения одновременных запросов (mcp_singleflight).
+
+--callers потоков одновременно (через барьер) вызывают get_process(1) —
+как воркеры Django при пустом кэше. Сервер-заглушка отвечает за --latency
+секунд. Сравниваются MCPClient без объединения и с ним; выводится,
+сколько запросов получил сервер на один "залп" вызовов и время залпа.
+Затем то же для корутин asyncio (AsyncSingleFlight) и проверка, что
+ошибка сервера и таймаут ожидания доходят до всех вызовов.
+
+Запуск:
+python benchmarks/bench_singleflight.py [--callers 64] [--rounds 5] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client import MCPClient  # noqa: E402
+from mcp_fake_server import FakeMCPServer  # noqa: E402
+from mcp_metrics import MetricsRegistry  # noqa: E402
+from mcp_singleflight import AsyncSingleFlight, SingleFlight  # noqa: E402
+
+ROUTE = ('GET', '/processes/{id}/')
+
+def make_client(server, callers, singleflight):
+    return MCPClient(base_url=server.url, headers={}, pool_size=callers, connect_timeout=3, read_timeout=10,
+                     metrics=MetricsRegistry(enabled=False), latency_policy=False, singleflight=singleflight)
+
+def burst(callers, call):
+    """Одновременно запускает call() в callers потоках; возвращает результаты и время."""
+    barrier = threading.Barrier(callers)
+
+    def run(_):
+        barrier.wait()
+        try:
+            return call()
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        started = time.perf_counter()
+        results = list(executor.map(run, range(callers)))
+    return results, time.perf_counter() - started
+
+def run_threads(server, callers, rounds):
+    print(f"Потоки: {callers} одновременных get_process(1), залпов: {rounds}")
+    print(f"  {'режим':24s} {'запросов на залп':>17s} {'время залпа, мс':>16s} {'результатов':>12s}")
+    for name, singleflight in (("без объединения", False), ("single-flight", True)):
+        client = make_client(server, callers, singleflight)
+        server.requests.clear()
+        elapsed = 0.0
+        good = 0
+        for _ in range(rounds):
+            results, seconds = burst(callers, lambda: client.get_process(1))
+            elapsed += seconds
+            good += sum(1 for result in results if isinstance(result, dict) and result['id'] == 1)
+        client.close()
+        print(f"  {name:24s} {server.requests[ROUTE] / rounds:17.1f} {elapsed / rounds * 1000:16.1f} "
+              f"{good:>5d}/{callers * rounds}")
+
+def run_asyncio(server, callers, rounds):
+    print(f"asyncio: {callers} одновременных корутин, залпов: {rounds}")
+    client = make_client(server, callers, False)
+    flights = AsyncSingleFlight()
+
+    async def one_round(executor):
+        loop = asyncio.get_running_loop()
+
+        def request():
+            return loop.run_in_executor(executor, client.get_process, 1)
+        return await asyncio.gather(*(flights.do('process-1', request, timeout=5) for _ in range(callers)))
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=callers) as executor:
+            for _ in range(rounds):
+                results = await one_round(executor)
+                assert all(result['id'] == 1 for result in results)
+
+    server.requests.clear()
+    started = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - started
+    client.close()
+    print(f"  запросов на залп: {server.requests[ROUTE] / rounds:.1f}, время залпа: {elapsed / rounds * 1000:.1f} мс, "
+          f"{flights.stats.to_dict()}")
+
+def run_errors(server, callers):
+    print("Ошибки и таймауты")
+    flights = SingleFlight()
+
+    def failing():
+        time.sleep(0.05)
+        raise requests.exceptions.ConnectionError("сервер недоступен")
+    results, _ = burst(callers, lambda: flights.do('process-1', failing, timeout=5))
+    errors = sum(1 for result in results if isinstance(result, requests.exceptions.ConnectionError))
+    print(f"  ошибку ведущего получили {errors}/{callers} вызовов")
+
+    results, _ = burst(callers, lambda: flights.do('process-1', lambda: time.sleep(0.5), timeout=0.05))
+    timeouts = sum(1 for result in results if isinstance(result, TimeoutError))
+    print(f"  таймаут 50 мс при запросе 500 мс: {timeouts}/{callers} вызовов (все, кроме ведущего), "
+          f"{flights.stats.to_dict()}")
+
+def run(callers, rounds, latency):
+    with FakeMCPServer(processes=10, latency=latency) as server:
+        run_threads(server, callers, rounds)
+        run_asyncio(server, callers, rounds)
+        run_errors(server, callers)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--callers', type=int, default=64)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+    run(args.callers, args.rounds, args.latency)
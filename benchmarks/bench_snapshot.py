@@ -0,0 +1,58 @@
+"""
+Бенчмарк записи снимка каталога бизнес-процессов.
+
+Сравнивает время записи и размер файла для синтетического каталога:
+- прежний способ — json.dump(..., indent=2) всего списка на месте;
+- mcp_snapshot.write_processes() во всех форматах, с gzip и без.
+
+Запуск:
+python benchmarks/bench_snapshot.py [--processes 10000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_snapshot import FORMATS, read_processes, write_processes  # noqa: E402
+from mcp_fake_server import make_processes  # noqa: E402
+
+def legacy_write(processes, filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(processes, f, ensure_ascii=False, indent=2)
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+def run(count):
+    processes = make_processes(count)
+    print(f"Процессов: {count}")
+    print(f"  {'способ':28s} {'запись, с':>10s} {'чтение, с':>10s} {'размер, КБ':>12s}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = os.path.join(tmp, 'legacy.json')
+        legacy_seconds = timed(legacy_write, processes, legacy_file)
+        legacy_size = os.path.getsize(legacy_file)
+        print(f"  {'json.dump indent=2 (прежний)':28s} {legacy_seconds:10.3f} {'':>10s} {legacy_size / 1024:12.0f}")
+
+        for fmt in FORMATS:
+            for compress in (False, True):
+                name = f"{fmt}{' + gzip' if compress else ''}"
+                filename = os.path.join(tmp, f"snapshot.{fmt}{'.gz' if compress else ''}")
+                write_seconds = timed(write_processes, processes, filename, fmt=fmt, compress=compress)
+                read_seconds = timed(lambda: sum(1 for _ in read_processes(filename)))
+                size = os.path.getsize(filename)
+                print(f"  {name:28s} {write_seconds:10.3f} {read_seconds:10.3f} "
+                      f"{size / 1024:12.0f}  ({size / legacy_size:.0%} от прежнего)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=10000)
+    args = parser.parse_args()
+    run(args.processes)
@@ -0,0 +1,74 @@
+"""
+Бенчмарк времени запуска pdm-agent.
+
+Каждая команда запускается в новом процессе интерпретатора несколько раз,
+выводится медиана и минимум полного времени выполнения. Для сравнения
+замеряются пустой интерпретатор, импорт requests и прежние отдельные
+скрипты (test_mcp_connection.py импортирует requests сразу). Последняя
+колонка — время сверх запуска пустого интерпретатора.
+
+Сервер не нужен: URL берется из PDM_MCP_URL, а отчет строится по
+временному снимку каталога.
+
+Запуск:
+python benchmarks/bench_startup.py [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcp_fake_server import make_catalog  # noqa: E402
+from mcp_snapshot import write_processes  # noqa: E402
+
+def measure(command, repeat, env):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=False)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), min(samples)
+
+def run(repeat):
+    python = sys.executable
+    agent = os.path.join(ROOT, 'pdm_agent.py')
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'catalog.json')
+        write_processes(make_catalog(10), snapshot)
+        env = dict(os.environ, PDM_MCP_URL='http://127.0.0.1:9/mcp')
+
+        cases = [
+            ("python -c pass", [python, '-c', 'pass']),
+            ("python -c 'import requests'", [python, '-c', 'import requests']),
+            ("pdm-agent --help", [python, agent, '--help']),
+            ("pdm-agent config", [python, agent, 'config']),
+            ("pdm-agent catalog show --summary", [python, agent, 'catalog', 'show', snapshot, '--summary']),
+            ("pdm-agent catalog show --format table",
+             [python, agent, 'catalog', 'show', snapshot, '--format', 'table']),
+            ("python test_mcp_config.py (прежний)", [python, os.path.join(ROOT, 'test_mcp_config.py')]),
+            ("python mcp_report.py --summary (прежний)",
+             [python, os.path.join(ROOT, 'mcp_report.py'), snapshot, '--summary']),
+            ("python test_mcp_connection.py (прежний)", [python, os.path.join(ROOT, 'test_mcp_connection.py')]),
+        ]
+        print(f"Запусков каждой команды: {repeat}")
+        print(f"  {'команда':44s} {'медиана, мс':>12s} {'минимум, мс':>12s} {'сверх python, мс':>17s}")
+        baseline = None
+        for name, command in cases:
+            median, best = measure(command, repeat, env)
+            if baseline is None:
+                baseline = median
+            print(f"  {name:44s} {median:12.1f} {best:12.1f} {median - baseline:17.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.repeat)
@@ -0,0 +1,67 @@
+"""
+Бенчмарк инкрементальной синхронизации снимка каталога (mcp_sync).
+
+На сервере-заглушке с большим каталогом меняется небольшая часть процессов,
+после чего сравниваются:
+- полное обновление — загрузка всего каталога и перезапись снимка;
+- инкрементальная синхронизация — только изменения после курсора.
+
+Запуск:
+python benchmarks/bench_sync.py [--processes 10000] [--changes 20] [--format ndjson]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client import MCPClient  # noqa: E402
+from mcp_fake_server import FakeMCPServer, make_process  # noqa: E402
+from mcp_metrics import MetricsRegistry  # noqa: E402
+from mcp_snapshot import write_processes  # noqa: E402
+from mcp_sync import ProcessSync  # noqa: E402
+
+def received_bytes(metrics):
+    return sum(endpoint['bytes'] for endpoint in metrics.to_dict()['endpoints'])
+
+def run(count, changes, fmt):
+    with FakeMCPServer(processes=count) as server, tempfile.TemporaryDirectory() as tmp:
+        metrics = MetricsRegistry(enabled=True, trace=False)
+        client = MCPClient(base_url=server.url, headers={}, pool_size=1, connect_timeout=3,
+                           read_timeout=60, metrics=metrics)
+        sync = ProcessSync(os.path.join(tmp, 'snapshot'), client=client, fmt=fmt, limit=1000)
+        sync.sync_once()
+
+        # Меняем и удаляем несколько процессов
+        for process_id in range(2, changes + 2):
+            process = make_process(process_id)
+            process['description'] += " (изменено)"
+            server.upsert_process(process)
+        server.delete_process(count)
+
+        metrics.reset()
+        started = time.perf_counter()
+        write_processes(client.iter_processes(), os.path.join(tmp, 'full'), fmt=fmt)
+        full_seconds = time.perf_counter() - started
+        full_bytes = received_bytes(metrics)
+
+        metrics.reset()
+        result = sync.sync_once()
+        delta_bytes = received_bytes(metrics)
+
+        print(f"Процессов: {count}, изменено: {changes}, удалено: 1, формат снимка: {fmt}")
+        print(f"  {'способ':28s} {'время, с':>9s} {'получено, КБ':>13s}")
+        print(f"  {'полное обновление':28s} {full_seconds:9.3f} {full_bytes / 1024:13.0f}")
+        print(f"  {'инкрементальная синхронизация':28s} {result.elapsed:9.3f} {delta_bytes / 1024:13.0f}"
+              f"  (обновлено {result.upserted}, удалено {result.deleted})")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=10000)
+    parser.add_argument('--changes', type=int, default=20)
+    parser.add_argument('--format', default='json', choices=('json', 'compact', 'ndjson'))
+    args = parser.parse_args()
+    run(args.processes, args.changes, args.format)
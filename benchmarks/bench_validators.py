@@ -0,0 +1,142 @@
+"""
+Бенчмарк проверки документов перед загрузкой (mcp_validators).
+
+Генерирует --documents документов типа "Заявка" из mcp_processes_info.json,
+среди которых доля --invalid с ошибками (пустое обязательное поле,
+несуществующая дата, повтор номера). Сравнивает, сколько документов в
+секунду проверяется:
+- интерпретация: для каждого документа перебор описаний полей и выбор
+  проверки по типу поля (уникальность — тоже по множеству);
+- DocumentValidator.validate_batch(): скомпилированная проверка и хэш-таблица.
+
+Запуск:
+python benchmarks/bench_validators.py [--documents 100000] [--invalid 0.02]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_validators import compile_validator  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def make_documents(count, invalid, seed=0):
+    rng = random.Random(seed)
+    documents = []
+    for number in range(count):
+        document = {
+            "номер": f"З-{number:07d}",
+            "дата": date(2024, 1 + number % 12, 1 + number % 28).isoformat() if number % 2 else
+                    f"{1 + number % 28:02d}.{1 + number % 12:02d}.2024",
+            "название": f"Заявка на оборудование №{number}",
+        }
+        if number % 3 == 0:
+            document["описание"] = "Описание заявки " * 4
+        if rng.random() < invalid:
+            defect = rng.randrange(3)
+            if defect == 0:
+                document["название"] = ""
+            elif defect == 1:
+                document["дата"] = "2024-02-30"
+            elif number:
+                document["номер"] = f"З-{number - 1:07d}"
+        documents.append(document)
+    return documents
+
+def interpret(fields, documents):
+    """Проверка без компиляции: описание полей разбирается для каждого документа."""
+    valid = []
+    errors = []
+    numbers = set()
+    for index, document in enumerate(documents):
+        cleaned = {}
+        ok = True
+        for field in fields:
+            value = document.get(field['name'])
+            if value in (None, ''):
+                if field.get('required'):
+                    errors.append((index, field['name']))
+                    ok = False
+                continue
+            if field['type'] == 'дата':
+                try:
+                    if '.' in value:
+                        day, month, year = value.split('.')
+                        value = date(int(year), int(month), int(day)).isoformat()
+                    else:
+                        date.fromisoformat(value)
+                except ValueError:
+                    errors.append((index, field['name']))
+                    ok = False
+                    continue
+            elif field['type'] == 'булево':
+                value = str(value).lower() in ('true', '1', 'да')
+            elif field['type'] in ('строка', 'текст'):
+                value = str(value)
+            cleaned[field['name']] = value
+        if ok:
+            for field in fields:
+                if field.get('unique'):
+                    if cleaned[field['name']] in numbers:
+                        errors.append((index, field['name']))
+                        ok = False
+                    else:
+                        numbers.add(cleaned[field['name']])
+        if ok:
+            valid.append((index, cleaned))
+    return valid, errors
+
+def measure(func, repeat=3):
+    """Возвращает результат и лучшее время из repeat запусков."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def run(count, invalid):
+    with open(os.path.join(ROOT, 'mcp_processes_info.json'), encoding='utf-8') as f:
+        document_type = json.load(f)[0]['document_types'][0]
+    fields = document_type['fields']
+    documents = make_documents(count, invalid)
+    print(f"Тип документа: {document_type['name']} "
+          f"({', '.join(field['name'] for field in fields)}), документов: {count}")
+
+    validator, compile_time = measure(lambda: compile_validator(document_type), repeat=1)
+    result, elapsed = measure(lambda: validator.validate_batch(documents))
+    print(f"  компиляция: {compile_time * 1e6:.0f} мкс")
+    print(f"  {'способ':36s} {'документов/с':>13s} {'время, мс':>10s} {'ошибок':>7s}")
+    (_, errors), interpreted = measure(lambda: interpret(fields, documents))
+    print(f"  {'интерпретация':36s} {count / interpreted:13.0f} {interpreted * 1000:10.1f} {len(errors):7d}")
+    print(f"  {'validate_batch':36s} {count / elapsed:13.0f} {elapsed * 1000:10.1f} {len(result.errors):7d}")
+    # Проверка частями с общей таблицей уникальных значений, как при загрузке файла
+    def in_batches(size=1000):
+        seen = None
+        errors = 0
+        for start in range(0, count, size):
+            batch = validator.validate_batch(documents[start:start + size], seen=seen, start=start)
+            seen = batch.seen
+            errors += len(batch.errors)
+        return errors
+    batched_errors, batched = measure(in_batches)
+    print(f"  {'validate_batch по 1000':36s} {count / batched:13.0f} {batched * 1000:10.1f} {batched_errors:7d}")
+    for error in result.errors[:3]:
+        print(f"    {error}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=100000)
+    parser.add_argument('--invalid', type=float, default=0.02)
+    args = parser.parse_args()
+    run(args.documents, args.invalid)
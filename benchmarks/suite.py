@@ -0,0 +1,291 @@
+"""
+Набор бенчмарков: загрузка конфигурации, получение, разбор, вывод и сохранение каталога.
+
+Каждый сценарий выполняется в отдельном процессе Python, чтобы пиковое
+потребление памяти (peak RSS) относилось только к нему. Каталоги отдает
+локальный сервер-заглушка mcp_fake_server, запущенный в основном процессе.
+
+Сценарии (для каталогов из 1, 100 и 10000 процессов):
+- config/load, config/cached — load_config() и кэшированный get_config();
+- fetch/N, fetch_paged/N — MCPClient.iter_processes() массивом и постранично;
+- decode/N, decode_stream/N — json.loads() и потоковый iter_json_array();
+- render/N — display_process_info() (вывод в /dev/null);
+- save/N — save_process_info_to_file().
+
+Результат записывается в JSON: для каждого сценария p50/p95/p99 и среднее
+время одного выполнения (мс), пропускная способность (процессов/с) и peak RSS (МБ).
+
+Запуск:
+python benchmarks/suite.py --output results.json
+python benchmarks/suite.py --sizes 1,100 --scenarios fetch,decode
+python benchmarks/suite.py --output new.json --compare baseline.json --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_SIZES = (1, 100, 10000)
+# Размер страницы для fetch_paged
+PAGE_SIZE = 100
+# Сколько раз выполнять сценарий в зависимости от размера каталога
+REPEATS = {1: 200, 100: 50, 10000: 5}
+CONFIG_REPEATS = 200
+DEFAULT_THRESHOLD = 0.10
+
+# Минимальная длительность одного замера: быстрые операции выполняются пачкой
+MIN_SAMPLE_SECONDS = 0.001
+
+# Метрики, рост которых считается ухудшением, и метрики, где ухудшение — падение.
+# p95/p99 выводятся в отчете, но не сравниваются: на малом числе повторов они слишком шумные
+LOWER_IS_BETTER = ('p50_ms', 'peak_rss_mb')
+HIGHER_IS_BETTER = ('throughput',)
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # В Linux ru_maxrss в килобайтах, в macOS — в байтах
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+# Подготовка сценариев: получает (url, size, tmp) и возвращает (функция, процессов за выполнение)
+
+def _setup_config_load(url, size, tmp):
+    from mcp_config import load_config
+    config_file = os.path.join(tmp, 'config.json')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({"pdm": {"url": url, "headers": {"Authorization": "Bearer benchmark"}}}, f)
+    return (lambda: load_config(config_file)), 1
+
+def _setup_config_cached(url, size, tmp):
+    from mcp_config import ConfigCache
+    config_file = os.path.join(tmp, 'config.json')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({"pdm": {"url": url, "headers": {"Authorization": "Bearer benchmark"}}}, f)
+    cache = ConfigCache(config_file)
+    return cache.get, 1
+
+def _client(url):
+    from mcp_client import MCPClient
+    return MCPClient(base_url=url, headers={}, pool_size=1, connect_timeout=3, read_timeout=60)
+
+def _setup_fetch(url, size, tmp):
+    client = _client(url)
+    return (lambda: sum(1 for _ in client.iter_processes())), size
+
+def _setup_fetch_paged(url, size, tmp):
+    client = _client(url)
+    return (lambda: sum(1 for _ in client.iter_processes(page_size=PAGE_SIZE))), size
+
+def _catalog_body(url):
+    return _client(url).get('processes/').content
+
+def _setup_decode(url, size, tmp):
+    body = _catalog_body(url)
+    return (lambda: json.loads(body)), size
+
+def _setup_decode_stream(url, size, tmp):
+    from mcp_client import STREAM_CHUNK_SIZE
+    from mcp_json import iter_json_array
+    body = _catalog_body(url)
+    chunks = [body[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE)]
+    return (lambda: sum(1 for _ in iter_json_array(chunks))), size
+
+def _setup_render(url, size, tmp):
+    from get_mcp_processes import display_process_info
+    processes = json.loads(_catalog_body(url))
+    devnull = open(os.devnull, 'w', encoding='utf-8')
+
+    def render():
+        with contextlib.redirect_stdout(devnull):
+            display_process_info(processes)
+    return render, size
+
+def _setup_save(url, size, tmp):
+    from get_mcp_processes import save_process_info_to_file
+    processes = json.loads(_catalog_body(url))
+    filename = os.path.join(tmp, 'mcp_processes_info.json')
+    devnull = open(os.devnull, 'w', encoding='utf-8')
+
+    def save():
+        with contextlib.redirect_stdout(devnull):
+            save_process_info_to_file(processes, filename)
+    return save, size
+
+# Имя сценария → (подготовка, зависит ли от размера каталога)
+SCENARIOS = {
+    'config/load': (_setup_config_load, False),
+    'config/cached': (_setup_config_cached, False),
+    'fetch': (_setup_fetch, True),
+    'fetch_paged': (_setup_fetch_paged, True),
+    'decode': (_setup_decode, True),
+    'decode_stream': (_setup_decode_stream, True),
+    'render': (_setup_render, True),
+    'save': (_setup_save, True),
+}
+
+def run_scenario(name, url, size, repeat):
+    """
+    Выполняет один сценарий в текущем процессе.
+
+    Returns:
+        dict: Результаты сценария
+    """
+    setup, _ = SCENARIOS[name]
+    with tempfile.TemporaryDirectory() as tmp:
+        func, items = setup(url, size, tmp)
+        started = time.perf_counter()
+        func()  # прогрев: импорты, соединение, кэши
+        warmup = time.perf_counter() - started
+        # Сколько вызовов в одном замере, чтобы замер длился не меньше MIN_SAMPLE_SECONDS
+        batch = max(1, int(MIN_SAMPLE_SECONDS / warmup)) if warmup else 1000
+        durations = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(batch):
+                func()
+            durations.append((time.perf_counter() - started) / batch)
+    durations.sort()
+    total = sum(durations)
+    return {
+        'repeat': repeat,
+        'batch': batch,
+        'p50_ms': _percentile(durations, 50) * 1000,
+        'p95_ms': _percentile(durations, 95) * 1000,
+        'p99_ms': _percentile(durations, 99) * 1000,
+        'mean_ms': total / repeat * 1000,
+        'throughput': items * repeat / total if total else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def _run_worker(name, url, size, repeat):
+    command = [sys.executable, os.path.abspath(__file__), '--worker', name,
+               '--url', url, '--size', str(size), '--repeat', str(repeat)]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_suite(sizes=DEFAULT_SIZES, scenarios=None):
+    """
+    Выполняет выбранные сценарии для каталогов указанных размеров.
+
+    Args:
+        sizes (iterable): Размеры каталога (число процессов)
+        scenarios (list): Префиксы имен сценариев (None — все)
+
+    Returns:
+        dict: Отчет {"meta": {...}, "results": {"fetch/100": {...}, ...}}
+    """
+    from mcp_fake_server import FakeMCPServer
+
+    def selected(name):
+        return not scenarios or any(name.startswith(prefix) for prefix in scenarios)
+
+    results = {}
+    for name, (_, sized) in SCENARIOS.items():
+        if not sized and selected(name):
+            print(f"  {name} ...", file=sys.stderr)
+            results[name] = dict(_run_worker(name, 'http://127.0.0.1:8001/mcp', 1, CONFIG_REPEATS), size=None)
+
+    for size in sizes:
+        with FakeMCPServer(processes=size) as server:
+            for name, (_, sized) in SCENARIOS.items():
+                key = f"{name}/{size}"
+                if sized and selected(key):
+                    print(f"  {key} ...", file=sys.stderr)
+                    repeat = REPEATS.get(size, max(3, 20000 // max(size, 1)))
+                    results[key] = dict(_run_worker(name, server.url, size, repeat), size=size)
+
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Сравнивает отчет с сохраненным базовым отчетом.
+
+    Args:
+        report (dict): Новый отчет
+        baseline (dict): Базовый отчет
+        threshold (float): Допустимое относительное ухудшение (0.1 — 10%)
+
+    Returns:
+        list: Ухудшения — кортежи (сценарий, метрика, было, стало, изменение)
+    """
+    regressions = []
+    print(f"\n{'сценарий':24s} {'метрика':12s} {'было':>12s} {'стало':>12s} {'изменение':>10s}")
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            mark = ' ✗' if worse else ''
+            print(f"{name:24s} {metric:12s} {before:12.3f} {after:12.3f} {change:+9.1%}{mark}")
+            if worse:
+                regressions.append((name, metric, before, after, change))
+    return regressions
+
+def print_report(report):
+    print(f"\n{'сценарий':24s} {'p50, мс':>10s} {'p95, мс':>10s} {'p99, мс':>10s} "
+          f"{'процессов/с':>12s} {'RSS, МБ':>9s}")
+    for name, result in report['results'].items():
+        print(f"{name:24s} {result['p50_ms']:10.3f} {result['p95_ms']:10.3f} {result['p99_ms']:10.3f} "
+              f"{result['throughput']:12.0f} {result['peak_rss_mb']:9.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help="Файл для отчета в формате JSON")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Размеры каталога через запятую")
+    parser.add_argument('--scenarios', help="Префиксы сценариев через запятую (например, fetch,decode)")
+    parser.add_argument('--compare', metavar='BASELINE', help="Сравнить с базовым отчетом")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Допустимое ухудшение при сравнении (0.1 — 10%%)")
+    # Внутренний режим: выполнить один сценарий и вывести результат в JSON
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--repeat', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scenario(args.worker, args.url, args.size, args.repeat)))
+        raise SystemExit(0)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    scenarios = [name.strip() for name in args.scenarios.split(',')] if args.scenarios else None
+    report = run_suite(sizes, scenarios)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nОтчет сохранен в файл: {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ Ухудшений: {len(regressions)} (порог {args.threshold:.0%})")
+            raise SystemExit(1)
+        print(f"\n✓ Ухудшений нет (порог {args.threshold:.0%})")
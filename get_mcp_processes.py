@@ -5,143 +5,95 @@
 информации о доступных шаблонах бизнес-процессов.
 """
 
-import json
-from mcp_config import get_mcp_url, get_mcp_headers
+import copy
+import itertools
+from mcp_config import get_mcp_url
+from mcp_report import ReportRenderer, render
+from mcp_seed import SEED_PROCESSES
+from mcp_snapshot import write_processes
 
 def get_processes_from_mcp():
     """
-    Получает список бизнес-процессов с MCP сервера.
+    Получает бизнес-процессы с MCP сервера.
+    
+    Процессы отдаются по одному по мере получения с сервера, поэтому
+    каталог не загружается в память целиком. Ответы сервера кэшируются
+    на диске (см. mcp_cache.py): если каталог не изменился, сервер отвечает
+    304 и данные берутся из кэша. Если модуль requests не установлен,
+    возвращаются демонстрационные данные.
     
     Returns:
-        list: Список бизнес-процессов или None в случае ошибки
+        iterable: Бизнес-процессы (итератор) или None в случае ошибки
     """
     try:
-        # Это реальная версия, которая требует модуль requests
-        # Раскомментируйте, если у вас установлен модуль requests
-        
-        # import requests
-        # url = f"{get_mcp_url()}/processes/"
-        # headers = get_mcp_headers()
-        # 
-        # print(f"Получение списка бизнес-процессов с: {url}")
-        # response = requests.get(url, headers=headers, timeout=10)
-        # 
-        # if response.status_code == 200:
-        #     return response.json()
-        # else:
-        #     print(f"Ошибка: {response.status_code} - {response.text}")
-        #     return None
+        try:
+            from mcp_cache import TemplateCache
+        except ImportError:
+            return get_mock_processes()
         
-        # Mock версия для демонстрации (так как requests не установлен)
-        print(f"Получение списка бизнес-процессов с: {get_mcp_url()}/processes/")
-        print("Используются заголовки авторизации из config.json")
+        cache = TemplateCache()
+        print(f"Получение списка бизнес-процессов с: {cache.client.url('processes/')}")
+        processes = cache.iter_processes()
         
-        # Возвращаем mock данные, основанные на документации
-        return [
-            {
-                "id": 1,
-                "name": "Обработка заявки",
-                "description": "Тестовый бизнес-процесс обработки заявки с тремя этапами",
-                "tasks": [
-                    {
-                        "id": 1,
-                        "name": "Создание заявки",
-                        "order": 1,
-                        "description": "Первый этап процесса - создание заявки с указанием основных данных"
-                    },
-                    {
-                        "id": 2,
-                        "name": "Рассмотрение заявки", 
-                        "order": 2,
-                        "description": "Второй этап - рассмотрение созданной заявки и принятие решения"
-                    },
-                    {
-                        "id": 3,
-                        "name": "Утверждение заявки",
-                        "order": 3,
-                        "description": "Финальный этап - утверждение заявки на основе решения"
-                    }
-                ],
-                "document_types": [
-                    {
-                        "id": 1,
-                        "name": "Заявка",
-                        "fields": [
-                            {"name": "номер", "type": "строка", "required": True},
-                            {"name": "дата", "type": "дата", "required": True},
-                            {"name": "название", "type": "строка", "required": True},
-                            {"name": "описание", "type": "текст", "required": False}
-                        ]
-                    },
-                    {
-                        "id": 2,
-                        "name": "Решение по заявке",
-                        "fields": [
-                            {"name": "номер", "type": "строка", "required": True},
-                            {"name": "дата", "type": "дата", "required": True},
-                            {"name": "решение", "type": "текст", "required": True},
-                            {"name": "комментарий", "type": "текст", "required": False}
-                        ]
-                    },
-                    {
-                        "id": 3,
-                        "name": "Утверждение заявки",
-                        "fields": [
-                            {"name": "номер", "type": "строка", "required": True},
-                            {"name": "дата", "type": "дата", "required": True},
-                            {"name": "утверждено", "type": "булево", "required": True},
-                            {"name": "комментарий", "type": "текст", "required": False}
-                        ]
-                    }
-                ]
-            }
-        ]
+        # Первый процесс получаем сразу, чтобы ошибки соединения
+        # обнаружились здесь, а не во время вывода
+        first = next(processes, None)
+        if first is None:
+            return []
+        return itertools.chain([first], processes)
         
     except Exception as e:
         print(f"Ошибка при получении бизнес-процессов: {e}")
         return None
 
-def display_process_info(processes):
+def get_mock_processes():
     """
-    Отображает информацию о бизнес-процессах в удобочитаемом формате.
+    Возвращает демонстрационные данные, основанные на документации
+    (те же, что отдает сервер-заглушка mcp_fake_server).
     
-    Args:
-        processes (list): Список бизнес-процессов
+    Returns:
+        list: Список бизнес-процессов
     """
-    if not processes:
-        print("Нет доступных бизнес-процессов.")
-        return
+    print(f"Получение списка бизнес-процессов с: {get_mcp_url()}/processes/")
+    print("Модуль requests не установлен, используются демонстрационные данные")
     
-    print("\n" + "=" * 80)
-    print("ДОСТУПНЫЕ ШАБЛОНЫ БИЗНЕС-ПРОЦЕССОВ В MCP")
-    print("=" * 80)
+    return copy.deepcopy(SEED_PROCESSES)
+
+def display_process_info(processes, fmt="text", filters=None, summary_only=False):
+    """
+    Отображает информацию о бизнес-процессах в удобочитаемом формате.
     
-    for i, process in enumerate(processes, 1):
-        print(f"\n{i}. {process['name']}")
-        print(f"   ID: {process['id']}")
-        print(f"   Описание: {process['description']}")
-        
-        print(f"\n   Задачи ({len(process['tasks'])}):")
-        for task in process['tasks']:
-            print(f"     - {task['name']} (ID: {task['id']}, Порядок: {task['order']})")
-            print(f"       {task['description']}")
-        
-        print(f"\n   Типы документов ({len(process['document_types'])}):")
-        for doc_type in process['document_types']:
-            print(f"     - {doc_type['name']} (ID: {doc_type['id']})")
-            print(f"       Поля: {', '.join([f'{field['name']} ({field['type']})' for field in doc_type['fields']])}")
+    Процессы выводятся по мере поступления, поэтому можно передавать
+    итератор (например, из get_processes_from_mcp()). Вывод идет через
+    буфер (см. mcp_report.py).
+    
+    Args:
+        processes (iterable): Бизнес-процессы
+        fmt (str): Формат: "text", "table", "ndjson" или "csv"
+        filters (callable): Отбор процессов (например, mcp_report.ProcessFilter)
+        summary_only (bool): Выводить только итоги
+    
+    Returns:
+        ReportTotals: Итоги по выведенным процессам
+    """
+    return render(processes, fmt=fmt, filters=filters, summary_only=summary_only)
 
-def save_process_info_to_file(processes, filename="mcp_processes_info.json"):
+def save_process_info_to_file(processes, filename="mcp_processes_info.json", fmt="json", compress=None):
     """
     Сохраняет информацию о бизнес-процессах в файл.
     
+    Процессы записываются по одному во временный файл, который затем
+    атомарно заменяет предыдущий снимок (см. mcp_snapshot.py). Можно
+    передавать итератор — весь каталог в памяти не собирается.
+    
     Args:
-        processes (list): Список бизнес-процессов
+        processes (iterable): Бизнес-процессы
         filename (str): Имя файла для сохранения
+        fmt (str): Формат: "json" (с отступами), "compact" или "ndjson"
+        compress (bool): Сжать gzip (по умолчанию — если имя оканчивается на .gz)
     """
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(processes, f, ensure_ascii=False, indent=2)
+        write_processes(processes, filename, fmt=fmt, compress=compress)
         print(f"\nИнформация о бизнес-процессах сохранена в файл: {filename}")
     except Exception as e:
         print(f"Ошибка при сохранении в файл: {e}")
@@ -154,19 +106,28 @@ if __name__ == '__main__':
     # Получаем информацию о бизнес-процессах
     processes = get_processes_from_mcp()
     
-    if processes:
-        # Отображаем информацию
-        display_process_info(processes)
-        
-        # Сохраняем в файл
-        save_process_info_to_file(processes)
+    if processes is not None:
+        # Отображаем информацию и сохраняем в файл за один проход,
+        # итоги считаются там же
+        report = ReportRenderer()
+        save_process_info_to_file(report.tee(processes))
+        totals = report.close()
         
         print("\n" + "=" * 80)
         print("ИНФОРМАЦИЯ О ШАБЛОНАХ БИЗНЕС-ПРОЦЕССОВ")
         print("=" * 80)
-        print(f"Всего доступно бизнес-процессов: {len(processes)}")
-        print(f"Общее количество задач: {sum(len(p['tasks']) for p in processes)}")
-        print(f"Общее количество типов документов: {sum(len(p['document_types']) for p in processes)}")
+        print(f"Всего доступно бизнес-процессов: {totals.processes}")
+        print(f"Общее количество задач: {totals.tasks}")
+        print(f"Общее количество типов документов: {totals.document_types}")
+        
+        try:
+            from mcp_metrics import dump_metrics_file
+        except ImportError:
+            # Без requests запросов к серверу не было
+            dump_metrics_file = None
+        metrics_file = dump_metrics_file() if dump_metrics_file else None
+        if metrics_file:
+            print(f"Метрики запросов сохранены в файл: {metrics_file}")
         
         # Показываем, как использовать эту информацию в коде
         print("\n" + "=" * 80)
@@ -174,22 +135,19 @@ if __name__ == '__main__':
         print("=" * 80)
         print("""
 # Пример использования в Django представлении или сервисе
-from mcp_config import get_mcp_url, get_mcp_headers
-import requests
-
-def get_process_by_id(process_id):
-    url = f"{get_mcp_url()}/processes/{process_id}/"
-    headers = get_mcp_headers()
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    return None
+# Запросы идут через общий пул соединений mcp_client
+from mcp_client import get_process_by_id
 
 # Получение конкретного процесса
 process = get_process_by_id(1)
 if process:
     print(f"Найден процесс: {process['name']}")
     print(f"Задачи: {len(process['tasks'])}")
+
+# Получение нескольких процессов параллельными запросами (не более 8 одновременно)
+from mcp_async import fetch_processes
+
+processes = fetch_processes([1, 2, 3], concurrency=8, timeout=10)
 """)
     else:
         print("Не удалось получить информацию о бизнес-процессах.")
@@ -0,0 +1,116 @@
+"""
+Асинхронное получение шаблонов бизнес-процессов с MCP сервера.
+
+Запросы GET {url}/processes/{id}/ выполняются параллельно, но не более
+concurrency одновременно. Сами HTTP запросы идут через пул соединений
+mcp_client в отдельных потоках, поэтому дополнительные зависимости
+(aiohttp и т.п.) не нужны. Повторяющиеся ID запрашиваются один раз, а
+одновременные запросы одного ID из разных потоков объединяет MCPClient
+(см. mcp_singleflight.py).
+
+Пример:
+    from mcp_async import fetch_processes
+
+    processes = fetch_processes([1, 2, 3], concurrency=8)
+"""
+
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+
+from mcp_client import MCPClient, get_client
+from mcp_singleflight import AsyncSingleFlight
+
+DEFAULT_CONCURRENCY = 8
+
+async def _fetch_one(flights, loop, executor, semaphore, client, process_id, timeout):
+    # Повторный ID не занимает ни слот семафора, ни поток. Таймаут считается
+    # внутри _request() с момента получения слота — ожидание слота в него не входит
+    key = ('GET', client.url(f"processes/{process_id}/"))
+    return await flights.do(key, partial(_request, loop, executor, semaphore, client, process_id, timeout))
+
+async def _request(loop, executor, semaphore, client, process_id, timeout):
+    async with semaphore:
+        kwargs = {}
+        if timeout is not None:
+            # Ограничиваем и сам HTTP запрос, чтобы поток не висел после таймаута
+            kwargs['timeout'] = (client.timeout[0], timeout)
+        call = partial(client.get_process, process_id, **kwargs)
+        return await asyncio.wait_for(loop.run_in_executor(executor, call), timeout)
+
+async def fetch_processes_async(process_ids, concurrency=DEFAULT_CONCURRENCY, timeout=None,
+                                client=None, return_exceptions=False):
+    """
+    Параллельно получает шаблоны бизнес-процессов по списку ID.
+
+    Args:
+        process_ids (iterable): ID бизнес-процессов
+        concurrency (int): Максимальное число одновременных запросов
+        timeout (float): Таймаут одного запроса в секундах (None — таймауты клиента)
+        client (MCPClient): Клиент (по умолчанию общий клиент mcp_client)
+        return_exceptions (bool): Возвращать исключения вместо None для неудачных запросов
+
+    Returns:
+        list: Результаты в том же порядке, что и process_ids. Для процессов,
+        которые не удалось получить, — None (или исключение при return_exceptions=True)
+    """
+    process_ids = list(process_ids)
+    if not process_ids:
+        return []
+
+    own_client = None
+    if client is None:
+        client = get_client()
+        if client.pool_size < concurrency:
+            # Пул общего клиента меньше требуемого параллелизма
+            client = own_client = MCPClient(pool_size=concurrency)
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    # Объединение только в пределах вызова: запросы привязаны к его семафору и потокам
+    flights = AsyncSingleFlight(clone=copy.deepcopy)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='mcp-fetch')
+    try:
+        results = await asyncio.gather(
+            *(_fetch_one(flights, loop, executor, semaphore, client, process_id, timeout)
+              for process_id in process_ids),
+            return_exceptions=True,
+        )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if own_client is not None:
+            own_client.close()
+
+    if return_exceptions:
+        return results
+
+    for process_id, result in zip(process_ids, results):
+        if isinstance(result, (asyncio.TimeoutError, TimeoutError)):
+            print(f"✗ Таймаут при получении бизнес-процесса {process_id}")
+        elif isinstance(result, requests.exceptions.RequestException):
+            print(f"✗ Ошибка при получении бизнес-процесса {process_id}: {result}")
+        elif isinstance(result, BaseException):
+            raise result
+    return [None if isinstance(result, BaseException) else result for result in results]
+
+def fetch_processes(process_ids, concurrency=DEFAULT_CONCURRENCY, timeout=None,
+                    client=None, return_exceptions=False):
+    """
+    Синхронная обертка над fetch_processes_async() для CLI скриптов.
+
+    Нельзя вызывать из уже запущенного цикла событий asyncio —
+    в этом случае используйте fetch_processes_async().
+
+    Returns:
+        list: Результаты в том же порядке, что и process_ids
+    """
+    return asyncio.run(fetch_processes_async(
+        process_ids,
+        concurrency=concurrency,
+        timeout=timeout,
+        client=client,
+        return_exceptions=return_exceptions,
+    ))
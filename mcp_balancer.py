@@ -0,0 +1,287 @@
+"""
+Балансировка запросов между несколькими репликами MCP сервера.
+
+Если в разделе "pdm" конфигурации задан список "urls", MCPClient
+распределяет запросы между репликами:
+
+- "least_outstanding" (по умолчанию) — реплика с наименьшим числом
+  выполняющихся запросов, при равенстве — случайная из лучших;
+- "ewma" — с учетом задержки: минимум EWMA задержки × (выполняющихся + 1).
+  Медленная реплика получает меньше запросов, пока не ускорится;
+- "round_robin" — по очереди, без учета нагрузки (для сравнения).
+
+Пассивная проверка здоровья: после eject_after ошибок подряд (нет
+соединения, таймаут, ответ 5xx) реплика исключается на eject_time секунд;
+при повторных исключениях подряд время удваивается (не больше
+max_eject_time). По истечении времени реплика снова получает запросы,
+первый же успешный ответ сбрасывает счетчик ошибок.
+
+Активная проверка: пока реплика исключена, раз в probe_interval секунд
+выполняется ping (GET корневого URL, как в test_mcp_connection.py). Ответ
+200 возвращает реплику раньше срока, ошибка продлевает исключение.
+
+Если исключены все реплики, запрос идет на ту, что вернется раньше всех, —
+клиент не отказывает, не попробовав.
+
+Пример конфигурации:
+{
+  "pdm": {
+    "url": "http://pdm-1:8001/mcp",
+    "urls": ["http://pdm-1:8001/mcp", "http://pdm-2:8001/mcp"],
+    "balancer": {"strategy": "least_outstanding", "eject_after": 3, "eject_time": 10}
+  }
+}
+"""
+
+import random
+import threading
+import time
+
+STRATEGIES = ('least_outstanding', 'ewma', 'round_robin')
+# Ответы, после которых реплика считается неисправной (429 — это не неисправность)
+UNHEALTHY_STATUSES = frozenset((500, 502, 503, 504))
+
+class Endpoint:
+    """Реплика MCP сервера и ее состояние в балансировщике."""
+
+    __slots__ = ('url', 'outstanding', 'ewma', 'failures', 'ejected_until', 'ejections',
+                 'streak', 'requests', 'errors', '_probe')
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.outstanding = 0
+        # EWMA задержки в секундах (None — ответов еще не было)
+        self.ewma = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        # Сколько раз подряд реплику исключали без успешного ответа между исключениями
+        self.streak = 0
+        self.requests = 0
+        self.errors = 0
+        self._probe = None
+
+    def ejected(self, now=None):
+        """bool: Исключена ли реплика сейчас."""
+        return self.ejected_until > (time.monotonic() if now is None else now)
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'outstanding': self.outstanding,
+            'ewma_ms': round(self.ewma * 1000, 3) if self.ewma is not None else None,
+            'healthy': not self.ejected(),
+            'requests': self.requests,
+            'errors': self.errors,
+            'ejections': self.ejections,
+        }
+
+    def __repr__(self):
+        return f"Endpoint({self.url!r})"
+
+class Balancer:
+    """
+    Выбор реплики для запроса и пассивная/активная проверка здоровья.
+
+    Пример:
+        balancer = Balancer(["http://pdm-1:8001/mcp", "http://pdm-2:8001/mcp"])
+        endpoint = balancer.acquire()
+        try:
+            response = session.get(f"{endpoint.url}/processes/1/")
+        except requests.RequestException:
+            balancer.release(endpoint, error=True)
+            raise
+        balancer.release(endpoint, response.elapsed.total_seconds(), status=response.status_code)
+
+    Args:
+        urls (list): Базовые URL реплик
+        strategy (str): "least_outstanding", "ewma" или "round_robin"
+        eject_after (int): Сколько ошибок подряд исключают реплику
+        eject_time (float): На сколько секунд исключать, секунды
+        max_eject_time (float): Максимальное время исключения, секунды
+        ewma_decay (float): Вес нового ответа в EWMA задержки (0..1)
+        probe (callable): Функция url -> bool для активной проверки (None — без нее)
+        probe_interval (float): Как часто проверять исключенную реплику, секунды
+    """
+
+    def __init__(self, urls, strategy='least_outstanding', eject_after=3, eject_time=10.0,
+                 max_eject_time=60.0, ewma_decay=0.3, probe=None, probe_interval=2.0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия балансировки: {strategy}. Доступные: {', '.join(STRATEGIES)}")
+        if not urls:
+            raise ValueError("Не задано ни одного адреса MCP сервера")
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_time = eject_time
+        self.max_eject_time = max_eject_time
+        self.ewma_decay = ewma_decay
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self.endpoints = [Endpoint(url) for url in urls]
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self._next = 0
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, pdm, urls, probe=None):
+        """
+        Создает балансировщик из раздела "pdm.balancer" конфигурации.
+
+        Returns:
+            Balancer: Балансировщик для списка urls
+        """
+        return cls(urls, probe=probe, **(pdm.get('balancer') or {}))
+
+    @property
+    def urls(self):
+        """list: Базовые URL реплик."""
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def set_urls(self, urls):
+        """
+        Заменяет список реплик; у оставшихся реплик состояние сохраняется.
+
+        Args:
+            urls (list): Новые базовые URL реплик
+        """
+        with self._lock:
+            current = {endpoint.url: endpoint for endpoint in self.endpoints}
+            self.endpoints = [current.get(url.rstrip('/')) or Endpoint(url) for url in urls]
+
+    def _score(self, endpoint, default_ewma=None):
+        if self.strategy == 'ewma':
+            # Реплике без истории (например, добавленной через set_urls) берем
+            # среднюю задержку остальных, иначе ее оценка равна 0 и она получает
+            # все одновременные запросы до первого ответа
+            ewma = endpoint.ewma if endpoint.ewma is not None else default_ewma
+            if ewma is None:
+                return endpoint.outstanding
+            return ewma * (endpoint.outstanding + 1)
+        return endpoint.outstanding
+
+    def acquire(self):
+        """
+        Выбирает реплику для запроса и учитывает его как выполняющийся.
+
+        Returns:
+            Endpoint: Реплика; после ответа вызовите release()
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if not endpoint.ejected(now)]
+            if not candidates:
+                # Исключены все — идем к той, что вернется раньше всех
+                candidates = [min(self.endpoints, key=lambda endpoint: endpoint.ejected_until)]
+            if self.strategy == 'round_robin':
+                endpoint = candidates[self._next % len(candidates)]
+                self._next += 1
+            else:
+                known = [endpoint.ewma for endpoint in candidates if endpoint.ewma is not None]
+                default_ewma = sum(known) / len(known) if known else None
+                scores = [self._score(endpoint, default_ewma) for endpoint in candidates]
+                best = min(scores)
+                endpoint = self._random.choice([e for e, score in zip(candidates, scores) if score == best])
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint, elapsed=None, error=False, status=None):
+        """
+        Учитывает завершение запроса к реплике.
+
+        Args:
+            endpoint (Endpoint): Реплика из acquire()
+            elapsed (float): Задержка ответа, секунды (None — не учитывать)
+            error (bool): Запрос не выполнен (нет соединения, таймаут)
+            status (int): Код ответа; 5xx считается ошибкой реплики
+        """
+        failed = error or status in UNHEALTHY_STATUSES
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if elapsed is not None and not error:
+                if endpoint.ewma is None:
+                    endpoint.ewma = elapsed
+                else:
+                    endpoint.ewma += self.ewma_decay * (elapsed - endpoint.ewma)
+            if not failed:
+                endpoint.failures = 0
+                endpoint.streak = 0
+                return
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.failures < self.eject_after or endpoint.ejected():
+                return
+            self._eject(endpoint)
+
+    def _eject(self, endpoint):
+        # Вызывается под self._lock
+        duration = min(self.max_eject_time, self.eject_time * (2 ** endpoint.streak))
+        endpoint.streak += 1
+        endpoint.ejections += 1
+        endpoint.failures = 0
+        endpoint.ejected_until = time.monotonic() + duration
+        if self.probe is not None and endpoint._probe is None and not self._closed:
+            self._schedule_probe(endpoint)
+
+    def _schedule_probe(self, endpoint):
+        timer = threading.Timer(self.probe_interval, self._run_probe, (endpoint,))
+        timer.daemon = True
+        endpoint._probe = timer
+        timer.start()
+
+    def _run_probe(self, endpoint):
+        try:
+            healthy = bool(self.probe(endpoint.url))
+        except Exception:
+            healthy = False
+        with self._lock:
+            endpoint._probe = None
+            if self._closed or not endpoint.ejected():
+                return
+            if healthy:
+                # Реплика ответила на ping — возвращаем раньше срока
+                endpoint.ejected_until = 0.0
+                return
+            endpoint.ejected_until = max(endpoint.ejected_until, time.monotonic() + self.probe_interval)
+            self._schedule_probe(endpoint)
+
+    def check(self):
+        """
+        Выполняет активную проверку всех реплик сейчас.
+
+        Исправные исключенные реплики возвращаются, неисправные исключаются.
+
+        Returns:
+            dict: URL реплики → True, если она ответила на ping
+        """
+        if self.probe is None:
+            raise ValueError("Для активной проверки нужна функция probe")
+        results = {}
+        for endpoint in list(self.endpoints):
+            try:
+                healthy = bool(self.probe(endpoint.url))
+            except Exception:
+                healthy = False
+            results[endpoint.url] = healthy
+            with self._lock:
+                if healthy:
+                    endpoint.ejected_until = 0.0
+                    endpoint.failures = 0
+                elif not endpoint.ejected():
+                    self._eject(endpoint)
+        return results
+
+    def stats(self):
+        """list: Состояние реплик (см. Endpoint.to_dict())."""
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self.endpoints]
+
+    def close(self):
+        """Останавливает активные проверки."""
+        with self._lock:
+            self._closed = True
+            for endpoint in self.endpoints:
+                if endpoint._probe is not None:
+                    endpoint._probe.cancel()
+                    endpoint._probe = None
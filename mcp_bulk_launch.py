@@ -0,0 +1,382 @@
+"""
+Массовый запуск экземпляров бизнес-процессов через MCP сервер.
+
+Каждый экземпляр создается запросом POST {url}/process-instances/, но запросы
+отправляются параллельно через общий пул соединений mcp_client:
+- число одновременных запросов подстраивается под сервер (AIMD): растет
+  на единицу, пока ответы быстрые, и уменьшается вдвое, когда сервер
+  отвечает 429/5xx или время ответа заметно растет;
+- ответы 429/5xx и сетевые ошибки повторяются с экспоненциальной
+  задержкой со случайным разбросом (с учетом заголовка Retry-After);
+- у каждого экземпляра есть ключ идемпотентности (заголовок Idempotency-Key):
+  поле "idempotency_key" данных экземпляра или ключ из ID пачки и номера
+  экземпляра в ней. Ключ один для всех повторов запроса, поэтому повтор не
+  создаст дубликат, а одинаковые данные в пачке — это разные экземпляры.
+  Чтобы дозапустить прерванную пачку без дубликатов, передайте ее ID
+  (--batch-id, выводится в статистике).
+
+Запуск:
+python mcp_bulk_launch.py instances.json           # JSON массив или NDJSON (можно .gz)
+python mcp_bulk_launch.py --count 1000 --process-id 1
+python mcp_bulk_launch.py instances.json --batch-id 3f2b...   # дозапуск прерванной пачки
+"""
+
+import argparse
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+
+from mcp_client import MCPClient, get_client
+from mcp_snapshot import read_processes
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+# Задержка перед повтором: случайная в пределах base * 2^попытка, но не больше cap
+DEFAULT_BACKOFF_BASE = 0.2
+DEFAULT_BACKOFF_CAP = 10.0
+# Во сколько раз время ответа должно превысить минимальное, чтобы снизить параллелизм
+DEFAULT_LATENCY_FACTOR = 3.0
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Поле данных экземпляра с явным ключом идемпотентности (на сервер не отправляется)
+IDEMPOTENCY_FIELD = 'idempotency_key'
+INSTANCES_PATH = 'process-instances/'
+
+def idempotency_key(batch_id, index):
+    """
+    Вычисляет ключ идемпотентности экземпляра по ID пачки и его номеру в ней.
+
+    Ключ не зависит от содержимого: одинаковые данные под разными номерами —
+    разные экземпляры. Повторы запроса и повторный запуск пачки с тем же
+    batch_id дают тот же ключ и не создают дубликатов.
+
+    Args:
+        batch_id (str): ID пачки (см. BulkLauncher.run())
+        index (int): Номер экземпляра в пачке, начиная с 1
+
+    Returns:
+        str: UUID5 от ID пачки и номера
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"process-instance:{batch_id}:{index}"))
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF_BASE, cap=DEFAULT_BACKOFF_CAP, rng=random):
+    """
+    Задержка перед повтором с экспоненциальным ростом и полным случайным разбросом.
+
+    Args:
+        attempt (int): Номер повтора, начиная с 0
+
+    Returns:
+        float: Задержка в секундах
+    """
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+def retry_after(response):
+    """
+    Задержка из заголовка Retry-After ответа.
+
+    Returns:
+        float: Задержка в секундах или None, если заголовка нет или он в формате HTTP-даты
+    """
+    value = response.headers.get('Retry-After')
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        # Retry-After в формате HTTP-даты не поддерживаем — используем свою задержку
+        return None
+
+class AdaptiveLimiter:
+    """
+    Ограничитель числа одновременных запросов с аддитивным ростом
+    и мультипликативным снижением лимита (AIMD).
+    """
+
+    def __init__(self, initial=DEFAULT_INITIAL_CONCURRENCY, minimum=1,
+                 maximum=DEFAULT_MAX_CONCURRENCY, latency_factor=DEFAULT_LATENCY_FACTOR):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self.peak = int(self.limit)
+        self._min_latency = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Ждет, пока число запросов в работе не станет меньше лимита."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self, latency):
+        """Учитывает успешный ответ: при нормальной задержке лимит растет на 1 за "окно"."""
+        with self._condition:
+            if self._min_latency is None or latency < self._min_latency:
+                self._min_latency = latency
+            if latency > self._min_latency * self.latency_factor:
+                self._decrease()
+                return
+            previous = int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            if int(self.limit) > previous:
+                self.peak = max(self.peak, int(self.limit))
+                self._condition.notify()
+
+    def on_overload(self):
+        """Учитывает 429/5xx или сетевую ошибку: лимит снижается вдвое."""
+        with self._condition:
+            self._decrease()
+
+    def _decrease(self):
+        # Ответы на уже отправленные запросы приходят пачкой — снижаем не чаще раза за период
+        now = time.monotonic()
+        cooldown = self._min_latency or 0.0
+        if now - self._last_decrease >= cooldown:
+            self.limit = max(float(self.minimum), self.limit / 2)
+            self._last_decrease = now
+
+class LaunchStats:
+    """Статистика массового запуска."""
+
+    def __init__(self):
+        self.batch_id = None
+        self.total = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.throttled = 0
+        self.elapsed = 0.0
+        self.peak_concurrency = 0
+        self.final_concurrency = 0
+        self.latencies = []
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def record_success(self, latency):
+        with self._lock:
+            self.succeeded += 1
+            self.latencies.append(latency)
+
+    def record_failure(self, index, payload, error):
+        with self._lock:
+            self.failed += 1
+            self.failures.append((index, payload, error))
+
+    def record_retry(self, throttled):
+        with self._lock:
+            self.retries += 1
+            if throttled:
+                self.throttled += 1
+
+    @property
+    def throughput(self):
+        """float: Успешно созданных экземпляров в секунду."""
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, q):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def print(self):
+        print("=" * 60)
+        print(f"Пачка: {self.batch_id}")
+        print(f"Отправлено экземпляров: {self.total}")
+        print(f"Создано: {self.succeeded}, ошибок: {self.failed}")
+        print(f"Повторов: {self.retries} (из них 429: {self.throttled})")
+        print(f"Время: {self.elapsed:.2f} с, скорость: {self.throughput:.1f} экз/с")
+        print(f"Время ответа: p50 {self.percentile(50) * 1000:.1f} мс, "
+              f"p95 {self.percentile(95) * 1000:.1f} мс, p99 {self.percentile(99) * 1000:.1f} мс")
+        print(f"Одновременных запросов: максимум {self.peak_concurrency}, в конце {self.final_concurrency}")
+        for index, payload, error in self.failures[:10]:
+            print(f"  ✗ #{index} {payload.get('name', '')}: {error}")
+        if len(self.failures) > 10:
+            print(f"  ... и еще {len(self.failures) - 10}")
+        if self.failed:
+            print(f"Дозапуск без дубликатов: повторите запуск с --batch-id {self.batch_id}")
+        print("=" * 60)
+
+class BulkLauncher:
+    """
+    Параллельно создает экземпляры процессов с повторами и адаптивным параллелизмом.
+
+    Пример:
+        launcher = BulkLauncher(max_concurrency=32)
+        stats = launcher.run(payloads)
+        stats.print()
+    """
+
+    def __init__(self, client=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 initial_concurrency=DEFAULT_INITIAL_CONCURRENCY, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_cap=DEFAULT_BACKOFF_CAP,
+                 latency_factor=DEFAULT_LATENCY_FACTOR):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = initial_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.latency_factor = latency_factor
+
+    def _send(self, client, limiter, stats, batch_id, index, payload):
+        attempt = 0
+        try:
+            key = payload.get(IDEMPOTENCY_FIELD)
+            if key is not None:
+                payload = {name: value for name, value in payload.items() if name != IDEMPOTENCY_FIELD}
+            headers = {IDEMPOTENCY_HEADER: str(key) if key is not None else idempotency_key(batch_id, index)}
+            while True:
+                started = time.perf_counter()
+                delay = None
+                try:
+                    response = client.post(INSTANCES_PATH, json=payload, headers=headers)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    error, throttled = e, False
+                except requests.exceptions.RequestException as e:
+                    # Прочие ошибки requests (например, неверный URL) повтор не исправит
+                    stats.record_failure(index, payload, e)
+                    return
+                else:
+                    latency = time.perf_counter() - started
+                    # 409 — экземпляр с этим ключом уже создан предыдущей попыткой
+                    if response.status_code < 300 or response.status_code == 409:
+                        limiter.on_success(latency)
+                        stats.record_success(latency)
+                        return
+                    if response.status_code not in RETRY_STATUSES:
+                        stats.record_failure(index, payload, f"HTTP {response.status_code}: {response.text[:200]}")
+                        return
+                    error, throttled = f"HTTP {response.status_code}", response.status_code == 429
+                    delay = retry_after(response)
+
+                limiter.on_overload()
+                if attempt >= self.max_retries:
+                    stats.record_failure(index, payload, error)
+                    return
+                stats.record_retry(throttled)
+                if delay is None:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                time.sleep(delay)
+                attempt += 1
+        finally:
+            limiter.release()
+
+    def run(self, payloads, batch_id=None):
+        """
+        Создает экземпляры процессов.
+
+        Данные читаются из payloads по мере освобождения мест, поэтому
+        можно передавать генератор на миллионы записей.
+
+        Args:
+            payloads (iterable): Данные экземпляров (dict) для POST /process-instances/
+            batch_id (str): ID пачки для ключей идемпотентности; чтобы дозапустить
+                прерванную пачку без дубликатов, передайте ID из ее статистики
+                (None — новая пачка)
+
+        Returns:
+            LaunchStats: Статистика запуска
+        """
+        client = own_client = None
+        if self.client is not None:
+            client = self.client
+        else:
+            client = get_client()
+            if client.pool_size < self.max_concurrency:
+                # Пул общего клиента меньше требуемого параллелизма
+                client = own_client = MCPClient(pool_size=self.max_concurrency)
+
+        limiter = AdaptiveLimiter(self.initial_concurrency, maximum=self.max_concurrency,
+                                  latency_factor=self.latency_factor)
+        stats = LaunchStats()
+        stats.batch_id = batch_id = batch_id or uuid.uuid4().hex
+
+        def check(future, index, payload):
+            # Исключение, не учтенное в _send(), — тоже ошибка экземпляра
+            error = future.exception()
+            if error is not None:
+                stats.record_failure(index, payload, error)
+
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='mcp-launch')
+        try:
+            for index, payload in enumerate(payloads, 1):
+                limiter.acquire()
+                stats.total += 1
+                try:
+                    future = executor.submit(self._send, client, limiter, stats, batch_id, index, payload)
+                except BaseException:
+                    limiter.release()
+                    raise
+                future.add_done_callback(partial(check, index=index, payload=payload))
+        finally:
+            executor.shutdown(wait=True)
+            if own_client is not None:
+                own_client.close()
+        stats.elapsed = time.perf_counter() - started
+        stats.peak_concurrency = limiter.peak
+        stats.final_concurrency = int(limiter.limit)
+        return stats
+
+def generate_payloads(count, process_id=1, name="Обработка заявки"):
+    """
+    Генерирует данные экземпляров процесса для запуска.
+
+    Yields:
+        dict: Данные экземпляра
+    """
+    for number in range(1, count + 1):
+        yield {
+            "process_id": process_id,
+            "name": f"{name} #{number}",
+            "description": "Экземпляр процесса из массового запуска",
+        }
+
+def launch(payloads, batch_id=None, **kwargs):
+    """
+    Создает экземпляры процессов и выводит статистику.
+
+    Args:
+        payloads (iterable): Данные экземпляров
+        batch_id (str): ID пачки (см. BulkLauncher.run())
+        **kwargs: Параметры BulkLauncher
+
+    Returns:
+        LaunchStats: Статистика запуска
+    """
+    stats = BulkLauncher(**kwargs).run(payloads, batch_id)
+    stats.print()
+    return stats
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Массовый запуск экземпляров бизнес-процессов")
+    parser.add_argument('file', nargs='?', help="Файл с данными экземпляров (JSON массив или NDJSON)")
+    parser.add_argument('--count', type=int, default=100, help="Сколько экземпляров сгенерировать, если файл не указан")
+    parser.add_argument('--process-id', type=int, default=1)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help="Максимальное число одновременных запросов")
+    parser.add_argument('--retries', type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument('--batch-id', default=None, help="ID прерванной пачки для дозапуска без дубликатов")
+    args = parser.parse_args()
+
+    if args.file:
+        source = read_processes(args.file)
+    else:
+        source = generate_payloads(args.count, process_id=args.process_id)
+    stats = launch(source, batch_id=args.batch_id, max_concurrency=args.concurrency, max_retries=args.retries)
+    raise SystemExit(1 if stats.failed else 0)
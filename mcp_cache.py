@@ -0,0 +1,217 @@
+"""
+Локальный кэш ответов MCP сервера с условной перепроверкой (ETag / Last-Modified).
+
+Ответы на GET запросы (каталог /processes/, шаблоны /processes/{id}/)
+сохраняются на диск вместе с заголовками ETag и Last-Modified. Пока запись
+свежая (моложе ttl), она отдается с диска без обращения к серверу. Когда срок
+истекает, отправляется условный запрос (If-None-Match / If-Modified-Since);
+на ответ 304 сервер не передает тело и запись отдается с диска.
+
+В режиме stale-while-revalidate устаревшая запись сразу отдается с диска,
+а перепроверка выполняется в фоновом потоке.
+
+Параметры берутся из раздела "pdm.cache" конфигурации:
+- dir — каталог кэша (по умолчанию .mcp_cache рядом с mcp_config.py);
+- ttl — сколько секунд запись считается свежей (по умолчанию 300);
+- stale_while_revalidate — сколько секунд после ttl можно отдавать
+  устаревшую запись, перепроверяя её в фоне (по умолчанию 0 — выключено).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+import mcp_codec
+from mcp_client import STREAM_CHUNK_SIZE, get_client
+from mcp_config import get_config
+from mcp_json import iter_json_array
+from mcp_singleflight import SingleFlight
+from mcp_snapshot import atomic_write
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.mcp_cache')
+DEFAULT_TTL = 300
+DEFAULT_STALE_WHILE_REVALIDATE = 0
+
+class TemplateCache:
+    """
+    Кэш ответов MCP сервера на диске с перепроверкой по ETag / Last-Modified.
+
+    Каждый ответ хранится в двух файлах каталога кэша: <ключ>.body (тело
+    ответа как есть) и <ключ>.meta.json (URL, ETag, Last-Modified, время
+    последней проверки). Файлы заменяются атомарно.
+    """
+
+    def __init__(self, client=None, cache_dir=None, ttl=None, stale_while_revalidate=None):
+        settings = {}
+        if cache_dir is None or ttl is None or stale_while_revalidate is None:
+            settings = get_config().get('pdm', {}).get('cache', {})
+        self.client = client or get_client()
+        self.cache_dir = cache_dir or settings.get('dir', DEFAULT_CACHE_DIR)
+        self.ttl = settings.get('ttl', DEFAULT_TTL) if ttl is None else ttl
+        if stale_while_revalidate is None:
+            stale_while_revalidate = settings.get('stale_while_revalidate', DEFAULT_STALE_WHILE_REVALIDATE)
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stats = {'hits': 0, 'stale': 0, 'not_modified': 0, 'fetched': 0}
+        self._lock = threading.Lock()
+        self._revalidating = set()
+        # Когда кэш пуст, одновременные запросы одного адреса ждут один запрос к серверу
+        self._flights = SingleFlight()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _count(self, name):
+        # Кэш используется из нескольких потоков: += без блокировки теряет обновления
+        with self._lock:
+            self.stats[name] += 1
+
+    def _key(self, path, params):
+        resource = self.client.url(path)
+        if params:
+            resource += '?' + urlencode(sorted(params.items()))
+        return resource, hashlib.sha1(resource.encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.body', base + '.meta.json'
+
+    def _load_meta(self, key):
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if os.path.exists(body_path) else None
+
+    def _write_meta(self, key, meta):
+        _, meta_path = self._paths(key)
+        atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+    def _revalidate(self, path, params, resource, key, meta):
+        """Выполняет (условный) запрос и обновляет запись кэша."""
+        # Тело кэшируется как есть и читается потоково, поэтому только JSON
+        # (сжатый ответ распаковывается при чтении, на диск пишется JSON)
+        headers = {'Accept': mcp_codec.JSON_TYPE}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        with self.client.get(path, params=params, headers=headers, stream=True) as response:
+            if response.status_code == 304 and meta:
+                meta['validated_at'] = time.time()
+                self._write_meta(key, meta)
+                self._count('not_modified')
+                return
+            response.raise_for_status()
+            body_path, _ = self._paths(key)
+            atomic_write(body_path, response.iter_content(STREAM_CHUNK_SIZE))
+            self._write_meta(key, {
+                'url': resource,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'validated_at': time.time(),
+            })
+            self._count('fetched')
+
+    def _revalidate_in_background(self, path, params, resource, key, meta):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            try:
+                self._revalidate(path, params, resource, key, meta)
+            except Exception as e:
+                print(f"✗ Ошибка фоновой перепроверки {resource}: {e}")
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def fetch(self, path, params=None):
+        """
+        Возвращает путь к файлу с актуальным телом ответа на GET запрос.
+
+        Args:
+            path (str): Путь относительно базового URL MCP сервера
+            params (dict): Параметры запроса
+
+        Returns:
+            str: Путь к файлу с телом ответа
+
+        Raises:
+            requests.RequestException: Если сервер недоступен или вернул ошибку
+        """
+        resource, key = self._key(path, params)
+        meta = self._load_meta(key)
+        if meta:
+            age = time.time() - meta.get('validated_at', 0)
+            if age < self.ttl:
+                self._count('hits')
+                return self._paths(key)[0]
+            if age < self.ttl + self.stale_while_revalidate:
+                self._count('stale')
+                self._revalidate_in_background(path, params, resource, key, dict(meta))
+                return self._paths(key)[0]
+        self._flights.do(key, lambda: self._revalidate(path, params, resource, key, meta))
+        return self._paths(key)[0]
+
+    def get_json(self, path, params=None):
+        """
+        Возвращает разобранный JSON ответа на GET запрос (через кэш).
+
+        Returns:
+            dict | list: Ответ сервера
+        """
+        with open(self.fetch(path, params), 'rb') as f:
+            return mcp_codec.json_loads(f.read())
+
+    def get_process(self, process_id):
+        """
+        Возвращает шаблон бизнес-процесса по ID (через кэш).
+
+        Returns:
+            dict: Бизнес-процесс
+        """
+        return self.get_json(f"processes/{process_id}/")
+
+    def iter_processes(self, page_size=None):
+        """
+        Отдает шаблоны бизнес-процессов по одному (через кэш).
+
+        Каждая страница постраничного ответа кэшируется отдельно. Тело
+        ответа читается с диска потоково, как в MCPClient.iter_processes().
+
+        Yields:
+            dict: Бизнес-процесс
+        """
+        path = "processes/"
+        params = {'page_size': page_size} if page_size else None
+        while path:
+            with open(self.fetch(path, params), 'rb') as f:
+                first = f.read(STREAM_CHUNK_SIZE)
+                if first.lstrip()[:1] == b'{':
+                    page = mcp_codec.json_loads(first + f.read())
+                    yield from page.get('results', [])
+                    path = page.get('next')
+                    params = None
+                else:
+                    chunks = iter(lambda: f.read(STREAM_CHUNK_SIZE), b'')
+                    yield from iter_json_array(_prepend(first, chunks))
+                    path = None
+
+    def clear(self):
+        """Удаляет все записи кэша."""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(('.body', '.meta.json')):
+                os.remove(os.path.join(self.cache_dir, name))
+
+def _prepend(first, chunks):
+    yield first
+    yield from chunks
@@ -0,0 +1,261 @@
+"""
+Каталог шаблонов бизнес-процессов в памяти с индексами для быстрого поиска.
+
+ProcessCatalog загружается с MCP сервера или из снимка (mcp_processes_info.json)
+и строит хэш-индексы:
+- ID процесса → процесс, название процесса → процессы;
+- ID задачи → задача и процесс, которому она принадлежит;
+- ID типа документа → тип документа и процессы, которые его используют;
+- название поля → типы документов, в которых есть такое поле.
+
+Поиск по любому индексу не требует обхода вложенных списков tasks и
+document_types. При изменении одного процесса индексы обновляются
+инкрементально через upsert() / remove().
+"""
+
+import threading
+
+from mcp_snapshot import read_processes
+
+class ProcessCatalog:
+    """
+    Индексированный каталог шаблонов бизнес-процессов.
+
+    Изменения (upsert, remove) выполняются под общей блокировкой и не мешают
+    друг другу. Поиск по ID (get, get_task, get_document_type и т.п.) — одно
+    обращение к словарю и не блокируется: upsert() заменяет записи индексов
+    одним присваиванием и только потом удаляет устаревшие, поэтому запись,
+    которая есть до и после изменения, не пропадает и посреди него. Поиск, который обходит множества
+    индекса (find_by_name, processes_for_document_type,
+    document_types_with_field), берет ту же блокировку на время обхода,
+    чтобы не видеть множество посреди изменения.
+    """
+
+    def __init__(self, processes=()):
+        self._lock = threading.Lock()
+        self._processes = {}
+        self._by_name = {}
+        self._tasks = {}
+        self._task_process = {}
+        self._document_types = {}
+        self._document_type_processes = {}
+        self._field_document_types = {}
+        for process in processes:
+            self._add(process)
+
+    @classmethod
+    def from_file(cls, filename="mcp_processes_info.json"):
+        """
+        Загружает каталог из файла снимка (любой формат mcp_snapshot).
+
+        Args:
+            filename (str): Путь к файлу
+
+        Returns:
+            ProcessCatalog: Каталог
+        """
+        return cls(read_processes(filename))
+
+    @classmethod
+    def from_server(cls, source=None, page_size=None):
+        """
+        Загружает каталог с MCP сервера.
+
+        Args:
+            source: Объект с методом iter_processes() — MCPClient или
+                TemplateCache (по умолчанию общий клиент mcp_client)
+            page_size (int): Размер страницы при постраничной выдаче
+
+        Returns:
+            ProcessCatalog: Каталог
+        """
+        if source is None:
+            from mcp_client import get_client
+            source = get_client()
+        return cls(source.iter_processes(page_size=page_size))
+
+    # Изменение каталога
+
+    def upsert(self, process):
+        """
+        Добавляет процесс или заменяет процесс с тем же ID, обновляя индексы.
+
+        Args:
+            process (dict): Бизнес-процесс
+        """
+        with self._lock:
+            previous = self._processes.get(process['id'])
+            self._add(process)
+            if previous is not None:
+                self._discard_stale(previous, process)
+
+    def remove(self, process_id):
+        """
+        Удаляет процесс из каталога.
+
+        Args:
+            process_id (int): ID бизнес-процесса
+
+        Returns:
+            bool: True, если процесс был в каталоге
+        """
+        with self._lock:
+            return self._discard(process_id) is not None
+
+    def _add(self, process):
+        process_id = process['id']
+        self._by_name.setdefault(process['name'], set()).add(process_id)
+
+        for task in process.get('tasks', ()):
+            self._tasks[task['id']] = task
+            self._task_process[task['id']] = process_id
+
+        for doc_type in process.get('document_types', ()):
+            doc_type_id = doc_type['id']
+            previous = self._document_types.get(doc_type_id)
+            if previous is not None:
+                self._unindex_fields(previous)
+            self._document_types[doc_type_id] = doc_type
+            self._document_type_processes.setdefault(doc_type_id, set()).add(process_id)
+            for field in doc_type.get('fields', ()):
+                self._field_document_types.setdefault(field['name'], set()).add(doc_type_id)
+        # Процесс заменяется последним, когда его задачи и типы документов уже в индексах
+        self._processes[process_id] = process
+
+    def _discard_stale(self, previous, process):
+        """Удаляет из индексов записи прежней версии процесса, которых нет в новой."""
+        process_id = process['id']
+        if previous['name'] != process['name']:
+            _discard_from(self._by_name, previous['name'], process_id)
+
+        task_ids = {task['id'] for task in process.get('tasks', ())}
+        for task in previous.get('tasks', ()):
+            if task['id'] not in task_ids and self._task_process.get(task['id']) == process_id:
+                del self._task_process[task['id']]
+                del self._tasks[task['id']]
+
+        doc_type_ids = {doc_type['id'] for doc_type in process.get('document_types', ())}
+        for doc_type in previous.get('document_types', ()):
+            doc_type_id = doc_type['id']
+            if doc_type_id not in doc_type_ids and _discard_from(self._document_type_processes,
+                                                                 doc_type_id, process_id):
+                self._unindex_fields(self._document_types.pop(doc_type_id))
+
+    def _discard(self, process_id):
+        process = self._processes.pop(process_id, None)
+        if process is None:
+            return None
+
+        _discard_from(self._by_name, process['name'], process_id)
+
+        for task in process.get('tasks', ()):
+            if self._task_process.get(task['id']) == process_id:
+                del self._task_process[task['id']]
+                del self._tasks[task['id']]
+
+        for doc_type in process.get('document_types', ()):
+            doc_type_id = doc_type['id']
+            if _discard_from(self._document_type_processes, doc_type_id, process_id):
+                # Тип документа больше не используется ни одним процессом
+                self._unindex_fields(self._document_types.pop(doc_type_id))
+        return process
+
+    def _unindex_fields(self, doc_type):
+        for field in doc_type.get('fields', ()):
+            _discard_from(self._field_document_types, field['name'], doc_type['id'])
+
+    # Поиск
+
+    def get(self, process_id):
+        """
+        Возвращает процесс по ID.
+
+        Returns:
+            dict: Бизнес-процесс или None
+        """
+        return self._processes.get(process_id)
+
+    def find_by_name(self, name):
+        """
+        Возвращает процессы с заданным названием.
+
+        Returns:
+            list: Бизнес-процессы
+        """
+        with self._lock:
+            return [self._processes[process_id] for process_id in self._by_name.get(name, ())]
+
+    def get_task(self, task_id):
+        """
+        Возвращает задачу по ID.
+
+        Returns:
+            dict: Задача или None
+        """
+        return self._tasks.get(task_id)
+
+    def process_for_task(self, task_id):
+        """
+        Возвращает процесс, которому принадлежит задача.
+
+        Returns:
+            dict: Бизнес-процесс или None
+        """
+        process_id = self._task_process.get(task_id)
+        return self._processes.get(process_id) if process_id is not None else None
+
+    def get_document_type(self, doc_type_id):
+        """
+        Возвращает тип документа по ID.
+
+        Returns:
+            dict: Тип документа или None
+        """
+        return self._document_types.get(doc_type_id)
+
+    def processes_for_document_type(self, doc_type_id):
+        """
+        Возвращает процессы, которые используют тип документа.
+
+        Returns:
+            list: Бизнес-процессы
+        """
+        with self._lock:
+            process_ids = self._document_type_processes.get(doc_type_id, ())
+            return [self._processes[process_id] for process_id in process_ids]
+
+    def document_types_with_field(self, field_name):
+        """
+        Возвращает типы документов, в которых есть поле с заданным названием.
+
+        Returns:
+            list: Типы документов
+        """
+        with self._lock:
+            doc_type_ids = self._field_document_types.get(field_name, ())
+            return [self._document_types[doc_type_id] for doc_type_id in doc_type_ids]
+
+    def __len__(self):
+        return len(self._processes)
+
+    def __contains__(self, process_id):
+        return process_id in self._processes
+
+    def __iter__(self):
+        return iter(list(self._processes.values()))
+
+def _discard_from(index, key, value):
+    """
+    Удаляет value из множества index[key]; пустое множество удаляется.
+
+    Returns:
+        bool: True, если множество стало пустым и было удалено
+    """
+    values = index.get(key)
+    if values is None:
+        return False
+    values.discard(value)
+    if not values:
+        del index[key]
+        return True
+    return False
@@ -0,0 +1,428 @@
+"""
+Клиент MCP сервера с общим пулом HTTP-соединений.
+
+Все запросы к MCP серверу идут через один requests.Session, поэтому
+TCP/TLS соединения переиспользуются (keep-alive), а не открываются заново
+на каждый вызов.
+
+Параметры берутся из раздела "pdm" конфигурации (см. mcp_config.py):
+- url, headers — адрес сервера и заголовки авторизации;
+- urls, balancer — несколько реплик сервера и балансировка между ними
+  (см. mcp_balancer.py);
+- pool_size — максимальное число соединений в пуле (по умолчанию 10);
+- connect_timeout, read_timeout — таймауты в секундах (по умолчанию 3 и 10);
+- latency — адаптивные таймауты и дублирующие запросы при чтении
+  каталога (см. mcp_latency.py, по умолчанию выключены);
+- codec — сжатие ответов, MessagePack и библиотека разбора JSON
+  (см. mcp_codec.py, по умолчанию gzip/br и JSON);
+- singleflight — объединять одновременные запросы одного шаблона
+  процесса в один (см. mcp_singleflight.py, по умолчанию включено).
+
+Время и размер каждого запроса записываются в метрики mcp_metrics.
+"""
+
+import copy
+import threading
+
+import requests
+
+import mcp_codec
+from mcp_balancer import Balancer
+from mcp_config import get_config, get_mcp_url
+from mcp_json import iter_json_array
+from mcp_latency import LatencyPolicy
+from mcp_metrics import TimedHTTPAdapter, endpoint_template, get_metrics
+from mcp_singleflight import SingleFlight
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3.0
+DEFAULT_READ_TIMEOUT = 10.0
+# Размер части ответа при потоковом чтении каталога
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class MCPClient:
+    """
+    Клиент MCP сервера поверх пула соединений requests.Session.
+
+    URL и заголовки, не переданные явно, берутся из кэшированной
+    конфигурации при каждом запросе, поэтому изменения config.json
+    подхватываются без пересоздания клиента.
+
+    Если реплик несколько (параметр urls или pdm.urls), каждый запрос по
+    относительному пути идет на реплику, выбранную балансировщиком.
+    Полные URL (например, ссылка "next" постраничной выдачи) запрашиваются
+    как есть — страницы каталога читаются с одной реплики.
+    """
+
+    def __init__(self, base_url=None, headers=None, pool_size=None,
+                 connect_timeout=None, read_timeout=None, metrics=None, latency_policy=None,
+                 compression=None, msgpack=None, singleflight=None, urls=None):
+        pdm = {}
+        if (pool_size is None or connect_timeout is None or read_timeout is None
+                or (base_url is None and urls is None)):
+            pdm = get_config().get('pdm', {})
+        if pool_size is None:
+            pool_size = pdm.get('pool_size', DEFAULT_POOL_SIZE)
+        if connect_timeout is None:
+            connect_timeout = pdm.get('connect_timeout', DEFAULT_CONNECT_TIMEOUT)
+        if read_timeout is None:
+            read_timeout = pdm.get('read_timeout', DEFAULT_READ_TIMEOUT)
+        codec = pdm.get('codec', {})
+        if compression is None:
+            compression = codec.get('compression', True)
+        if msgpack is None:
+            msgpack = codec.get('msgpack', False)
+
+        self._base_url = base_url if base_url is not None or not urls else urls[0]
+        self._urls = list(urls) if urls else None
+        self._balancer = None
+        self._balancer_lock = threading.Lock()
+        self._headers = headers
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        # Форматы ответа, которые клиент предлагает серверу (см. mcp_codec.py)
+        self.compression = compression
+        self.msgpack = msgpack
+        # Хранилище метрик (по умолчанию общее, см. mcp_metrics.get_metrics())
+        self.metrics = metrics if metrics is not None else get_metrics()
+        # Адаптивные таймауты и дубли для чтения каталога: по умолчанию из раздела pdm.latency
+        # (у клиента, полностью заданного параметрами, — выключены); False — выключить
+        if latency_policy is None:
+            latency_policy = LatencyPolicy.from_config(pdm)
+        self.latency_policy = latency_policy or None
+        # Одновременные get_process() одного ID идут на сервер одним запросом;
+        # ожидавшие получают копию результата, чтобы не делить изменяемый dict
+        if singleflight is None:
+            singleflight = pdm.get('singleflight', True)
+        if singleflight is True:
+            singleflight = SingleFlight(clone=copy.deepcopy)
+        self.singleflight = singleflight or None
+        self.session = self._create_session()
+
+    def _create_session(self):
+        session = requests.Session()
+        session.headers['Accept-Encoding'] = mcp_codec.accept_encoding(self.compression)
+        session.headers['Accept'] = mcp_codec.accept(self.msgpack)
+        adapter = TimedHTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @property
+    def base_url(self):
+        """str: Базовый URL MCP сервера без завершающего слэша."""
+        if self._base_url is not None:
+            return self._base_url.rstrip('/')
+        return get_mcp_url().rstrip('/')
+
+    @property
+    def balancer(self):
+        """Balancer: Балансировщик реплик или None, если реплика одна."""
+        if self._urls is not None:
+            urls = self._urls
+        elif self._base_url is not None:
+            return None
+        else:
+            urls = get_config().get('pdm', {}).get('urls') or ()
+        balancer = self._balancer
+        if len(urls) < 2:
+            return None
+        if balancer is not None:
+            if balancer.urls != [url.rstrip('/') for url in urls]:
+                # Список реплик в config.json изменился
+                balancer.set_urls(urls)
+            return balancer
+        with self._balancer_lock:
+            if self._balancer is None:
+                self._balancer = Balancer.from_config(get_config().get('pdm', {}) if self._urls is None else {},
+                                                      urls, probe=self._probe)
+            return self._balancer
+
+    def _probe(self, url):
+        # Активная проверка реплики — тот же ping, что в test_mcp_connection.py
+        try:
+            return self.ping(url).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    @property
+    def headers(self):
+        """dict: Заголовки, отправляемые с каждым запросом."""
+        if self._headers is not None:
+            return self._headers
+        return get_config().get('pdm', {}).get('headers', {})
+
+    def url(self, path='', base_url=None):
+        """
+        Возвращает полный URL для пути относительно базового URL.
+
+        Args:
+            path (str): Путь, например "processes/1/"
+            base_url (str): Базовый URL реплики (по умолчанию base_url)
+
+        Returns:
+            str: Полный URL
+        """
+        base_url = base_url or self.base_url
+        if not path:
+            return base_url
+        if path.startswith(('http://', 'https://')):
+            # Полный URL, например ссылка "next" при постраничной выдаче
+            return path
+        return f"{base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path='', **kwargs):
+        """
+        Выполняет запрос к MCP серверу через пул соединений.
+
+        Args:
+            method (str): HTTP метод
+            path (str): Путь относительно базового URL
+            **kwargs: Дополнительные параметры requests (json, params, headers, timeout)
+
+        Returns:
+            requests.Response: Ответ сервера
+        """
+        headers = dict(self.headers)
+        headers.update(kwargs.pop('headers', None) or {})
+        kwargs.setdefault('timeout', self.timeout)
+        balancer = None
+        if not path.startswith(('http://', 'https://')):
+            balancer = self.balancer
+        if balancer is None:
+            return self._send(method, self.url(path), self.base_url, headers, kwargs)
+
+        # Реплика освобождается по получении заголовков ответа
+        endpoint = balancer.acquire()
+        try:
+            response = self._send(method, self.url(path, endpoint.url), endpoint.url, headers, kwargs)
+        except requests.exceptions.RequestException:
+            balancer.release(endpoint, error=True)
+            raise
+        except BaseException:
+            balancer.release(endpoint)
+            raise
+        balancer.release(endpoint, response.elapsed.total_seconds(), status=response.status_code)
+        return response
+
+    def _send(self, method, url, base_url, headers, kwargs):
+        span = self.metrics.start(method, url, base_url)
+        if span is None:
+            return self.session.request(method, url, headers=headers, **kwargs)
+
+        try:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.metrics.finish(span, error=e)
+            raise
+        self.metrics.headers_received(span, response)
+        if kwargs.get('stream'):
+            # Тело еще не прочитано — запрос завершится при закрытии ответа
+            close = response.close
+
+            def close_and_record():
+                self.metrics.finish(span, response)
+                close()
+            response.close = close_and_record
+        else:
+            self.metrics.finish(span, response)
+        return response
+
+    def get(self, path='', **kwargs):
+        """Выполняет GET запрос. См. request()."""
+        return self.request('GET', path, **kwargs)
+
+    def read(self, path='', **kwargs):
+        """
+        Выполняет идемпотентный GET запрос на чтение через latency_policy.
+
+        Таймаут чтения подбирается по истории задержек адреса, а долгий ответ
+        дублируется вторым запросом (см. mcp_latency.py). Без политики —
+        то же, что get().
+
+        Returns:
+            requests.Response: Первый полученный ответ
+        """
+        policy = self.latency_policy
+        if policy is None:
+            return self.get(path, **kwargs)
+        timeout = kwargs.pop('timeout', None)
+        endpoint = endpoint_template(self.url(path), self.base_url)
+        return policy.call(lambda attempt_timeout: self.get(path, timeout=attempt_timeout, **kwargs),
+                           endpoint, timeout or self.timeout, adaptive=timeout is None)
+
+    def post(self, path='', **kwargs):
+        """Выполняет POST запрос. См. request()."""
+        return self.request('POST', path, **kwargs)
+
+    def ping(self, url=None):
+        """
+        Выполняет GET запрос к корневому URL MCP сервера.
+
+        Args:
+            url (str): Базовый URL конкретной реплики (по умолчанию — выбранной балансировщиком)
+
+        Returns:
+            requests.Response: Ответ сервера
+        """
+        return self.get(url or '')
+
+    def get_process(self, process_id, **kwargs):
+        """
+        Получает шаблон бизнес-процесса по ID.
+
+        Одновременные вызовы с тем же ID из разных потоков ждут один общий
+        запрос (см. singleflight) и получают его результат или исключение.
+
+        Args:
+            process_id (int): ID бизнес-процесса
+            **kwargs: Дополнительные параметры запроса (например, timeout)
+
+        Returns:
+            dict: Бизнес-процесс или None, если сервер не вернул 200
+
+        Raises:
+            TimeoutError: Если общий запрос не завершился за таймаут этого вызова
+        """
+        path = f"processes/{process_id}/"
+        if self.singleflight is None:
+            return self._get_process(path, **kwargs)
+        timeout = kwargs.get('timeout') or self.timeout
+        wait = sum(timeout) if isinstance(timeout, tuple) else timeout
+        return self.singleflight.do(('GET', self.url(path)), lambda: self._get_process(path, **kwargs),
+                                    timeout=wait)
+
+    def _get_process(self, path, **kwargs):
+        response = self.read(path, **kwargs)
+        if response.status_code == 200:
+            return self.decode(response)
+        return None
+
+    def decode(self, response):
+        """
+        Разбирает тело ответа: MessagePack или JSON быстрой библиотекой.
+
+        Args:
+            response (requests.Response): Ответ сервера
+
+        Returns:
+            Разобранное тело ответа
+
+        Raises:
+            requests.exceptions.JSONDecodeError: Если тело не удалось разобрать
+                (как response.json(), это RequestException)
+        """
+        try:
+            return mcp_codec.decode_response(response)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(
+                f"Не удалось разобрать ответ {response.url}: {getattr(e, 'msg', None) or e}", getattr(e, 'doc', None) or '',
+                getattr(e, 'pos', None) or 0, response=response) from e
+
+    def iter_processes(self, page_size=None):
+        """
+        Отдает шаблоны бизнес-процессов по одному, не загружая весь каталог в память.
+
+        Поддерживаются оба формата ответа /processes/:
+        - постраничный ({"results": [...], "next": "..."}) — страницы
+          запрашиваются по мере чтения, пока есть ссылка "next";
+        - JSON массив — разбирается потоково по мере поступления данных.
+        Ответ в MessagePack (если он запрошен) разбирается целиком.
+
+        Args:
+            page_size (int): Желаемый размер страницы (параметр page_size)
+
+        Yields:
+            dict: Бизнес-процесс
+
+        Raises:
+            requests.HTTPError: Если сервер вернул код ошибки
+        """
+        path = "processes/"
+        params = {'page_size': page_size} if page_size else None
+        while path:
+            with self.read(path, params=params, stream=True) as response:
+                response.raise_for_status()
+                if mcp_codec.is_msgpack(response.headers.get('Content-Type')):
+                    page = self.decode(response)
+                    if isinstance(page, list):
+                        yield from page
+                        path = None
+                        continue
+                    yield from page.get('results', [])
+                    path = page.get('next')
+                    params = None
+                    continue
+                chunks = response.iter_content(STREAM_CHUNK_SIZE)
+                first = next(chunks, b'')
+                if first.lstrip()[:1] == b'{':
+                    page = mcp_codec.json_loads(b''.join(_prepend(first, chunks)))
+                    yield from page.get('results', [])
+                    path = page.get('next')
+                    params = None
+                else:
+                    yield from iter_json_array(_prepend(first, chunks))
+                    path = None
+
+    def close(self):
+        """Закрывает все соединения пула."""
+        if self.latency_policy is not None:
+            self.latency_policy.close()
+        if self._balancer is not None:
+            self._balancer.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Возвращает общий для процесса клиент MCP сервера.
+
+    Returns:
+        MCPClient: Клиент с пулом соединений
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MCPClient()
+    return _client
+
+def reset_client():
+    """Закрывает общий клиент; следующий get_client() создаст новый."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+def _prepend(first, chunks):
+    yield first
+    yield from chunks
+
+def iter_processes(page_size=None):
+    """
+    Отдает шаблоны бизнес-процессов по одному через общий клиент.
+
+    См. MCPClient.iter_processes().
+    """
+    return get_client().iter_processes(page_size=page_size)
+
+def get_process_by_id(process_id):
+    """
+    Получает шаблон бизнес-процесса по ID через общий клиент.
+
+    Args:
+        process_id (int): ID бизнес-процесса
+
+    Returns:
+        dict: Бизнес-процесс или None, если сервер не вернул 200
+    """
+    return get_client().get_process(process_id)
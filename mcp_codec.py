@@ -0,0 +1,171 @@
+"""
+Кодеки ответов MCP сервера: сжатие, MessagePack и быстрый разбор JSON.
+
+Клиент сообщает серверу, какие форматы он понимает:
+- Accept-Encoding — br (если установлен brotli или brotlicffi), gzip, deflate.
+  Ответ распаковывает urllib3 при чтении, в том числе потоковом;
+- Accept — application/msgpack (если установлен msgpack и он включен
+  в конфигурации) с запасным application/json.
+
+JSON разбирается самой быстрой доступной библиотекой: orjson, если она
+установлена, иначе стандартным модулем json. Выбор можно задать явно.
+
+Параметры задаются в разделе "pdm.codec" конфигурации:
+- json — "auto" (по умолчанию), "orjson" или "json";
+- msgpack — запрашивать MessagePack (по умолчанию false);
+- compression — запрашивать сжатые ответы (по умолчанию true).
+Библиотеку JSON можно также задать переменной окружения PDM_JSON_BACKEND.
+"""
+
+import json
+import os
+
+ENV_JSON_BACKEND_VAR = 'PDM_JSON_BACKEND'
+JSON_BACKENDS = ('orjson', 'json')
+JSON_TYPE = 'application/json'
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+def _stdlib_loads(data):
+    # json.loads сам определяет кодировку bytes (UTF-8/16/32)
+    return json.loads(data)
+
+_backend = None
+_loads = None
+
+def set_json_backend(name='auto'):
+    """
+    Выбирает библиотеку разбора JSON.
+
+    Args:
+        name (str): "auto" (самая быстрая из установленных), "orjson" или "json"
+
+    Returns:
+        str: Название выбранной библиотеки
+
+    Raises:
+        ValueError: Если библиотека неизвестна или не установлена
+    """
+    global _backend, _loads
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name == 'orjson':
+        if orjson is None:
+            raise ValueError("Библиотека orjson не установлена (pip install orjson)")
+        _loads = orjson.loads
+    elif name == 'json':
+        _loads = _stdlib_loads
+    else:
+        raise ValueError(f"Неизвестная библиотека JSON: {name}. Доступные: {', '.join(JSON_BACKENDS)}")
+    _backend = name
+    return name
+
+def json_backend():
+    """str: Название текущей библиотеки разбора JSON."""
+    if _backend is None:
+        _configure()
+    return _backend
+
+def _configure():
+    name = os.environ.get(ENV_JSON_BACKEND_VAR)
+    if not name:
+        try:
+            from mcp_config import get_config
+            name = get_config().get('pdm', {}).get('codec', {}).get('json', 'auto')
+        except (FileNotFoundError, ValueError):
+            name = 'auto'
+    set_json_backend(name)
+
+def json_loads(data):
+    """
+    Разбирает JSON текущей библиотекой.
+
+    Args:
+        data (bytes | str): Документ JSON
+
+    Returns:
+        Разобранное значение
+    """
+    if _loads is None:
+        _configure()
+    return _loads(data)
+
+def accept_encoding(compression=True):
+    """
+    Возвращает значение заголовка Accept-Encoding.
+
+    Args:
+        compression (bool): Запрашивать сжатые ответы
+
+    Returns:
+        str: Например "br, gzip, deflate"
+    """
+    if not compression:
+        return 'identity'
+    return 'br, gzip, deflate' if BROTLI_AVAILABLE else 'gzip, deflate'
+
+def accept(use_msgpack=False):
+    """
+    Возвращает значение заголовка Accept.
+
+    Args:
+        use_msgpack (bool): Предпочитать MessagePack (если msgpack установлен)
+
+    Returns:
+        str: Например "application/msgpack, application/json;q=0.9"
+    """
+    if use_msgpack and msgpack is not None:
+        return f"{MSGPACK_TYPES[0]}, {JSON_TYPE};q=0.9"
+    return JSON_TYPE
+
+def is_msgpack(content_type):
+    """bool: Является ли тип содержимого MessagePack."""
+    return (content_type or '').split(';', 1)[0].strip().lower() in MSGPACK_TYPES
+
+def decode(content, content_type=None):
+    """
+    Разбирает тело ответа по типу содержимого.
+
+    Args:
+        content (bytes): Тело ответа (уже распакованное)
+        content_type (str): Заголовок Content-Type
+
+    Returns:
+        Разобранное значение
+
+    Raises:
+        ValueError: Если тело не удалось разобрать
+    """
+    if is_msgpack(content_type):
+        if msgpack is None:
+            raise ValueError("Сервер ответил в MessagePack, но библиотека msgpack не установлена")
+        return msgpack.unpackb(content, raw=False)
+    return json_loads(content)
+
+def decode_response(response):
+    """
+    Разбирает тело ответа requests по его Content-Type.
+
+    Returns:
+        Разобранное значение
+    """
+    return decode(response.content, response.headers.get('Content-Type'))
@@ -0,0 +1,194 @@
+"""
+Компиляция условий запуска задач (TaskStartCondition.condition_tree).
+
+Условие запуска хранится как JSON дерево, которое ссылается на задачи
+по названию, например:
+    {"assignment_task": "Создание заявки", "operator": "equals", "value": "completed"}
+
+compile_condition() один раз разрешает названия задач в ID и превращает дерево
+в готовую функцию-предикат от статусов задач экземпляра процесса.
+StartConditionIndex хранит обратный индекс "задача → зависящие от неё условия",
+поэтому при изменении статуса задачи перепроверяются только затронутые условия,
+сколько бы шаблонов ни было загружено.
+
+Поддерживаемые узлы дерева:
+- {"assignment_task": <название>, "operator": <оператор>, "value": <значение>},
+  операторы: equals, not_equals, in, not_in;
+- {"and": [<узел>, ...]} и {"or": [<узел>, ...]}.
+"""
+
+import sys
+
+from mcp_models import Operator
+
+OPERATORS = tuple(operator.value for operator in Operator)
+
+class CompiledCondition:
+    """
+    Скомпилированное условие запуска задачи.
+
+    Attributes:
+        condition_id: ID условия (TaskStartCondition.id) или None
+        task_id (int): ID задачи, которую условие запускает
+        dependencies (frozenset): ID задач, от статусов которых зависит условие
+        predicate (callable): Функция statuses -> bool, где statuses —
+            словарь "ID задачи → статус" экземпляра процесса
+    """
+
+    __slots__ = ('condition_id', 'task_id', 'dependencies', 'predicate')
+
+    def __init__(self, condition_id, task_id, dependencies, predicate):
+        self.condition_id = condition_id
+        self.task_id = task_id
+        self.dependencies = dependencies
+        self.predicate = predicate
+
+    def __repr__(self):
+        return (f"CompiledCondition(condition_id={self.condition_id!r}, task_id={self.task_id!r}, "
+                f"dependencies={sorted(self.dependencies)!r})")
+
+def _compile_node(node, resolve, dependencies):
+    if 'and' in node or 'or' in node:
+        key = 'and' if 'and' in node else 'or'
+        children = tuple(_compile_node(child, resolve, dependencies) for child in node[key])
+        if not children:
+            raise ValueError(f"Пустой список в узле '{key}' условия запуска")
+        if key == 'and':
+            return lambda statuses: all(child(statuses) for child in children)
+        return lambda statuses: any(child(statuses) for child in children)
+
+    try:
+        name = node['assignment_task']
+        operator = node['operator']
+        value = node['value']
+    except KeyError as e:
+        raise ValueError(f"В условии запуска нет ключа {e}: {node}")
+    if operator not in OPERATORS:
+        raise ValueError(f"Неизвестный оператор условия запуска: {operator}")
+
+    task_id = resolve(name)
+    if task_id is None:
+        raise ValueError(f"Задача '{name}' из условия запуска не найдена")
+    dependencies.add(task_id)
+
+    if isinstance(value, str):
+        value = sys.intern(value)
+    if operator == 'equals':
+        return lambda statuses: statuses.get(task_id) == value
+    if operator == 'not_equals':
+        return lambda statuses: statuses.get(task_id) != value
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"Оператор условия запуска '{operator}' требует список значений: {node}")
+    try:
+        values = frozenset(value)
+    except TypeError:
+        raise ValueError(f"Недопустимые значения в условии запуска: {node}")
+    if operator == 'in':
+        return lambda statuses: statuses.get(task_id) in values
+    return lambda statuses: statuses.get(task_id) not in values
+
+def compile_condition(condition_tree, task_id, resolve, condition_id=None):
+    """
+    Компилирует дерево условия запуска в предикат.
+
+    Args:
+        condition_tree (dict): Дерево условия (TaskStartCondition.condition_tree)
+        task_id (int): ID задачи, которую условие запускает
+        resolve (callable): Функция "название задачи → ID задачи" (None, если не найдена)
+        condition_id: ID условия (для отчетов)
+
+    Returns:
+        CompiledCondition: Скомпилированное условие
+
+    Raises:
+        ValueError: Если дерево некорректно или задача не найдена
+    """
+    dependencies = set()
+    predicate = _compile_node(condition_tree, resolve, dependencies)
+    return CompiledCondition(condition_id, task_id, frozenset(dependencies), predicate)
+
+class StartConditionIndex:
+    """
+    Набор скомпилированных условий запуска с обратным индексом по задачам.
+
+    Пример:
+        index = StartConditionIndex.from_catalog(catalog, [
+            (None, 2, {"assignment_task": "Создание заявки", "operator": "equals", "value": "completed"}),
+        ])
+        statuses[1] = "completed"
+        index.tasks_to_start(statuses, changed_task_id=1)  # -> [2]
+    """
+
+    def __init__(self):
+        self._dependents = {}
+        self._conditions = []
+
+    @classmethod
+    def from_catalog(cls, catalog, conditions):
+        """
+        Строит индекс, разрешая названия задач в пределах процесса запускаемой задачи.
+
+        Args:
+            catalog (ProcessCatalog): Каталог шаблонов процессов
+            conditions (iterable): Кортежи (ID условия, ID задачи, condition_tree)
+
+        Returns:
+            StartConditionIndex: Индекс условий
+        """
+        index = cls()
+        names_by_process = {}
+        for condition_id, task_id, condition_tree in conditions:
+            process = catalog.process_for_task(task_id)
+            if process is None:
+                raise ValueError(f"Задача с ID {task_id} не найдена в каталоге")
+            names = names_by_process.get(process['id'])
+            if names is None:
+                names = {task['name']: task['id'] for task in process.get('tasks', ())}
+                names_by_process[process['id']] = names
+            index.add(compile_condition(condition_tree, task_id, names.get, condition_id))
+        return index
+
+    def add(self, condition):
+        """
+        Добавляет скомпилированное условие в индекс.
+
+        Args:
+            condition (CompiledCondition): Условие
+        """
+        self._conditions.append(condition)
+        for task_id in condition.dependencies:
+            self._dependents.setdefault(task_id, []).append(condition)
+
+    def dependents(self, task_id):
+        """
+        Возвращает условия, которые зависят от статуса задачи.
+
+        Returns:
+            list: Скомпилированные условия
+        """
+        return self._dependents.get(task_id, [])
+
+    def tasks_to_start(self, statuses, changed_task_id):
+        """
+        Перепроверяет условия, затронутые изменением статуса задачи.
+
+        Каждое условие проверяется независимо: задача запускается, если
+        выполнено хотя бы одно из её условий. Задачи, у которых уже есть
+        статус в statuses, не возвращаются.
+
+        Args:
+            statuses (dict): Текущие статусы задач экземпляра процесса (ID задачи → статус)
+            changed_task_id (int): ID задачи, статус которой изменился
+
+        Returns:
+            list: ID задач, которые нужно запустить
+        """
+        started = []
+        for condition in self._dependents.get(changed_task_id, ()):
+            task_id = condition.task_id
+            if task_id not in statuses and task_id not in started and condition.predicate(statuses):
+                started.append(task_id)
+        return started
+
+    def __len__(self):
+        return len(self._conditions)
@@ -2,59 +2,260 @@
 Конфигурация MCP сервера для тестирования веб-приложения.
 
 Этот модуль предоставляет доступ к конфигурации MCP сервера.
+
+Конфигурация читается с диска один раз на процесс и хранится в памяти.
+Файл перечитывается только если изменились его время модификации или размер
+(проверка выполняется не чаще, чем раз в ``PDM_CONFIG_CHECK_INTERVAL`` секунд),
+либо при явном вызове ``reload_config()``.
+
+Поверх файла накладываются:
+- ``config.<env>.json`` для окружения из переменной ``PDM_ENV``;
+- переменные окружения ``PDM_MCP_URL`` и ``PDM_MCP_TOKEN``.
+
+Несколько реплик MCP сервера задаются списком ``pdm.urls`` (или через запятую
+в ``PDM_MCP_URL``); запросы между ними распределяет mcp_balancer.py.
 """
 
+import copy
 import json
 import os
+import threading
+import time
 
 # Путь к файлу конфигурации
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'config.json')
 
-def load_config():
+# Переменные окружения, переопределяющие значения из файлов
+ENV_NAME_VAR = 'PDM_ENV'
+ENV_URL_VAR = 'PDM_MCP_URL'
+ENV_TOKEN_VAR = 'PDM_MCP_TOKEN'
+ENV_CHECK_INTERVAL_VAR = 'PDM_CONFIG_CHECK_INTERVAL'
+
+# Адрес MCP сервера по умолчанию
+DEFAULT_URL = 'http://localhost:8001/mcp'
+
+# Как часто (в секундах) проверять, не изменились ли файлы конфигурации
+DEFAULT_CHECK_INTERVAL = 1.0
+
+def load_config(config_file=None):
     """
     Загружает конфигурацию MCP сервера из файла config.json.
-    
+
+    Args:
+        config_file (str): Путь к файлу (по умолчанию CONFIG_FILE)
+
     Returns:
         dict: Конфигурация MCP сервера
     """
+    config_file = config_file or CONFIG_FILE
     try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        with open(config_file, 'r', encoding='utf-8') as f:
             config = json.load(f)
         return config
     except FileNotFoundError:
-        raise FileNotFoundError(f"Конфигурационный файл {CONFIG_FILE} не найден")
+        raise FileNotFoundError(f"Конфигурационный файл {config_file} не найден")
     except json.JSONDecodeError:
-        raise ValueError(f"Ошибка чтения конфигурационного файла {CONFIG_FILE}")
+        raise ValueError(f"Ошибка чтения конфигурационного файла {config_file}")
+
+def _env_config_file(config_file):
+    """Возвращает путь к config.<env>.json для текущего PDM_ENV или None."""
+    env = os.environ.get(ENV_NAME_VAR)
+    if not env:
+        return None
+    base, ext = os.path.splitext(config_file)
+    return f"{base}.{env}{ext}"
+
+def _file_signature(path):
+    """Возвращает (mtime_ns, size) файла или None, если файла нет."""
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _merge(base, overlay):
+    """Рекурсивно накладывает overlay на base (base изменяется на месте)."""
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+def _apply_env_overlay(config):
+    """Применяет переменные окружения PDM_MCP_URL и PDM_MCP_TOKEN."""
+    url = os.environ.get(ENV_URL_VAR)
+    token = os.environ.get(ENV_TOKEN_VAR)
+    if url or token:
+        pdm = config.setdefault('pdm', {})
+        if url:
+            # Адрес из окружения заменяет и список реплик из файла
+            urls = [item.strip() for item in url.split(',') if item.strip()]
+            pdm['url'] = urls[0]
+            if len(urls) > 1:
+                pdm['urls'] = urls
+            else:
+                pdm.pop('urls', None)
+        if token:
+            pdm.setdefault('headers', {})['Authorization'] = f"Bearer {token}"
+    return config
+
+class ConfigCache:
+    """
+    Кэш конфигурации MCP сервера, общий для всего процесса.
+
+    Разобранная конфигурация хранится в памяти. Перед выдачей кэш не чаще,
+    чем раз в check_interval секунд, сверяет время модификации и размер
+    файлов, а также переменные окружения, и перечитывает конфигурацию
+    только при изменении.
+    """
+
+    def __init__(self, config_file=None, check_interval=None):
+        self.config_file = config_file or CONFIG_FILE
+        if check_interval is None:
+            check_interval = float(os.environ.get(ENV_CHECK_INTERVAL_VAR, DEFAULT_CHECK_INTERVAL))
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._config = None
+        self._signature = None
+        self._env_key = None
+        self._checked_at = 0.0
+
+    def _current_env_key(self):
+        return (
+            os.environ.get(ENV_NAME_VAR),
+            os.environ.get(ENV_URL_VAR),
+            os.environ.get(ENV_TOKEN_VAR),
+        )
+
+    def _read(self):
+        """Читает и собирает конфигурацию: файл, config.<env>.json, переменные окружения."""
+        env_file = _env_config_file(self.config_file)
+        signature = (_file_signature(self.config_file), _file_signature(env_file))
+
+        if signature[0] is not None:
+            config = load_config(self.config_file)
+        elif os.environ.get(ENV_URL_VAR):
+            # Без файла можно работать, если URL задан через окружение
+            config = {}
+        else:
+            raise FileNotFoundError(f"Конфигурационный файл {self.config_file} не найден")
+
+        if signature[1] is not None:
+            _merge(config, load_config(env_file))
+
+        return _apply_env_overlay(config), signature
+
+    def get(self):
+        """
+        Возвращает разобранную конфигурацию, при необходимости перечитывая файлы.
+
+        Returns:
+            dict: Конфигурация (не изменяйте её на месте)
+        """
+        config = self._config
+        now = time.monotonic()
+        if config is not None and now - self._checked_at < self.check_interval:
+            return config
+
+        with self._lock:
+            env_key = self._current_env_key()
+            if self._config is not None and env_key == self._env_key:
+                env_file = _env_config_file(self.config_file)
+                signature = (_file_signature(self.config_file), _file_signature(env_file))
+                if signature == self._signature:
+                    self._checked_at = now
+                    return self._config
+            self._config, self._signature = self._read()
+            self._env_key = env_key
+            self._checked_at = now
+            return self._config
+
+    def reload(self):
+        """
+        Принудительно перечитывает конфигурацию.
+
+        Returns:
+            dict: Новая конфигурация
+        """
+        with self._lock:
+            self._config, self._signature = self._read()
+            self._env_key = self._current_env_key()
+            self._checked_at = time.monotonic()
+            return self._config
+
+    def clear(self):
+        """Сбрасывает кэш; следующий вызов get() прочитает файлы заново."""
+        with self._lock:
+            self._config = None
+            self._signature = None
+            self._env_key = None
+
+# Общий для процесса кэш конфигурации
+_cache = ConfigCache()
+
+def get_config():
+    """
+    Возвращает полную конфигурацию из кэша.
+
+    Returns:
+        dict: Конфигурация
+    """
+    return _cache.get()
+
+def reload_config():
+    """
+    Явно перечитывает конфигурацию с диска.
+
+    Returns:
+        dict: Конфигурация
+    """
+    return _cache.reload()
 
 def get_mcp_config():
     """
     Возвращает конфигурацию MCP сервера.
-    
+
     Returns:
         dict: Конфигурация MCP сервера
     """
-    config = load_config()
-    return config.get('pdm', {})
+    return copy.deepcopy(_cache.get().get('pdm', {}))
 
 def get_mcp_url():
     """
     Возвращает URL MCP сервера.
-    
+
+    Если задано несколько реплик (pdm.urls), возвращается основной адрес
+    pdm.url, а без него — первая реплика.
+
     Returns:
         str: URL MCP сервера
     """
-    mcp_config = get_mcp_config()
-    return mcp_config.get('url', 'http://localhost:8001/mcp')
+    pdm = _cache.get().get('pdm', {})
+    if 'url' in pdm or not pdm.get('urls'):
+        return pdm.get('url', DEFAULT_URL)
+    return pdm['urls'][0]
+
+def get_mcp_urls():
+    """
+    Возвращает адреса всех реплик MCP сервера.
+
+    Returns:
+        list: pdm.urls или [get_mcp_url()], если список не задан
+    """
+    urls = _cache.get().get('pdm', {}).get('urls')
+    return list(urls) if urls else [get_mcp_url()]
 
 def get_mcp_headers():
     """
     Возвращает заголовки для запросов к MCP серверу.
-    
+
     Returns:
         dict: Заголовки для запросов
     """
-    mcp_config = get_mcp_config()
-    return mcp_config.get('headers', {})
+    return dict(_cache.get().get('pdm', {}).get('headers', {}))
 
 # Пример использования
 if __name__ == '__main__':
@@ -62,6 +263,8 @@ if __name__ == '__main__':
         config = get_mcp_config()
         print("Конфигурация MCP сервера:")
         print(f"URL: {get_mcp_url()}")
+        if len(get_mcp_urls()) > 1:
+            print(f"Реплики: {', '.join(get_mcp_urls())}")
         print(f"Заголовки: {get_mcp_headers()}")
     except Exception as e:
-        print(f"Ошибка: {e}")
\ No newline at end of file
+        print(f"Ошибка: {e}")
@@ -0,0 +1,686 @@
+"""
+Локальный сервер-заглушка MCP для тестов производительности без сети.
+
+Реализует те же адреса, что и MCP сервер:
+- GET  {url}/                      — проверка соединения;
+- GET  {url}/processes/            — каталог (JSON массив или постранично
+                                     с параметрами page_size и page);
+- GET  {url}/processes/{id}/       — шаблон бизнес-процесса;
+- GET  {url}/processes/changes/    — изменения каталога после ревизии since
+                                     (параметры since и limit);
+- POST {url}/process-instances/    — создание экземпляра процесса
+                                     (с учетом заголовка Idempotency-Key);
+- POST {url}/documents/            — загрузка пакета документов одного типа
+                                     (с учетом заголовка Idempotency-Key).
+
+Каталог генерируется детерминированно: первым идет процесс "Обработка заявки"
+из документации, за ним синтетические процессы нужного размера. Ответы GET
+отдаются с ETag и Last-Modified и поддерживают условные запросы (304).
+С параметрами compress и msgpack сервер, как и настоящий, учитывает
+заголовки Accept-Encoding (br, gzip, deflate) и Accept (application/msgpack).
+Можно добавить задержку ответа и долю ответов 503/429. Каталог можно менять
+во время работы (upsert_process(), delete_process()) — изменения попадают
+в ленту /processes/changes/.
+
+Запуск (порт по умолчанию 8001, как в адресе MCP сервера по умолчанию):
+python mcp_fake_server.py --processes 1000 --tasks 5 --latency 0.01 --error-rate 0.01
+
+В коде:
+    from mcp_fake_server import serve
+
+    with serve(processes=100) as url:
+        client = MCPClient(base_url=url, headers={})
+"""
+
+import argparse
+import copy
+import email.utils
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from mcp_seed import SEED_PROCESSES
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FIELD_TYPES = ('строка', 'дата', 'текст', 'булево')
+
+def make_process(process_id, tasks=3, document_types=3, fields=4, task_base=None, document_type_base=None):
+    """
+    Создает синтетический бизнес-процесс.
+
+    Структура повторяет шаблон "Обработка заявки", данные детерминированы.
+
+    Args:
+        process_id (int): ID процесса
+        tasks (int): Количество задач
+        document_types (int): Количество типов документов
+        fields (int): Количество полей в каждом типе документа
+        task_base (int): ID задачи перед первой задачей процесса
+            (по умолчанию (process_id - 1) * tasks)
+        document_type_base (int): То же для типов документов
+
+    Returns:
+        dict: Бизнес-процесс в формате MCP сервера
+    """
+    if task_base is None:
+        task_base = (process_id - 1) * tasks
+    if document_type_base is None:
+        document_type_base = (process_id - 1) * document_types
+    return {
+        "id": process_id,
+        "name": f"Обработка заявки {process_id}",
+        "description": f"Синтетический бизнес-процесс обработки заявки №{process_id} с {tasks} этапами",
+        "tasks": [
+            {
+                "id": task_base + order,
+                "name": f"Этап {order} процесса {process_id}",
+                "order": order,
+                "description": f"Этап {order} - обработка заявки и подготовка документов для следующего этапа",
+            }
+            for order in range(1, tasks + 1)
+        ],
+        "document_types": [
+            {
+                "id": document_type_base + number,
+                "name": f"Документ {number} процесса {process_id}",
+                "fields": [
+                    {
+                        "name": "номер" if index == 0 else f"поле_{index}",
+                        "type": FIELD_TYPES[index % len(FIELD_TYPES)],
+                        "required": index < 2,
+                        **({"unique": True} if index == 0 else {}),
+                    }
+                    for index in range(fields)
+                ],
+            }
+            for number in range(1, document_types + 1)
+        ],
+    }
+
+def make_processes(count, **kwargs):
+    """
+    Создает список из count синтетических бизнес-процессов.
+
+    Returns:
+        list: Бизнес-процессы с ID от 1 до count
+    """
+    return [make_process(process_id, **kwargs) for process_id in range(1, count + 1)]
+
+def make_catalog(processes=1, tasks=3, document_types=3, fields=4):
+    """
+    Создает каталог сервера-заглушки: процессы из SEED_PROCESSES и синтетические после них.
+
+    ID задач и типов документов синтетических процессов продолжают ID
+    процессов из SEED_PROCESSES и не пересекаются с ними.
+
+    Args:
+        processes (int): Общее количество процессов
+        tasks, document_types, fields: Размеры синтетических процессов (см. make_process())
+
+    Returns:
+        list: Бизнес-процессы с ID от 1 до processes
+    """
+    catalog = copy.deepcopy(SEED_PROCESSES[:processes])
+    last_task = max((task['id'] for process in catalog for task in process['tasks']), default=0)
+    last_document_type = max((doc['id'] for process in catalog for doc in process['document_types']), default=0)
+    for process_id in range(len(catalog) + 1, processes + 1):
+        process = make_process(process_id, tasks, document_types, fields,
+                               task_base=last_task, document_type_base=last_document_type)
+        last_task += tasks
+        last_document_type += document_types
+        catalog.append(process)
+    return catalog
+
+def _encode(data):
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+def _etag(body):
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+# Ответы меньше этого размера не сжимаются: выигрыш меньше накладных расходов
+MIN_COMPRESS_SIZE = 512
+# Сколько закодированных тел ответов хранить (ключ — ETag и представление)
+ENCODED_CACHE_SIZE = 1024
+
+_COMPRESSORS = {
+    'gzip': lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+    'deflate': lambda body: zlib.compress(body, 6),
+}
+if brotli is not None:
+    _COMPRESSORS['br'] = lambda body: brotli.compress(body, quality=5)
+# Порядок предпочтения сервера
+_ENCODING_PREFERENCE = ('br', 'gzip', 'deflate')
+
+def _accepted(header):
+    """Возвращает множество значений заголовка Accept*/ с q > 0 (без параметров)."""
+    accepted = set()
+    for item in (header or '').split(','):
+        value, _, params = item.partition(';')
+        value = value.strip().lower()
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if value:
+            accepted.add(value)
+    return accepted
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    # (метод, адрес для статистики, шаблон пути без префикса, имя метода FakeMCPServer)
+    routes = [
+        ('GET', '/', re.compile(r'^/?$'), 'handle_ping'),
+        ('GET', '/processes/', re.compile(r'^/processes/?$'), 'handle_processes'),
+        ('GET', '/processes/changes/', re.compile(r'^/processes/changes/?$'), 'handle_changes'),
+        ('GET', '/processes/{id}/', re.compile(r'^/processes/(\d+)/?$'), 'handle_process'),
+        ('POST', '/process-instances/', re.compile(r'^/process-instances/?$'), 'handle_create_instance'),
+        ('POST', '/documents/', re.compile(r'^/documents/?$'), 'handle_create_documents'),
+    ]
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        fake = self.server.fake
+        parts = urlsplit(self.path)
+        path = parts.path
+        if path.startswith(fake.prefix):
+            path = path[len(fake.prefix):]
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            body = self.rfile.read(length)
+
+        for route_method, endpoint, pattern, name in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                fake.record(method, endpoint)
+                break
+        else:
+            fake.record(method, None)
+            self._send(404, _encode({"detail": "Not found"}))
+            return
+
+        if fake.token and self.headers.get('Authorization') != f"Bearer {fake.token}":
+            self._send(401, _encode({"detail": "Authentication credentials were not provided."}))
+            return
+        fault = fake.inject_fault()
+        if fault:
+            self._send(fault, _encode({"detail": "Injected error"}), {'Retry-After': '0.1'})
+            return
+        status, payload, headers = getattr(fake, name)(self, match, parse_qs(parts.query), body)
+        self._send(status, payload, headers)
+
+    def _send(self, status, body, headers=None):
+        headers = dict(headers or {})
+        if self.command == 'GET' and status == 200:
+            headers.setdefault('ETag', _etag(body))
+            headers.setdefault('Last-Modified', self.server.fake.last_modified)
+        content_type = 'application/json; charset=utf-8'
+        if body:
+            content_type, body, headers = self.server.fake.negotiate(self, status, body, headers)
+        if self.command == 'GET' and status == 200 and self._not_modified(headers['ETag']):
+            status, body = 304, b''
+        self.send_response(status)
+        if body:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return since >= int(self.server.fake.started_at)
+        return False
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionError:
+            # Клиент закрыл соединение, не дождавшись ответа (например, проигравший дублирующий запрос)
+            pass
+
+    def log_message(self, format, *args):
+        if self.server.fake.verbose:
+            super().log_message(format, *args)
+
+class FakeMCPServer:
+    """
+    Сервер-заглушка MCP в фоновом потоке.
+
+    Пример:
+        with FakeMCPServer(processes=1000, latency=0.005) as server:
+            client = MCPClient(base_url=server.url, headers={})
+            ...
+            print(server.requests)   # {('GET', '/processes/{id}/'): 10, ...}
+
+    Args:
+        catalog (list): Готовый каталог процессов (по умолчанию make_catalog())
+        processes, tasks, document_types, fields: Размеры генерируемого каталога
+        latency (float): Задержка каждого ответа в секундах
+        jitter (float): Дополнительная случайная задержка от 0 до jitter секунд
+        spike_rate (float): Доля ответов с всплеском задержки ("медленный воркер")
+        spike_latency (float): Дополнительная задержка ответа при всплеске, секунды
+        error_rate (float): Доля ответов 503
+        throttle_rate (float): Доля ответов 429
+        page_size (int): Размер страницы /processes/ по умолчанию
+            (None — JSON массив, если клиент не передал page_size)
+        compress (bool): Сжимать ответы, если клиент передал Accept-Encoding
+            (br — только если установлен brotli)
+        msgpack (bool): Отвечать в MessagePack, если клиент передал Accept:
+            application/msgpack (нужен установленный msgpack)
+        token (str): Требуемый токен в заголовке Authorization (None — без проверки)
+        seed (int): Начальное значение генератора случайных задержек и ошибок
+        host (str): Адрес
+        port (int): Порт (0 — выбрать свободный)
+        prefix (str): Префикс пути, как в URL MCP сервера
+    """
+
+    def __init__(self, catalog=None, processes=1, tasks=3, document_types=3, fields=4,
+                 latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, page_size=None,
+                 token=None, seed=0, host='127.0.0.1', port=0, prefix='/mcp', verbose=False,
+                 spike_rate=0.0, spike_latency=1.0, compress=False, msgpack=False):
+        if catalog is None:
+            catalog = make_catalog(processes, tasks, document_types, fields)
+        self.latency = latency
+        self.jitter = jitter
+        self.spike_rate = spike_rate
+        self.spike_latency = spike_latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.page_size = page_size
+        self.compress = compress
+        self.msgpack = msgpack
+        self._encoded = {}
+        self.token = token
+        self.prefix = prefix.rstrip('/')
+        self.verbose = verbose
+        self.requests = Counter()
+        self.instances = {}
+        self._idempotency = {}
+        # ID типа документа → загруженные документы
+        self.documents = {}
+        # (ID типа документа, поле) → значения уникального поля
+        self._unique_values = {}
+        self._document_results = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._revision = 0
+        self._changes = OrderedDict()
+        self.set_catalog(catalog)
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    def set_catalog(self, catalog):
+        """Заменяет каталог процессов; ответы перекодируются один раз."""
+        with self._lock:
+            self._by_id = {process['id']: process for process in catalog}
+            # ID процесса → (ревизия последнего изменения, удален ли); порядок — по ревизии.
+            # У каждого изменения своя ревизия, чтобы курсор страницы был однозначным
+            self._changes = OrderedDict()
+            # Изменения до замены каталога не хранятся: старые курсоры получат 410
+            self._reset_revision = self._revision
+            for process_id in self._by_id:
+                self._revision += 1
+                self._changes[process_id] = (self._revision, False)
+            self._invalidate()
+
+    def upsert_process(self, process):
+        """Добавляет или заменяет процесс; изменение получает новую ревизию."""
+        with self._lock:
+            self._by_id[process['id']] = process
+            self._record_change(process['id'], False)
+
+    def delete_process(self, process_id):
+        """Удаляет процесс; изменение получает новую ревизию."""
+        with self._lock:
+            if self._by_id.pop(process_id, None) is not None:
+                self._record_change(process_id, True)
+
+    @property
+    def revision(self):
+        """int: Ревизия последнего изменения каталога."""
+        return self._revision
+
+    def _record_change(self, process_id, deleted):
+        self._revision += 1
+        self._changes[process_id] = (self._revision, deleted)
+        self._changes.move_to_end(process_id)
+        self._invalidate()
+
+    def _invalidate(self):
+        self.catalog = list(self._by_id.values())
+        self._process_bodies = {}
+        self._catalog_body = None
+        self._pages = {}
+        self._document_types = None
+        self.started_at = time.time()
+        self.last_modified = email.utils.formatdate(self.started_at, usegmt=True)
+
+    @property
+    def url(self):
+        """str: Базовый URL сервера, например "http://127.0.0.1:54321/mcp"."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Обрабатывает запросы в текущем потоке до Ctrl+C."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def record(self, method, route):
+        with self._lock:
+            self.requests[(method, route)] += 1
+
+    def inject_fault(self):
+        """Выдерживает задержку и решает, вернуть ли ошибку вместо ответа."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self.spike_rate and self._random.random() < self.spike_rate:
+                delay += self.spike_latency
+            roll = self._random.random()
+        if delay:
+            time.sleep(delay)
+        if roll < self.error_rate:
+            return 503
+        if roll < self.error_rate + self.throttle_rate:
+            return 429
+        return None
+
+    def negotiate(self, request, status, body, headers):
+        """
+        Выбирает представление ответа по заголовкам Accept и Accept-Encoding.
+
+        Returns:
+            tuple: (Content-Type, тело, заголовки)
+        """
+        if not self.compress and not self.msgpack:
+            return 'application/json; charset=utf-8', body, headers
+        headers = dict(headers or {})
+        headers['Vary'] = 'Accept, Accept-Encoding'
+        content_type = 'application/json; charset=utf-8'
+        use_msgpack = (self.msgpack and msgpack is not None
+                       and 'application/msgpack' in _accepted(request.headers.get('Accept')))
+        encodings = _accepted(request.headers.get('Accept-Encoding')) if self.compress else ()
+        encoding = next((name for name in _ENCODING_PREFERENCE
+                         if name in encodings and name in _COMPRESSORS), None)
+        if use_msgpack:
+            content_type = 'application/msgpack'
+        if len(body) < MIN_COMPRESS_SIZE:
+            encoding = None
+        if not use_msgpack and encoding is None:
+            return content_type, body, headers
+
+        # Тела ответов каталога не меняются между запросами — кодируем один раз
+        key = (headers.get('ETag') or _etag(body), use_msgpack, encoding)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = body
+            if use_msgpack:
+                encoded = msgpack.packb(json.loads(body), use_bin_type=True)
+            if encoding is not None and len(encoded) >= MIN_COMPRESS_SIZE:
+                encoded = _COMPRESSORS[encoding](encoded)
+            else:
+                encoding = None
+            with self._lock:
+                if len(self._encoded) >= ENCODED_CACHE_SIZE:
+                    self._encoded.clear()
+                self._encoded[key] = (encoded, encoding)
+        else:
+            encoded, encoding = encoded
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+        if status == 200 and 'ETag' in headers and (use_msgpack or encoding):
+            # У каждого представления свой ETag (как делают nginx и Apache)
+            suffix = '-'.join(filter(None, ('msgpack' if use_msgpack else None, encoding)))
+            headers['ETag'] = f'{headers["ETag"][:-1]}-{suffix}"'
+        return content_type, encoded, headers
+
+    def handle_ping(self, request, match, query, body):
+        return 200, _encode({"status": "ok", "processes": len(self.catalog)}), None
+
+    def handle_processes(self, request, match, query, body):
+        page_size = query.get('page_size', [self.page_size])[0]
+        if not page_size:
+            if self._catalog_body is None:
+                self._catalog_body = _encode(self.catalog)
+            return 200, self._catalog_body, None
+        try:
+            page_size = int(page_size)
+            page = int(query.get('page', [1])[0])
+        except ValueError:
+            return 400, _encode({"detail": "Invalid page"}), None
+        if page_size < 1 or page < 1 or (page - 1) * page_size >= max(len(self.catalog), 1):
+            return 404, _encode({"detail": "Invalid page."}), None
+
+        key = (page_size, page)
+        body = self._pages.get(key)
+        if body is None:
+            base = f"http://{request.headers.get('Host', '127.0.0.1')}{self.prefix}/processes/"
+            start = (page - 1) * page_size
+            has_next = start + page_size < len(self.catalog)
+            body = _encode({
+                "count": len(self.catalog),
+                "next": f"{base}?page={page + 1}&page_size={page_size}" if has_next else None,
+                "previous": f"{base}?page={page - 1}&page_size={page_size}" if page > 1 else None,
+                "results": self.catalog[start:start + page_size],
+            })
+            self._pages[key] = body
+        return 200, body, None
+
+    def handle_changes(self, request, match, query, body):
+        try:
+            since = int(query.get('since', [0])[0])
+            limit = int(query.get('limit', [1000])[0])
+        except ValueError:
+            return 400, _encode({"detail": "Invalid cursor"}), None
+        if since < 0 or since > self._revision or limit < 1:
+            return 400, _encode({"detail": "Invalid cursor"}), None
+        if 0 < since <= self._reset_revision:
+            return 410, _encode({"detail": "Cursor expired"}), None
+
+        with self._lock:
+            # Изменения упорядочены по ревизии — идем с конца до курсора
+            changed = []
+            for process_id in reversed(self._changes):
+                revision, deleted = self._changes[process_id]
+                if revision <= since:
+                    break
+                if not (deleted and since == 0):
+                    changed.append((revision, process_id, deleted))
+            changed.reverse()
+            has_more = len(changed) > limit
+            changed = changed[:limit]
+            cursor = changed[-1][0] if has_more else self._revision
+            changes = [
+                {"op": "delete", "id": process_id} if deleted
+                else {"op": "upsert", "process": self._by_id[process_id]}
+                for _, process_id, deleted in changed
+            ]
+        return 200, _encode({"cursor": str(cursor), "has_more": has_more, "changes": changes}), None
+
+    def handle_process(self, request, match, query, body):
+        process_id = int(match.group(1))
+        encoded = self._process_bodies.get(process_id)
+        if encoded is None:
+            process = self._by_id.get(process_id)
+            if process is None:
+                return 404, _encode({"detail": "Not found."}), None
+            encoded = self._process_bodies[process_id] = _encode(process)
+        return 200, encoded, None
+
+    def handle_create_instance(self, request, match, query, body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return 400, _encode({"detail": "Invalid JSON"}), None
+        if payload.get('process_id') not in self._by_id:
+            return 400, _encode({"process_id": ["Бизнес-процесс не найден"]}), None
+
+        key = request.headers.get('Idempotency-Key')
+        with self._lock:
+            if key and key in self._idempotency:
+                # Повтор запроса: возвращаем уже созданный экземпляр
+                return 200, _encode(self.instances[self._idempotency[key]]), None
+            instance = dict(payload, id=len(self.instances) + 1, status='created')
+            self.instances[instance['id']] = instance
+            if key:
+                self._idempotency[key] = instance['id']
+        return 201, _encode(instance), None
+
+    def _document_type(self, document_type_id):
+        # Вызывается под self._lock
+        if self._document_types is None:
+            self._document_types = {document_type['id']: document_type for process in self.catalog
+                                    for document_type in process.get('document_types', ())}
+        return self._document_types.get(document_type_id)
+
+    def handle_create_documents(self, request, match, query, body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return 400, _encode({"detail": "Invalid JSON"}), None
+        documents = payload.get('documents')
+        if not isinstance(documents, list):
+            return 400, _encode({"documents": ["Ожидается список документов"]}), None
+
+        key = request.headers.get('Idempotency-Key')
+        with self._lock:
+            if key and key in self._document_results:
+                # Повтор запроса: пакет уже загружен, возвращаем тот же результат
+                return 200, self._document_results[key], None
+            document_type = self._document_type(payload.get('document_type_id'))
+            if document_type is None:
+                return 400, _encode({"document_type_id": ["Тип документа не найден"]}), None
+            # Сервер, как и настоящий, проверяет обязательные и уникальные поля
+            fields = document_type.get('fields', ())
+            required = [field['name'] for field in fields if field.get('required')]
+            unique = [(field['name'], self._unique_values.setdefault((document_type['id'], field['name']), set()))
+                      for field in fields if field.get('unique')]
+            stored = self.documents.setdefault(document_type['id'], [])
+            created = 0
+            errors = []
+            for index, document in enumerate(documents):
+                missing = [name for name in required if document.get(name) in (None, '')]
+                duplicate = [name for name, values in unique if document.get(name) in values]
+                if missing or duplicate:
+                    errors.extend({"index": index, "field": name, "message": "обязательное поле не заполнено"}
+                                  for name in missing)
+                    errors.extend({"index": index, "field": name, "message": "значение уже существует"}
+                                  for name in duplicate)
+                    continue
+                for name, values in unique:
+                    values.add(document.get(name))
+                stored.append(document)
+                created += 1
+            result = _encode({"created": created, "errors": errors})
+            if key:
+                self._document_results[key] = result
+        return 201, result, None
+
+@contextmanager
+def serve(**kwargs):
+    """
+    Запускает сервер-заглушку на время блока with.
+
+    Args:
+        **kwargs: Параметры FakeMCPServer
+
+    Yields:
+        str: Базовый URL сервера
+    """
+    with FakeMCPServer(**kwargs) as server:
+        yield server.url
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Локальный сервер-заглушка MCP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--processes', type=int, default=1, help="Количество процессов в каталоге")
+    parser.add_argument('--tasks', type=int, default=3, help="Задач в синтетическом процессе")
+    parser.add_argument('--document-types', type=int, default=3, help="Типов документов в синтетическом процессе")
+    parser.add_argument('--fields', type=int, default=4, help="Полей в типе документа")
+    parser.add_argument('--latency', type=float, default=0.0, help="Задержка ответа, с")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Случайная добавка к задержке, с")
+    parser.add_argument('--spike-rate', type=float, default=0.0, help="Доля ответов со всплеском задержки")
+    parser.add_argument('--spike-latency', type=float, default=1.0, help="Задержка при всплеске, с")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Доля ответов 503")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Доля ответов 429")
+    parser.add_argument('--page-size', type=int, default=None, help="Размер страницы /processes/ по умолчанию")
+    parser.add_argument('--token', default=None, help="Требуемый токен авторизации")
+    parser.add_argument('--compress', action='store_true', help="Сжимать ответы (gzip, deflate, br)")
+    parser.add_argument('--msgpack', action='store_true', help="Отвечать в MessagePack по заголовку Accept")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="Выводить журнал запросов")
+    args = parser.parse_args()
+
+    server = FakeMCPServer(
+        processes=args.processes, tasks=args.tasks, document_types=args.document_types,
+        fields=args.fields, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, page_size=args.page_size, token=args.token,
+        seed=args.seed, host=args.host, port=args.port, verbose=args.verbose,
+        spike_rate=args.spike_rate, spike_latency=args.spike_latency,
+        compress=args.compress, msgpack=args.msgpack,
+    )
+    print(f"Сервер-заглушка MCP: {server.url} (процессов: {len(server.catalog)})")
+    print(f"Для клиентов: PDM_MCP_URL={server.url}")
+    server.serve_forever()
@@ -0,0 +1,858 @@
+"""
+Потоковый импорт документов из CSV/NDJSON на MCP сервер с продолжением после остановки.
+
+Файл проходит конвейер из трех стадий, связанных ограниченными очередями
+(не больше queue_size пакетов в каждой), поэтому чтение не убегает вперед
+загрузки и память не зависит от размера файла:
+
+1. разбор — поток читает строки (CSV с заголовком или NDJSON, можно .gz)
+   и собирает их в пакеты по batch_size строк;
+2. проверка — названия колонок заменяются на поля типа документа
+   (mapping; у CSV — один раз в заголовке), значения проверяются и
+   приводятся скомпилированной проверкой mcp_validators, включая
+   уникальность полей "unique" (например, "номер") в пределах запуска.
+   Стадия работает в одном потоке: проверка — чистый Python и под GIL
+   потоками не ускоряется, а таблица уникальных значений у всех пакетов общая;
+3. загрузка — workers потоков отправляют пакеты запросом
+   POST {url}/documents/ через пул соединений mcp_client с повторами при
+   429/5xx и сетевых ошибках (как в mcp_bulk_launch). Ключ идемпотентности
+   пакета вычисляется из номеров строк и содержимого, поэтому повторная
+   отправка не создает дубликатов.
+
+Контрольная точка (по умолчанию <файл>.checkpoint) — JSON с позицией в файле
+(байтовое смещение и номер строки), до которой все пакеты обработаны, и
+итогами. Пакеты загружаются параллельно и завершаются не по порядку,
+поэтому позиция сдвигается только по непрерывному префиксу завершенных
+пакетов. Файл записывается атомарно (mcp_snapshot.atomic_write) раз в
+checkpoint_interval секунд и при остановке. Повторный запуск для того же
+файла продолжает с сохраненной позиции: чтение начинается сразу с нужного
+байта. Пакеты после позиции, загруженные до остановки, отправляются еще раз —
+сервер узнает их по ключу идемпотентности. Дубликаты номеров среди строк,
+загруженных до остановки, отклонит сервер.
+
+Отклоненные строки (ошибки разбора, проверки и ответа сервера) записываются
+в NDJSON файл rejects: {"row": N, "field": "...", "message": "..."}. Строки
+нумеруются с 1 без строки заголовка.
+
+Запуск:
+python mcp_import.py applications.csv --document-type Заявка
+python mcp_import.py applications.ndjson --document-type 1 --map "Номер заявки=номер" --workers 8
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+
+import requests
+
+from mcp_bulk_launch import (DEFAULT_BACKOFF_BASE, DEFAULT_BACKOFF_CAP, DEFAULT_MAX_RETRIES,
+                             IDEMPOTENCY_HEADER, RETRY_STATUSES, backoff_delay, retry_after)
+from mcp_client import MCPClient, get_client
+from mcp_codec import json_loads
+from mcp_snapshot import atomic_write, read_processes
+from mcp_validators import FieldError, compile_validator
+
+FORMATS = ('csv', 'ndjson')
+DEFAULT_CATALOG = 'mcp_processes_info.json'
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 4
+# Пакетов в каждой очереди между стадиями
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_CHECKPOINT_INTERVAL = 1.0
+DEFAULT_PROGRESS_INTERVAL = 2.0
+DOCUMENTS_PATH = 'documents/'
+CHECKPOINT_VERSION = 1
+# Как часто потоки стадий проверяют, не остановлен ли импорт, секунды
+POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+def detect_format(path):
+    """
+    Определяет формат файла по расширению (.csv, .ndjson, .jsonl, можно с .gz).
+
+    Raises:
+        ValueError: Если расширение не поддерживается
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    raise ValueError(f"Не удалось определить формат файла {path}: укажите {' или '.join(FORMATS)}")
+
+def find_document_type(processes, value):
+    """
+    Находит тип документа в каталоге по ID или названию.
+
+    Args:
+        processes (iterable): Бизнес-процессы (словари или mcp_models.Process)
+        value (int | str): ID или точное название типа документа
+
+    Returns:
+        dict | DocumentType: Тип документа с полями
+
+    Raises:
+        ValueError: Если тип документа не найден
+    """
+    document_type_id = int(value) if str(value).isdigit() else None
+    for process in processes:
+        for document_type in process.get('document_types', ()):
+            if document_type['id'] == document_type_id or document_type['name'] == value:
+                return document_type
+    raise ValueError(f"Тип документа не найден в каталоге: {value}")
+
+def _open(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+def _read_header(f, delimiter):
+    """Читает строку заголовка CSV; возвращает названия колонок."""
+    line = f.readline().decode('utf-8-sig')
+    header = next(csv.reader([line], delimiter=delimiter), None)
+    if not header:
+        raise ValueError("В CSV файле нет строки заголовка")
+    return [name.strip() for name in header]
+
+def _csv_rows(f, columns, delimiter):
+    """
+    Читает строки CSV с текущей позиции файла.
+
+    Yields:
+        tuple: (значения по колонкам или None, ошибка или None, позиция после строки)
+    """
+    position = f.tell()
+    # Ошибка кодировки в строках файла, из которых собирается текущая строка CSV
+    decode_error = None
+
+    def lines():
+        nonlocal position, decode_error
+        for line in f:
+            position += len(line)
+            try:
+                yield line.decode('utf-8')
+            except UnicodeDecodeError as e:
+                decode_error = decode_error or e
+                yield line.decode('utf-8', 'replace')
+
+    width = len(columns)
+    reader = csv.reader(lines(), delimiter=delimiter)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            decode_error = None
+            yield None, f"неверная строка CSV: {e}", position
+            continue
+        if decode_error is not None:
+            error, decode_error = decode_error, None
+            yield None, f"неверная кодировка UTF-8: {error}", position
+            continue
+        if not row:
+            continue
+        if len(row) != width:
+            yield None, f"ожидалось колонок: {width}, в строке: {len(row)}", position
+        else:
+            yield dict(zip(columns, row)), None, position
+
+def _ndjson_rows(f):
+    """
+    Читает строки NDJSON с текущей позиции файла.
+
+    Yields:
+        tuple: (документ или None, ошибка или None, позиция после строки)
+    """
+    position = f.tell()
+    for line in f:
+        position += len(line)
+        if not line.strip():
+            continue
+        try:
+            values = json_loads(line)
+        except ValueError as e:
+            yield None, f"неверный JSON: {e}", position
+            continue
+        if isinstance(values, dict):
+            yield values, None, position
+        else:
+            yield None, "ожидается JSON объект", position
+
+class _Batch:
+    """Пакет строк, проходящий по стадиям конвейера."""
+
+    __slots__ = ('number', 'items', 'last_row', 'end_offset', 'rows', 'documents', 'rejects', 'imported')
+
+    def __init__(self, number, items, last_row, end_offset):
+        self.number = number
+        # (номер строки, значения, ошибка разбора) — до стадии проверки
+        self.items = items
+        self.last_row = last_row
+        self.end_offset = end_offset
+        # Номера строк и проверенные документы — после стадии проверки
+        self.rows = ()
+        self.documents = ()
+        self.rejects = []
+        self.imported = 0
+
+class Checkpoint:
+    """
+    Позиция импорта, до которой все пакеты обработаны, и итоги.
+
+    Args:
+        path (str): Файл контрольной точки
+        source (str): Импортируемый файл
+        fmt (str): Формат импортируемого файла
+        document_type_id (int): ID типа документа
+        interval (float): Как часто сохранять при обработке пакетов, секунды
+    """
+
+    def __init__(self, path, source, fmt, document_type_id, interval=DEFAULT_CHECKPOINT_INTERVAL):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.format = fmt
+        self.document_type_id = document_type_id
+        self.interval = interval
+        self.header = None
+        self.offset = 0
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.rejects_path = None
+        self.rejects_size = 0
+        self.finished = False
+        self._pending = {}
+        self._next = 0
+        self._rejects = None
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Читает сохраненную контрольную точку, если она есть.
+
+        Returns:
+            bool: True, если контрольная точка прочитана
+
+        Raises:
+            ValueError: Если контрольная точка относится к другому файлу или типу документа
+        """
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        expected = (self.source, self.format, self.document_type_id)
+        if (state.get('source'), state.get('format'), state.get('document_type_id')) != expected:
+            raise ValueError(f"Контрольная точка {self.path} относится к другому импорту "
+                             f"({state.get('source')}, тип документа {state.get('document_type_id')}); "
+                             f"удалите ее или начните заново")
+        self.header = state.get('header')
+        self.offset = state['offset']
+        self.rows = state['rows']
+        self.imported = state.get('imported', 0)
+        self.rejected = state.get('rejected', 0)
+        self.rejects_path = state.get('rejects')
+        self.rejects_size = state.get('rejects_size', 0)
+        self.finished = state.get('finished', False)
+        return True
+
+    def open_rejects(self, path):
+        """
+        Открывает файл отклоненных строк для дозаписи.
+
+        Если файл тот же, что в контрольной точке, строки, записанные после
+        ее сохранения, отбрасываются — они будут записаны снова.
+        """
+        path = os.path.abspath(path)
+        size = self.rejects_size if path == self.rejects_path else 0
+        f = open(path, 'r+b' if size and os.path.exists(path) else 'wb')
+        f.truncate(size)
+        f.seek(size)
+        self._rejects = f
+        self.rejects_path = path
+        self.rejects_size = size
+
+    def close(self):
+        if self._rejects is not None:
+            self._rejects.close()
+            self._rejects = None
+
+    def complete(self, batch):
+        """
+        Учитывает обработанный пакет и сдвигает позицию по непрерывному префиксу.
+
+        Returns:
+            list: Пакеты, вошедшие в позицию (по порядку)
+        """
+        committed = []
+        with self._lock:
+            self._pending[batch.number] = batch
+            while self._next in self._pending:
+                batch = self._pending.pop(self._next)
+                self._next += 1
+                self.rows = batch.last_row
+                self.offset = batch.end_offset
+                self.imported += batch.imported
+                self.rejected += len({error.index for error in batch.rejects})
+                if self._rejects is not None and batch.rejects:
+                    self._rejects.write(b''.join(
+                        json.dumps({'row': error.index, 'field': error.field, 'message': error.message},
+                                   ensure_ascii=False).encode('utf-8') + b'\n'
+                        for error in batch.rejects))
+                committed.append(batch)
+            if committed and time.monotonic() - self._saved_at >= self.interval:
+                self._save()
+        return committed
+
+    def save(self):
+        """Атомарно записывает контрольную точку."""
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        # Вызывается под self._lock. Отклоненные строки сохраняются на диск раньше позиции
+        if self._rejects is not None:
+            self._rejects.flush()
+            os.fsync(self._rejects.fileno())
+            self.rejects_size = self._rejects.tell()
+        atomic_write(self.path, json.dumps(self.to_dict(), ensure_ascii=False, indent=2).encode('utf-8'))
+        self._saved_at = time.monotonic()
+
+    def to_dict(self):
+        return {
+            'version': CHECKPOINT_VERSION,
+            'source': self.source,
+            'format': self.format,
+            'document_type_id': self.document_type_id,
+            'header': self.header,
+            'offset': self.offset,
+            'rows': self.rows,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'rejects': self.rejects_path,
+            'rejects_size': self.rejects_size,
+            'finished': self.finished,
+        }
+
+class ImportStats:
+    """Статистика импорта."""
+
+    def __init__(self):
+        self.source = None
+        self.document_type = None
+        # Строк прочитано в этом запуске и пропущено по контрольной точке
+        self.rows = 0
+        self.skipped_rows = 0
+        # Итоги с учетом предыдущих запусков (из контрольной точки)
+        self.imported = 0
+        self.rejected = 0
+        self.retries = 0
+        self.elapsed = 0.0
+        self.finished = False
+        # Отклонено строк в этом запуске; первые ошибки — для вывода
+        self.rejected_now = 0
+        self.checkpoint = None
+        self.rejects = None
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def record_batches(self, batches):
+        with self._lock:
+            for batch in batches:
+                rejected = len({error.index for error in batch.rejects})
+                self.imported += batch.imported
+                self.rejected += rejected
+                self.rejected_now += rejected
+                if len(self.failures) < 10:
+                    self.failures.extend(batch.rejects[:10 - len(self.failures)])
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    @property
+    def throughput(self):
+        """float: Строк в секунду в этом запуске."""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def print(self):
+        print("=" * 60)
+        print(f"Файл: {self.source}, тип документа: {self.document_type}")
+        print(f"Прочитано строк: {self.rows}" +
+              (f" (пропущено по контрольной точке: {self.skipped_rows})" if self.skipped_rows else ""))
+        print(f"Загружено документов: {self.imported}, отклонено строк: {self.rejected}")
+        print(f"Повторов запросов: {self.retries}")
+        print(f"Время: {self.elapsed:.2f} с, скорость: {self.throughput:.0f} строк/с")
+        for error in self.failures:
+            field = f"поле '{error.field}': " if error.field is not None else ''
+            print(f"  ✗ строка {error.index}: {field}{error.message}")
+        shown = len({error.index for error in self.failures})
+        if self.rejected_now > shown:
+            print(f"  ... и еще строк: {self.rejected_now - shown}")
+        if self.rejected and self.rejects:
+            print(f"Отклоненные строки: {self.rejects}")
+        if self.finished:
+            print("Импорт завершен")
+        else:
+            print(f"Импорт остановлен, позиция сохранена в {self.checkpoint}: запустите снова, чтобы продолжить")
+        print("=" * 60)
+
+class DocumentImporter:
+    """
+    Импорт документов одного типа из файла через конвейер разбор → проверка → загрузка.
+
+    Пример:
+        processes = read_processes("mcp_processes_info.json")
+        importer = DocumentImporter(find_document_type(processes, "Заявка"), workers=8)
+        stats = importer.run("applications.csv", rejects="applications.rejects.ndjson")
+        stats.print()
+
+    Args:
+        document_type (dict | DocumentType): Тип документа с полями
+        client (MCPClient): Клиент (по умолчанию общий клиент mcp_client)
+        mapping (dict): Колонка файла → поле типа документа (остальные колонки — как есть)
+        batch_size (int): Строк в пакете (и документов в одном запросе)
+        workers (int): Потоков загрузки
+        queue_size (int): Пакетов в каждой очереди между стадиями
+        strict (bool): Считать ошибкой колонки, которых нет в типе документа
+        delimiter (str): Разделитель CSV
+        max_retries (int): Повторов запроса пакета при 429/5xx и сетевых ошибках
+        checkpoint_interval (float): Как часто сохранять контрольную точку, секунды
+        progress_interval (float): Как часто выводить ход импорта, секунды (0 — не выводить)
+    """
+
+    def __init__(self, document_type, client=None, mapping=None, batch_size=DEFAULT_BATCH_SIZE,
+                 workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE, strict=False, delimiter=',',
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_cap=DEFAULT_BACKOFF_CAP, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL,
+                 progress_interval=DEFAULT_PROGRESS_INTERVAL):
+        self.document_type_id = document_type['id']
+        self.document_type_name = document_type['name']
+        self.validator = compile_validator(document_type, strict)
+        self.client = client
+        self.mapping = dict(mapping or {})
+        self.batch_size = batch_size
+        self.workers = workers
+        self.queue_size = queue_size
+        self.delimiter = delimiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.checkpoint_interval = checkpoint_interval
+        self.progress_interval = progress_interval
+        self.stats = None
+        self._stop = threading.Event()
+        self._error = None
+        self._lock = threading.Lock()
+        self._queues = ()
+        self._uploading = 0
+        self._position = 0
+        self._size = None
+
+    def stop(self):
+        """Останавливает импорт; позиция сохраняется, следующий run() продолжит с нее."""
+        self._stop.set()
+
+    def status(self):
+        """
+        Ход импорта для вывода прогресса.
+
+        Returns:
+            dict: Строки, итоги, позиция в файле и число пакетов в очередях стадий
+        """
+        stats = self.stats
+        to_validate, to_upload = (queue_.qsize() for queue_ in self._queues) if self._queues else (0, 0)
+        return {
+            'rows': stats.rows if stats else 0,
+            'imported': stats.imported if stats else 0,
+            'rejected': stats.rejected if stats else 0,
+            'position': self._position,
+            'size': self._size,
+            'queues': {'validate': to_validate, 'upload': to_upload},
+            'queue_size': self.queue_size,
+            'uploading': self._uploading,
+            'workers': self.workers,
+        }
+
+    def run(self, path, fmt=None, checkpoint=None, rejects=None, restart=False):
+        """
+        Импортирует файл, продолжая с контрольной точки, если она есть.
+
+        Args:
+            path (str): CSV или NDJSON файл (можно .gz)
+            fmt (str): "csv" или "ndjson" (по умолчанию — по расширению)
+            checkpoint (str): Файл контрольной точки (по умолчанию <path>.checkpoint)
+            rejects (str): NDJSON файл для отклоненных строк (None — не записывать)
+            restart (bool): Начать сначала, не учитывая контрольную точку
+
+        Returns:
+            ImportStats: Статистика; finished=False, если импорт остановлен через stop()
+
+        Raises:
+            ValueError: Если контрольная точка не подходит к файлу
+            RuntimeError: Если пакет не удалось загрузить (позиция сохранена)
+        """
+        fmt = fmt or detect_format(path)
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат файла: {fmt}. Доступные: {', '.join(FORMATS)}")
+        state = Checkpoint(checkpoint or f"{path}.checkpoint", path, fmt, self.document_type_id,
+                           self.checkpoint_interval)
+        if not restart:
+            state.load()
+        stats = self.stats = ImportStats()
+        stats.source = path
+        stats.document_type = f"{self.document_type_name} (ID {self.document_type_id})"
+        stats.checkpoint = state.path
+        stats.rejects = rejects
+        stats.skipped_rows = state.rows
+        stats.imported = state.imported
+        stats.rejected = state.rejected
+        if state.finished:
+            stats.finished = True
+            return stats
+
+        self._stop.clear()
+        self._error = None
+        self._uploading = 0
+        self._size = None if path.endswith('.gz') else os.path.getsize(path)
+        if self._size is not None and self._size < state.offset:
+            raise ValueError(f"Файл {path} короче позиции в контрольной точке {state.path}: "
+                             f"файл изменился, начните заново")
+
+        client = own_client = None
+        if self.client is not None:
+            client = self.client
+        else:
+            client = get_client()
+            if client.pool_size < self.workers:
+                # Пул общего клиента меньше числа потоков загрузки
+                client = own_client = MCPClient(pool_size=self.workers)
+
+        to_validate = queue.Queue(self.queue_size)
+        to_upload = queue.Queue(self.queue_size)
+        self._queues = (to_validate, to_upload)
+        started = time.perf_counter()
+        f = _open(path)
+        try:
+            if fmt == 'csv':
+                if state.header is None:
+                    state.header = _read_header(f, self.delimiter)
+                    state.offset = f.tell()
+                else:
+                    f.seek(state.offset)
+                columns = [self.mapping.get(name, name) for name in state.header]
+                rows = _csv_rows(f, columns, self.delimiter)
+            else:
+                f.seek(state.offset)
+                rows = _ndjson_rows(f)
+            self._position = state.offset
+            if rejects:
+                state.open_rejects(rejects)
+
+            threads = [self._thread('read', self._read, rows, state, to_validate),
+                       self._thread('validate', self._validate, fmt, to_validate, to_upload)]
+            threads += [self._thread(f'upload-{number}', self._upload, client, to_upload, state)
+                        for number in range(self.workers)]
+            progress = progress_stop = None
+            if self.progress_interval:
+                progress_stop = threading.Event()
+                progress = threading.Thread(target=self._report, args=(progress_stop,),
+                                            name='mcp-import-progress', daemon=True)
+                progress.start()
+            for thread in threads:
+                thread.start()
+            try:
+                for thread in threads:
+                    # join с таймаутом, чтобы Ctrl+C прерывал ожидание
+                    while thread.is_alive():
+                        thread.join(POLL_INTERVAL)
+            except BaseException:
+                self._stop.set()
+                for thread in threads:
+                    thread.join()
+                raise
+            finally:
+                if progress is not None:
+                    progress_stop.set()
+                    progress.join()
+            stats.finished = not self._stop.is_set()
+            state.finished = stats.finished
+        finally:
+            f.close()
+            state.save()
+            state.close()
+            self._queues = ()
+            if own_client is not None:
+                own_client.close()
+            stats.elapsed = time.perf_counter() - started
+        if self._error is not None:
+            raise self._error
+        return stats
+
+    # Стадии конвейера
+
+    def _thread(self, name, target, *args):
+        def run():
+            try:
+                target(*args)
+            except BaseException as e:
+                with self._lock:
+                    if self._error is None:
+                        self._error = e
+                self._stop.set()
+        return threading.Thread(target=run, name=f'mcp-import-{name}', daemon=True)
+
+    def _put(self, queue_, item):
+        """Кладет элемент в очередь, пока импорт не остановлен; False — остановлен."""
+        while not self._stop.is_set():
+            try:
+                queue_.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, queue_):
+        """Берет элемент из очереди; _DONE — очередь закончилась или импорт остановлен."""
+        while not self._stop.is_set():
+            try:
+                return queue_.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _read(self, rows, state, output):
+        stats = self.stats
+        number = 0
+        row = state.rows
+        items = []
+        for values, error, position in rows:
+            row += 1
+            items.append((row, values, error))
+            if len(items) >= self.batch_size:
+                if not self._put(output, _Batch(number, items, row, position)):
+                    return
+                stats.rows += len(items)
+                self._position = position
+                number += 1
+                items = []
+        if items:
+            if not self._put(output, _Batch(number, items, row, position)):
+                return
+            stats.rows += len(items)
+            self._position = position
+        self._put(output, _DONE)
+
+    def _validate(self, fmt, input, output):
+        # У CSV колонки переименованы в заголовке; у NDJSON — в каждом документе
+        mapping = self.mapping if fmt == 'ndjson' else None
+        validate_batch = self.validator.validate_batch
+        seen = {}
+        while True:
+            batch = self._get(input)
+            if batch is _DONE:
+                break
+            rows = []
+            documents = []
+            rejects = []
+            for row, values, error in batch.items:
+                if error is not None:
+                    rejects.append(FieldError(row, None, error))
+                    continue
+                if mapping:
+                    values = {mapping.get(name, name): value for name, value in values.items()}
+                rows.append(row)
+                documents.append(values)
+            result = validate_batch(documents, seen=seen, indexes=rows)
+            batch.rows = [row for row, _ in result.valid]
+            batch.documents = [document for _, document in result.valid]
+            batch.rejects = sorted(rejects + result.errors, key=lambda error: error.index) if rejects else result.errors
+            batch.items = None
+            if not self._put(output, batch):
+                return
+        if not self._stop.is_set():
+            for _ in range(self.workers):
+                self._put(output, _DONE)
+
+    def _upload(self, client, input, state):
+        while True:
+            batch = self._get(input)
+            if batch is _DONE:
+                return
+            if batch.documents:
+                with self._lock:
+                    self._uploading += 1
+                try:
+                    if not self._send(client, batch):
+                        return
+                finally:
+                    with self._lock:
+                        self._uploading -= 1
+            self.stats.record_batches(state.complete(batch))
+
+    def _send(self, client, batch):
+        """Отправляет пакет с повторами; False — импорт остановлен во время ожидания повтора."""
+        body = json.dumps({'document_type_id': self.document_type_id, 'documents': batch.documents},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        first, last = batch.rows[0], batch.rows[-1]
+        key = uuid.uuid5(uuid.NAMESPACE_URL, f"documents:{first}-{last}:{hashlib.sha256(body).hexdigest()}")
+        headers = {'Content-Type': 'application/json', IDEMPOTENCY_HEADER: str(key)}
+        attempt = 0
+        while True:
+            delay = None
+            try:
+                response = client.post(DOCUMENTS_PATH, data=body, headers=headers)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            else:
+                # 409 — пакет с этим ключом уже загружен предыдущей попыткой
+                if response.status_code < 300 or response.status_code == 409:
+                    self._apply_result(client, batch, response)
+                    return True
+                if response.status_code not in RETRY_STATUSES:
+                    # Пакет отклонен целиком (например, тип документа не найден) — дальше не идем
+                    raise RuntimeError(f"Сервер отклонил пакет строк {first}–{last}: "
+                                       f"HTTP {response.status_code}: {response.text[:200]}")
+                error = f"HTTP {response.status_code}"
+                delay = retry_after(response)
+            if attempt >= self.max_retries:
+                raise RuntimeError(f"Пакет строк {first}–{last} не загружен за {attempt + 1} попыток: {error}")
+            self.stats.record_retry()
+            if delay is None:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+            if self._stop.wait(delay):
+                return False
+            attempt += 1
+
+    def _apply_result(self, client, batch, response):
+        result = client.decode(response) if response.status_code != 409 and response.content else {}
+        errors = result.get('errors') or ()
+        for error in errors:
+            batch.rejects.append(FieldError(batch.rows[error['index']], error.get('field'),
+                                            error.get('message') or "отклонено сервером"))
+        if errors:
+            batch.rejects.sort(key=lambda error: error.index)
+        rejected = len({error['index'] for error in errors})
+        batch.imported = result.get('created', len(batch.documents) - rejected)
+
+    # Ход импорта
+
+    def _report(self, stop):
+        previous, previous_time = self.stats.rows, time.perf_counter()
+        while not stop.wait(self.progress_interval):
+            now = time.perf_counter()
+            status = self.status()
+            rate = (status['rows'] - previous) / (now - previous_time)
+            previous, previous_time = status['rows'], now
+            print(format_status(status, rate), file=sys.stderr, flush=True)
+
+def format_status(status, rate=None):
+    """
+    Строка хода импорта: строки, скорость, итоги и очереди стадий.
+
+    Args:
+        status (dict): Результат DocumentImporter.status()
+        rate (float): Строк в секунду за последний интервал
+
+    Returns:
+        str: Например "[ 45.2%] строк: 452000 (150210/с), загружено: 443000, отклонено: 9000 | очереди: ..."
+    """
+    parts = []
+    if status['size']:
+        parts.append(f"[{status['position'] / status['size']:6.1%}] ")
+    parts.append(f"строк: {status['rows']}")
+    if rate is not None:
+        parts.append(f" ({rate:.0f}/с)")
+    queues = status['queues']
+    parts.append(f", загружено: {status['imported']}, отклонено: {status['rejected']} | "
+                 f"очереди: проверка {queues['validate']}/{status['queue_size']}, "
+                 f"загрузка {queues['upload']}/{status['queue_size']}, "
+                 f"отправляется {status['uploading']}/{status['workers']}")
+    return ''.join(parts)
+
+def parse_mapping(items):
+    """
+    Разбирает соответствия колонок полям вида "колонка=поле".
+
+    Returns:
+        dict: Колонка → поле
+
+    Raises:
+        ValueError: Если в элементе нет "="
+    """
+    mapping = {}
+    for item in items or ():
+        column, separator, field = item.partition('=')
+        if not separator or not column.strip() or not field.strip():
+            raise ValueError(f"Соответствие колонки задается как колонка=поле: {item!r}")
+        mapping[column.strip()] = field.strip()
+    return mapping
+
+def import_file(path, document_type, catalog=DEFAULT_CATALOG, fmt=None, checkpoint=None, rejects=None,
+                restart=False, **kwargs):
+    """
+    Импортирует файл и выводит статистику.
+
+    Args:
+        path (str): CSV или NDJSON файл
+        document_type (int | str): ID или название типа документа
+        catalog (str): Снимок каталога процессов с описанием типов документов
+        fmt, checkpoint, rejects, restart: См. DocumentImporter.run()
+        **kwargs: Параметры DocumentImporter
+
+    Returns:
+        ImportStats: Статистика импорта
+    """
+    importer = DocumentImporter(find_document_type(read_processes(catalog), document_type), **kwargs)
+    try:
+        stats = importer.run(path, fmt, checkpoint, rejects, restart)
+    except KeyboardInterrupt:
+        if importer.stats is not None:
+            importer.stats.print()
+        raise
+    stats.print()
+    return stats
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Импорт документов из CSV/NDJSON на MCP сервер")
+    parser.add_argument('file', help="CSV (с заголовком) или NDJSON файл, можно .gz")
+    parser.add_argument('--document-type', required=True, help="ID или название типа документа")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help="Снимок каталога с типами документов")
+    parser.add_argument('--format', choices=FORMATS, default=None, help="Формат файла (по умолчанию — по расширению)")
+    parser.add_argument('--map', action='append', dest='mapping', metavar='КОЛОНКА=ПОЛЕ',
+                        help="Соответствие колонки полю (можно несколько)")
+    parser.add_argument('--delimiter', default=',', help="Разделитель CSV")
+    parser.add_argument('--strict', action='store_true', help="Отклонять строки с лишними колонками")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Потоков загрузки")
+    parser.add_argument('--retries', type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument('--checkpoint', help="Файл контрольной точки (по умолчанию <файл>.checkpoint)")
+    parser.add_argument('--rejects', help="NDJSON файл для отклоненных строк")
+    parser.add_argument('--restart', action='store_true', help="Начать сначала, не учитывая контрольную точку")
+    parser.add_argument('--quiet', action='store_true', help="Не выводить ход импорта")
+    args = parser.parse_args()
+
+    try:
+        stats = import_file(
+            args.file, args.document_type, catalog=args.catalog, fmt=args.format,
+            checkpoint=args.checkpoint, rejects=args.rejects, restart=args.restart,
+            mapping=parse_mapping(args.mapping), delimiter=args.delimiter, strict=args.strict,
+            batch_size=args.batch_size, workers=args.workers, max_retries=args.retries,
+            progress_interval=0 if args.quiet else DEFAULT_PROGRESS_INTERVAL,
+        )
+    except KeyboardInterrupt:
+        raise SystemExit(130)
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        raise SystemExit(1)
+    raise SystemExit(1 if stats.rejected else 0)
@@ -0,0 +1,114 @@
+"""
+Потоковый разбор JSON для больших ответов MCP сервера и файлов-снимков.
+
+iter_json_array() разбирает JSON массив по частям и отдает элементы по
+одному, не дожидаясь конца данных и не держа весь массив в памяти.
+json_default() позволяет json.dumps() записывать модели mcp_models.
+"""
+
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+def json_default(value):
+    """
+    Хук default для json.dumps(): объекты с методом to_dict() (модели
+    mcp_models) записываются как словари в формате MCP сервера.
+
+    Raises:
+        TypeError: Если объект не сериализуется
+    """
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+def _may_continue(buffer, end):
+    """True, если после значения до конца буфера идут только символы числа."""
+    while end < len(buffer) and buffer[end] in _NUMBER_CHARS:
+        end += 1
+    return end == len(buffer)
+
+def iter_json_array(chunks):
+    """
+    Разбирает JSON массив, поступающий частями, и отдает его элементы по одному.
+
+    Args:
+        chunks (iterable): Части документа (bytes в UTF-8 или str)
+
+    Yields:
+        Элементы массива в порядке следования
+
+    Raises:
+        ValueError: Если данные не являются корректным JSON массивом
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    started = False
+    finished = False
+    # None — сразу после "[", True — ожидается элемент, False — запятая или "]"
+    expect_value = None
+    chunks = iter(chunks)
+    exhausted = False
+
+    while not finished:
+        # Пропускаем пробелы
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+
+        if pos < len(buffer):
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise ValueError("Ожидался JSON массив")
+                started = True
+                pos += 1
+                continue
+            if expect_value is None and char == ']':
+                # Пустой массив
+                finished = True
+                pos += 1
+                continue
+            if expect_value is False:
+                if char == ']':
+                    finished = True
+                elif char == ',':
+                    expect_value = True
+                else:
+                    raise ValueError("Ожидалась запятая или конец JSON массива")
+                pos += 1
+                continue
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise ValueError("Некорректный JSON массив")
+                item = end = None
+            # Число, которое доходит до конца буфера, может быть обрезано
+            # ("2" из "2.5", "1e" из "1e5") — дождемся следующей части
+            if end is not None and (exhausted or not _may_continue(buffer, end)):
+                yield item
+                pos = end
+                expect_value = False
+                continue
+
+        if exhausted:
+            raise ValueError("Неожиданный конец JSON массива")
+
+        # Нужны еще данные: отбрасываем разобранную часть буфера
+        buffer = buffer[pos:]
+        pos = 0
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            exhausted = True
+            buffer += decoder.decode(b'', final=True)
+            continue
+        buffer += decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+    if buffer[pos:].strip(_WHITESPACE):
+        raise ValueError("Лишние данные после JSON массива")
@@ -0,0 +1,335 @@
+"""
+Адаптивные таймауты и дублирующие (hedged) запросы для чтения каталога.
+
+Фиксированный таймаут (10 секунд) означает, что один медленный воркер MCP
+сервера задерживает обработчик на все 10 секунд. LatencyPolicy запоминает
+последние задержки ответов по каждому шаблону адреса (например,
+"/processes/{id}/") и использует их перцентили:
+
+- адаптивный таймаут чтения — timeout_multiplier × p99 (не меньше
+  min_timeout и не больше таймаута клиента);
+- дублирующий запрос — если ответа нет дольше p95, отправляется второй
+  такой же запрос, используется тот ответ, что пришел первым. Второй ответ
+  закрывается. Дублируются только идемпотентные GET запросы на чтение.
+
+Число дублирующих запросов ограничено бюджетом: каждый обычный запрос
+добавляет hedge_budget токена (не больше hedge_burst), дубль тратит один
+токен. При hedge_budget=0.1 дублей не больше 10% от числа запросов, даже
+если сервер тормозит целиком.
+
+Пока по адресу меньше min_samples ответов, используются обычный таймаут
+и запросы без дублей.
+
+Параметры задаются в разделе "pdm.latency" конфигурации:
+{
+  "pdm": {
+    "latency": {
+      "adaptive_timeout": true,
+      "hedge": true,
+      "hedge_percentile": 0.95,
+      "hedge_budget": 0.1
+    }
+  }
+}
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+DEFAULT_WINDOW = 256
+DEFAULT_MIN_SAMPLES = 20
+# Перцентили пересчитываются не на каждый ответ, а раз в REFRESH_EVERY ответов
+REFRESH_EVERY = 16
+
+class LatencyWindow:
+    """Последние задержки ответов одного адреса и их перцентили."""
+
+    __slots__ = ('samples', '_sorted', '_pending')
+
+    def __init__(self, size=DEFAULT_WINDOW):
+        self.samples = deque(maxlen=size)
+        self._sorted = None
+        self._pending = 0
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+        self._pending += 1
+        if self._pending >= REFRESH_EVERY:
+            self._sorted = None
+
+    def percentile(self, q):
+        """
+        Возвращает перцентиль задержки (ближайший ранг).
+
+        Args:
+            q (float): Квантиль от 0 до 1
+
+        Returns:
+            float: Задержка в секундах или None, если ответов не было
+        """
+        if not self.samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self.samples)
+            self._pending = 0
+        index = min(len(self._sorted) - 1, int(q * len(self._sorted)))
+        return self._sorted[index]
+
+    def __len__(self):
+        return len(self.samples)
+
+class HedgeBudget:
+    """
+    Бюджет дублирующих запросов (token bucket).
+
+    Args:
+        ratio (float): Сколько дублей разрешено на один обычный запрос
+        burst (float): Максимальный запас токенов
+    """
+
+    def __init__(self, ratio=0.1, burst=10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """Учитывает обычный запрос."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self):
+        """
+        Забирает токен на дублирующий запрос.
+
+        Returns:
+            bool: True, если бюджет позволяет отправить дубль
+        """
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+class LatencyStats:
+    """Счетчики LatencyPolicy."""
+
+    __slots__ = ('requests', 'hedged', 'hedge_wins', 'budget_denied', 'timeouts')
+
+    def __init__(self):
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.timeouts = 0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class LatencyPolicy:
+    """
+    Адаптивные таймауты и дублирующие запросы по перцентилям задержки.
+
+    Пример:
+        policy = LatencyPolicy(hedge=True)
+        client = MCPClient(latency_policy=policy)
+        client.get_process(1)            # таймаут и дубль по истории /processes/{id}/
+        print(policy.stats.to_dict())
+
+    Args:
+        adaptive_timeout (bool): Вычислять таймаут чтения по перцентилю задержки
+        timeout_percentile (float): Перцентиль для таймаута
+        timeout_multiplier (float): Во сколько раз таймаут больше перцентиля
+        min_timeout (float): Минимальный таймаут чтения, секунды
+        hedge (bool): Отправлять дублирующие запросы
+        hedge_percentile (float): Через какой перцентиль задержки отправлять дубль
+        hedge_budget (float): Доля дублей от числа запросов
+        hedge_burst (float): Сколько дублей подряд можно отправить из запаса
+        min_hedge_delay (float): Минимальная задержка перед дублем, секунды
+        window (int): Сколько последних ответов учитывать
+        min_samples (int): Сколько ответов нужно, чтобы начать адаптацию
+        max_workers (int): Потоков для параллельных попыток
+    """
+
+    def __init__(self, adaptive_timeout=True, timeout_percentile=0.99, timeout_multiplier=3.0,
+                 min_timeout=0.2, hedge=False, hedge_percentile=0.95, hedge_budget=0.1,
+                 hedge_burst=10.0, min_hedge_delay=0.001, window=DEFAULT_WINDOW,
+                 min_samples=DEFAULT_MIN_SAMPLES, max_workers=32):
+        self.adaptive_timeout = adaptive_timeout
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.budget = HedgeBudget(hedge_budget, hedge_burst)
+        self.min_hedge_delay = min_hedge_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.stats = LatencyStats()
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, pdm):
+        """
+        Создает политику из раздела "pdm" конфигурации.
+
+        Returns:
+            LatencyPolicy: Политика или None, если адаптивные таймауты и дубли выключены
+        """
+        options = dict(pdm.get('latency') or {})
+        if not options.get('adaptive_timeout') and not options.get('hedge'):
+            return None
+        options.setdefault('adaptive_timeout', False)
+        return cls(**options)
+
+    def _window(self, endpoint):
+        window = self._windows.get(endpoint)
+        if window is None:
+            with self._lock:
+                window = self._windows.setdefault(endpoint, LatencyWindow(self.window))
+        return window
+
+    def observe(self, endpoint, seconds):
+        """Запоминает задержку ответа (до получения заголовков)."""
+        window = self._window(endpoint)
+        with self._lock:
+            window.observe(seconds)
+
+    def percentile(self, endpoint, q):
+        """
+        Возвращает перцентиль задержки адреса.
+
+        Returns:
+            float: Секунды или None, если ответов меньше min_samples
+        """
+        window = self._windows.get(endpoint)
+        if window is None or len(window) < self.min_samples:
+            return None
+        with self._lock:
+            return window.percentile(q)
+
+    def read_timeout(self, endpoint, default):
+        """
+        Возвращает таймаут чтения для адреса.
+
+        Args:
+            endpoint (str): Шаблон адреса
+            default (float): Таймаут клиента — он же верхняя граница
+
+        Returns:
+            float: Таймаут в секундах
+        """
+        if not self.adaptive_timeout:
+            return default
+        latency = self.percentile(endpoint, self.timeout_percentile)
+        if latency is None:
+            return default
+        return min(default, max(self.min_timeout, latency * self.timeout_multiplier))
+
+    def hedge_delay(self, endpoint):
+        """
+        Возвращает, через сколько секунд без ответа отправлять дубль.
+
+        Returns:
+            float: Секунды или None, если дубли выключены или истории мало
+        """
+        if not self.hedge:
+            return None
+        latency = self.percentile(endpoint, self.hedge_percentile)
+        if latency is None:
+            return None
+        return max(self.min_hedge_delay, latency)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def _attempt(self, send, endpoint, timeout):
+        try:
+            response = send(timeout)
+        except requests.exceptions.Timeout:
+            # Таймаут — тоже наблюдение: следующий таймаут станет больше
+            self._count('timeouts')
+            self.observe(endpoint, timeout[1])
+            raise
+        self.observe(endpoint, response.elapsed.total_seconds())
+        return response
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='mcp-hedge')
+        return self._executor
+
+    def call(self, send, endpoint, timeout, adaptive=True):
+        """
+        Выполняет запрос на чтение с адаптивным таймаутом и, если нужно, дублем.
+
+        Args:
+            send (callable): Функция timeout -> requests.Response, выполняющая запрос
+            endpoint (str): Шаблон адреса, по которому ведется история задержек
+            timeout (tuple): Таймауты клиента (соединение, чтение)
+            adaptive (bool): Подбирать таймаут чтения (False — таймаут задан явно)
+
+        Returns:
+            requests.Response: Первый полученный ответ
+
+        Raises:
+            requests.RequestException: Если не удалась ни одна попытка
+        """
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        if adaptive:
+            timeout = (timeout[0], self.read_timeout(endpoint, timeout[1]))
+        self._count('requests')
+        self.budget.deposit()
+        delay = self.hedge_delay(endpoint)
+        if delay is None:
+            return self._attempt(send, endpoint, timeout)
+
+        executor = self._get_executor()
+        primary = executor.submit(self._attempt, send, endpoint, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        if not self.budget.try_spend():
+            self._count('budget_denied')
+            return primary.result()
+
+        self._count('hedged')
+        hedge = executor.submit(self._attempt, send, endpoint, timeout)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                if future is hedge:
+                    self._count('hedge_wins')
+                # Опоздавший ответ (в том числе пришедший в том же wait())
+                # закрываем, чтобы вернуть соединение в пул
+                for other in done | pending:
+                    if other is not future:
+                        other.add_done_callback(_discard)
+                return future.result()
+        raise error
+
+    def close(self):
+        """Останавливает потоки параллельных попыток."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+def _discard(future):
+    if future.exception() is None:
+        future.result().close()
@@ -0,0 +1,454 @@
+"""
+Метрики запросов к MCP серверу.
+
+Для каждого запроса через MCPClient записываются:
+- время разрешения имени (DNS), установки TCP соединения и TLS рукопожатия —
+  только для новых соединений; при повторном использовании соединения из пула
+  эти этапы не выполняются и не записываются;
+- время до первого байта ответа (TTFB) и полное время запроса
+  (для потоковых ответов — до закрытия ответа);
+- размер ответа в байтах (как передан по сети) и код ответа.
+
+Запросы группируются по методу и шаблону адреса: "/processes/12/" учитывается
+как "/processes/{id}/". Значения складываются в гистограммы с фиксированными
+границами, поэтому запись одного запроса занимает единицы микросекунд
+и метрики можно не отключать в продакшне.
+
+Переменные окружения:
+- PDM_MCP_METRICS=0 — не собирать метрики;
+- PDM_MCP_TRACE=1 — записывать каждый запрос в журнал "mcp.trace" (одна JSON строка на запрос);
+- PDM_MCP_METRICS_FILE — файл, в который скрипты сохраняют метрики
+  после работы (.prom/.txt — формат Prometheus, иначе JSON).
+
+Пример:
+    from mcp_metrics import get_metrics
+
+    print(get_metrics().to_prometheus())    # текстовый формат Prometheus
+    get_metrics().dump("metrics.json")      # JSON
+"""
+
+import json
+import logging
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+# Границы гистограмм времени (секунды) и размера ответа (байты)
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Этапы запроса: имя → (метрика Prometheus, описание)
+PHASES = {
+    'dns': ('mcp_request_dns_seconds', "Время разрешения имени сервера"),
+    'connect': ('mcp_request_connect_seconds', "Время установки TCP соединения"),
+    'tls': ('mcp_request_tls_seconds', "Время TLS рукопожатия"),
+    'ttfb': ('mcp_request_ttfb_seconds', "Время до получения заголовков ответа"),
+    'total': ('mcp_request_duration_seconds', "Полное время запроса"),
+}
+
+trace_logger = logging.getLogger('mcp.trace')
+
+_local = threading.local()
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+def endpoint_template(url, base_url=''):
+    """
+    Возвращает шаблон адреса запроса без базового URL, параметров и ID.
+
+    Пример:
+        endpoint_template("http://host/mcp/processes/12/?a=1", "http://host/mcp")
+        # -> "/processes/{id}/"
+    """
+    path = urlsplit(url).path
+    base_path = urlsplit(base_url).path.rstrip('/')
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    return _ID_SEGMENT.sub('/{id}', path) or '/'
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Последняя корзина — значения больше последней границы (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Оценивает квантиль по корзинам: возвращает верхнюю границу корзины,
+        в которую он попадает (None, если наблюдений нет).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+class EndpointStats:
+    """Метрики запросов одного метода к одному шаблону адреса."""
+
+    __slots__ = ('statuses', 'phases', 'size', 'bytes')
+
+    def __init__(self):
+        self.statuses = {}
+        self.phases = {phase: Histogram(TIME_BUCKETS) for phase in PHASES}
+        self.size = Histogram(SIZE_BUCKETS)
+        self.bytes = 0
+
+class Span:
+    """Замеры одного запроса."""
+
+    __slots__ = ('trace_id', 'method', 'endpoint', 'url', 'timestamp', 'started',
+                 'dns', 'connect', 'tls', 'ttfb', 'total', 'bytes', 'status', 'error', 'finished')
+
+    def __init__(self, method, endpoint, url):
+        self.trace_id = None
+        self.method = method
+        self.endpoint = endpoint
+        self.url = url
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+        self.dns = self.connect = self.tls = self.ttfb = self.total = None
+        self.bytes = 0
+        self.status = None
+        self.error = None
+        self.finished = False
+
+    def to_dict(self):
+        data = {
+            'trace_id': self.trace_id,
+            'method': self.method,
+            'endpoint': self.endpoint,
+            'url': self.url,
+            'timestamp': self.timestamp,
+            'status': self.status,
+            'bytes': self.bytes,
+        }
+        for phase in PHASES:
+            value = getattr(self, phase)
+            if value is not None:
+                data[f"{phase}_ms"] = round(value * 1000, 3)
+        if self.error:
+            data['error'] = self.error
+        return data
+
+class MetricsRegistry:
+    """
+    Хранилище метрик запросов к MCP серверу.
+
+    Args:
+        enabled (bool): Собирать метрики (по умолчанию — если не задано PDM_MCP_METRICS=0)
+        trace (bool): Записывать каждый запрос в журнал "mcp.trace"
+            (по умолчанию — если задано PDM_MCP_TRACE=1)
+    """
+
+    def __init__(self, enabled=None, trace=None):
+        if enabled is None:
+            enabled = os.environ.get('PDM_MCP_METRICS', '1') not in ('0', 'false', 'no')
+        if trace is None:
+            trace = os.environ.get('PDM_MCP_TRACE', '0') in ('1', 'true', 'yes')
+        self.enabled = enabled
+        self.trace = trace
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        if trace and not trace_logger.handlers and not logging.getLogger().handlers:
+            # Журнал включен переменной окружения, но logging не настроен — выводим в stderr
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            trace_logger.addHandler(handler)
+            trace_logger.setLevel(logging.INFO)
+
+    def start(self, method, url, base_url=''):
+        """
+        Начинает замер запроса и делает его текущим для потока,
+        чтобы соединение из пула могло записать время DNS/TCP/TLS.
+
+        Returns:
+            Span: Замер или None, если метрики отключены
+        """
+        if not self.enabled:
+            return None
+        span = Span(method, endpoint_template(url, base_url), url)
+        if self.trace:
+            span.trace_id = uuid.uuid4().hex[:16]
+        _local.span = span
+        return span
+
+    def headers_received(self, span, response):
+        """Отмечает получение ответа: код и время до заголовков (по response.elapsed)."""
+        _local.span = None
+        span.ttfb = response.elapsed.total_seconds()
+        span.status = response.status_code
+
+    def finish(self, span, response=None, error=None):
+        """
+        Завершает замер и добавляет его в гистограммы.
+
+        Args:
+            span (Span): Замер
+            response (requests.Response): Ответ (размер берется из response.raw)
+            error (BaseException): Исключение, если запрос не удался
+        """
+        if span.finished:
+            return
+        span.finished = True
+        _local.span = None
+        span.total = time.perf_counter() - span.started
+        if response is not None:
+            span.bytes = _response_bytes(response)
+        if error is not None:
+            span.error = type(error).__name__
+            span.status = 'error'
+
+        key = (span.method, span.endpoint)
+        status = str(span.status)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats()
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes += span.bytes
+            stats.size.observe(span.bytes)
+            phases = stats.phases
+            for phase in PHASES:
+                value = getattr(span, phase)
+                if value is not None:
+                    phases[phase].observe(value)
+        if self.trace:
+            trace_logger.info(json.dumps(span.to_dict(), ensure_ascii=False))
+
+    def reset(self):
+        """Удаляет все накопленные метрики."""
+        with self._lock:
+            self._endpoints = {}
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted(self._endpoints.items())
+
+    def to_dict(self):
+        """
+        Возвращает метрики в виде словаря для JSON.
+
+        Квантили оцениваются по корзинам гистограмм (верхняя граница корзины).
+        """
+        return {
+            'endpoints': [
+                {
+                    'method': method,
+                    'endpoint': endpoint,
+                    'requests': dict(stats.statuses),
+                    'bytes': stats.bytes,
+                    'phases': {phase: histogram.to_dict() for phase, histogram in stats.phases.items()
+                               if histogram.count},
+                }
+                for (method, endpoint), stats in self._snapshot()
+            ],
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """
+        Возвращает метрики в текстовом формате Prometheus.
+
+        Returns:
+            str: Текст для ответа на /metrics
+        """
+        snapshot = self._snapshot()
+        lines = [
+            "# HELP mcp_requests_total Количество запросов к MCP серверу",
+            "# TYPE mcp_requests_total counter",
+        ]
+        for (method, endpoint), stats in snapshot:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f"mcp_requests_total{_labels(method, endpoint, status=status)} {count}")
+
+        lines += [
+            "# HELP mcp_response_bytes_total Объем ответов MCP сервера в байтах",
+            "# TYPE mcp_response_bytes_total counter",
+        ]
+        for (method, endpoint), stats in snapshot:
+            lines.append(f"mcp_response_bytes_total{_labels(method, endpoint)} {stats.bytes}")
+
+        histograms = [(name, help_text, lambda stats, phase=phase: stats.phases[phase])
+                      for phase, (name, help_text) in PHASES.items()]
+        histograms.append(('mcp_response_size_bytes', "Размер ответа MCP сервера", lambda stats: stats.size))
+        for name, help_text, select in histograms:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, endpoint), stats in snapshot:
+                histogram = select(stats)
+                if not histogram.count:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(method, endpoint, le=_format(bound))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(method, endpoint, le='+Inf')} {histogram.count}")
+                lines.append(f"{name}_sum{_labels(method, endpoint)} {_format(histogram.sum)}")
+                lines.append(f"{name}_count{_labels(method, endpoint)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """
+        Сохраняет метрики в файл: в формате Prometheus, если имя оканчивается
+        на .prom или .txt, иначе в JSON.
+        """
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def print_summary(self):
+        """Выводит краткую таблицу метрик по адресам."""
+        snapshot = self._snapshot()
+        if not snapshot:
+            return
+        print(f"\n{'запрос':40s} {'кол-во':>7s} {'p50, мс':>9s} {'p95, мс':>9s} {'TTFB p50':>9s} {'КБ':>9s}")
+        for (method, endpoint), stats in snapshot:
+            total = stats.phases['total']
+            ttfb = stats.phases['ttfb']
+            print(f"{method + ' ' + endpoint:40s} {total.count:7d} {_ms(total.quantile(0.5)):>9s} "
+                  f"{_ms(total.quantile(0.95)):>9s} {_ms(ttfb.quantile(0.5)):>9s} {stats.bytes / 1024:9.1f}")
+
+def _labels(method, endpoint, **extra):
+    labels = {'method': method, 'endpoint': endpoint, **extra}
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format(value):
+    return repr(float(value))
+
+def _ms(value):
+    if value is None:
+        return '-'
+    if value == float('inf'):
+        return f">{TIME_BUCKETS[-1] * 1000:.0f}"
+    return f"≤{value * 1000:g}"
+
+def _response_bytes(response):
+    raw = getattr(response, 'raw', None)
+    tell = getattr(raw, 'tell', None)
+    if tell is not None:
+        try:
+            return tell()
+        except (OSError, ValueError):
+            pass
+    return 0
+
+# Соединения urllib3, которые записывают время DNS/TCP/TLS в текущий замер потока
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        span = getattr(_local, 'span', None)
+        if span is None:
+            return super()._new_conn()
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            # Ошибку разрешения имени сформирует urllib3
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        span.dns = resolved - started
+        # Подключаемся к уже разрешенным адресам по очереди, как create_connection()
+        error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+                    continue
+                span.connect = time.perf_counter() - resolved
+                return sock
+        finally:
+            self._dns_host = host
+        raise error
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        span = getattr(_local, 'span', None)
+        started = time.perf_counter()
+        super().connect()
+        if span is not None and span.connect is not None:
+            span.tls = max(0.0, time.perf_counter() - started - span.dns - span.connect)
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, соединения которого записывают время DNS, TCP и TLS в текущий замер."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+_metrics = MetricsRegistry()
+
+def get_metrics():
+    """
+    Возвращает общее для процесса хранилище метрик, в которое пишут клиенты MCP.
+
+    Returns:
+        MetricsRegistry: Хранилище метрик
+    """
+    return _metrics
+
+def dump_metrics_file():
+    """
+    Сохраняет общие метрики в файл из переменной окружения PDM_MCP_METRICS_FILE.
+
+    Returns:
+        str: Путь к файлу или None, если переменная не задана
+    """
+    path = os.environ.get('PDM_MCP_METRICS_FILE')
+    if path:
+        _metrics.dump(path)
+    return path
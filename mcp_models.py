@@ -0,0 +1,361 @@
+"""
+Компактные модели каталога бизнес-процессов.
+
+Вместо вложенных словарей процессы можно держать в памяти как объекты
+со __slots__: Process, TaskTemplate, DocumentType и Field. У них нет
+словаря атрибутов на каждый объект, а повторяющиеся значения хранятся
+один раз:
+- типы полей и операторы условий — члены перечислений FieldType и Operator
+  (это str, поэтому сравнение со строками работает как раньше);
+- одинаковые поля (название, тип, обязательность, уникальность) — один общий объект Field;
+- одинаковые типы документов в разных процессах — один общий DocumentType.
+
+Field и DocumentType неизменяемы, потому что используются совместно.
+При lazy=True типы документов процесса разбираются только при первом
+обращении к process.document_types — это ускоряет загрузку, если нужны
+только названия процессов и задачи.
+
+Для совместимости с кодом, работающим со словарями, модели поддерживают
+process['name'] и process.get('tasks'); to_dict() возвращает словарь
+в формате MCP сервера.
+
+Пример:
+    processes = load_processes("mcp_processes_info.json")
+    for process in processes:
+        print(process.name, [task.name for task in process.tasks])
+"""
+
+import sys
+from enum import Enum
+
+class FieldType(str, Enum):
+    """Тип поля документа."""
+
+    STRING = 'строка'
+    DATE = 'дата'
+    TEXT = 'текст'
+    BOOLEAN = 'булево'
+
+    __str__ = str.__str__
+
+class Operator(str, Enum):
+    """Оператор условия запуска задачи (см. mcp_conditions.py)."""
+
+    EQUALS = 'equals'
+    NOT_EQUALS = 'not_equals'
+    IN = 'in'
+    NOT_IN = 'not_in'
+
+    __str__ = str.__str__
+
+# Сколько разных полей и типов документов хранить в общих таблицах
+SHARED_LIMIT = 65536
+
+_FIELD_TYPES = {member.value: member for member in FieldType}
+_fields = {}
+_document_types = {}
+
+def field_type(value):
+    """
+    Возвращает член FieldType для известного типа поля или интернированную строку для прочих.
+
+    Args:
+        value (str): Тип поля из ответа сервера
+
+    Returns:
+        str: FieldType или строка
+    """
+    member = _FIELD_TYPES.get(value)
+    if member is not None:
+        return member
+    return sys.intern(value) if isinstance(value, str) else value
+
+class _Mapping:
+    """Доступ к атрибутам модели как к ключам словаря."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in self._keys:
+            return default
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def keys(self):
+        return self._keys
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self._keys)
+
+    def __repr__(self):
+        values = ', '.join(f"{key}={getattr(self, key)!r}" for key in self._keys)
+        return f"{type(self).__name__}({values})"
+
+class _Frozen(_Mapping):
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} неизменяем")
+
+    __delattr__ = __setattr__
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, key) for key in self._keys))
+
+class Field(_Frozen):
+    """
+    Поле типа документа. Неизменяемо; одинаковые поля — один общий объект (см. Field.of()).
+
+    Args:
+        name (str): Название поля
+        type (str): Тип поля (FieldType или строка)
+        required (bool): Обязательное ли поле
+        unique (bool): Уникально ли значение поля среди документов этого типа
+    """
+
+    __slots__ = ('name', 'type', 'required', 'unique', '_hash')
+    _keys = ('name', 'type', 'required', 'unique')
+
+    def __init__(self, name, type, required=False, unique=False):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'type', field_type(type))
+        object.__setattr__(self, 'required', bool(required))
+        object.__setattr__(self, 'unique', bool(unique))
+        # Поля входят в ключ общей таблицы типов документов — хэш считается один раз
+        object.__setattr__(self, '_hash', hash((self.name, self.type, self.required, self.unique)))
+
+    def __hash__(self):
+        return self._hash
+
+    @classmethod
+    def of(cls, name, type, required=False, unique=False):
+        """Возвращает общий объект для поля с такими значениями."""
+        return _field((name, type, required, unique))
+
+    @classmethod
+    def from_dict(cls, data):
+        return _field((data['name'], data['type'], data.get('required', False), data.get('unique', False)))
+
+    def to_dict(self):
+        data = {'name': self.name, 'type': str(self.type), 'required': self.required}
+        if self.unique:
+            # Флаг есть не у всех полей — без него формат совпадает с ответом сервера
+            data['unique'] = True
+        return data
+
+def _field(key):
+    """Возвращает общий Field для ключа (название, тип, обязательность, уникальность)."""
+    field = _fields.get(key)
+    if field is None:
+        name, type, required, unique = key
+        field = Field(sys.intern(name) if isinstance(name, str) else name, type, required, unique)
+        if len(_fields) < SHARED_LIMIT:
+            field = _fields.setdefault(key, field)
+    return field
+
+class DocumentType(_Frozen):
+    """
+    Тип документа. Неизменяем; одинаковые типы документов — один общий объект.
+
+    Args:
+        id (int): ID типа документа
+        name (str): Название
+        fields (tuple): Поля (Field)
+    """
+
+    __slots__ = ('id', 'name', 'fields')
+    _keys = ('id', 'name', 'fields')
+
+    def __init__(self, id, name, fields=()):
+        object.__setattr__(self, 'id', id)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'fields', tuple(fields))
+
+    @classmethod
+    def from_dict(cls, data):
+        fields = tuple([_field((field['name'], field['type'], field.get('required', False),
+                                field.get('unique', False)))
+                        for field in data.get('fields', ())])
+        # Ключ хранит те же общие объекты, что и сам тип документа
+        key = (data['id'], data['name'], fields)
+        document_type = _document_types.get(key)
+        if document_type is None:
+            document_type = cls(*key)
+            if len(_document_types) < SHARED_LIMIT:
+                document_type = _document_types.setdefault(key, document_type)
+        return document_type
+
+    def field(self, name):
+        """
+        Возвращает поле по названию.
+
+        Returns:
+            Field: Поле или None
+        """
+        for field in self.fields:
+            if field.name == name:
+                return field
+        return None
+
+    def to_dict(self):
+        return {'id': self.id, 'name': self.name, 'fields': [field.to_dict() for field in self.fields]}
+
+class TaskTemplate(_Mapping):
+    """
+    Шаблон задачи бизнес-процесса.
+
+    Args:
+        id (int): ID задачи
+        name (str): Название
+        order (int): Порядок выполнения
+        description (str): Описание
+    """
+
+    __slots__ = ('id', 'name', 'order', 'description')
+    _keys = ('id', 'name', 'order', 'description')
+
+    def __init__(self, id, name, order, description=''):
+        self.id = id
+        self.name = name
+        self.order = order
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['id'], data['name'], data['order'], data.get('description', ''))
+
+    def to_dict(self):
+        return {'id': self.id, 'name': self.name, 'order': self.order, 'description': self.description}
+
+class Process(_Mapping):
+    """
+    Шаблон бизнес-процесса.
+
+    Типы документов хранятся как исходные словари, пока к ним не обратились
+    (если процесс разобран с lazy=True), и разбираются при первом обращении.
+
+    Args:
+        id (int): ID процесса
+        name (str): Название
+        description (str): Описание
+        tasks (tuple): Задачи (TaskTemplate)
+        document_types (tuple): Типы документов (DocumentType)
+    """
+
+    __slots__ = ('id', 'name', 'description', 'tasks', '_document_types', '_raw_document_types')
+    _keys = ('id', 'name', 'description', 'tasks', 'document_types')
+
+    def __init__(self, id, name, description='', tasks=(), document_types=()):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.tasks = tuple(tasks)
+        self._document_types = tuple(document_types)
+        self._raw_document_types = None
+
+    @classmethod
+    def from_dict(cls, data, lazy=False):
+        """
+        Создает процесс из словаря в формате MCP сервера.
+
+        Args:
+            data (dict): Бизнес-процесс
+            lazy (bool): Разбирать типы документов при первом обращении
+
+        Returns:
+            Process: Процесс
+        """
+        process = cls.__new__(cls)
+        process.id = data['id']
+        process.name = data['name']
+        process.description = data.get('description', '')
+        process.tasks = tuple([TaskTemplate.from_dict(task) for task in data.get('tasks', ())])
+        raw = data.get('document_types', ())
+        if lazy and raw:
+            process._document_types = None
+            process._raw_document_types = raw
+        else:
+            process._document_types = tuple([DocumentType.from_dict(doc_type) for doc_type in raw])
+            process._raw_document_types = None
+        return process
+
+    @property
+    def document_types(self):
+        if self._document_types is None:
+            self._document_types = tuple([DocumentType.from_dict(doc) for doc in self._raw_document_types])
+            self._raw_document_types = None
+        return self._document_types
+
+    @document_types.setter
+    def document_types(self, value):
+        self._document_types = tuple(value)
+        self._raw_document_types = None
+
+    def task(self, task_id):
+        """
+        Возвращает задачу процесса по ID.
+
+        Returns:
+            TaskTemplate: Задача или None
+        """
+        for task in self.tasks:
+            if task.id == task_id:
+                return task
+        return None
+
+    def to_dict(self):
+        """dict: Процесс в формате MCP сервера."""
+        if self._document_types is None:
+            document_types = self._raw_document_types
+        else:
+            document_types = [doc_type.to_dict() for doc_type in self._document_types]
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'tasks': [task.to_dict() for task in self.tasks],
+            'document_types': document_types,
+        }
+
+def decode_processes(processes, lazy=False):
+    """
+    Разбирает процессы из словарей по одному.
+
+    Args:
+        processes (iterable): Бизнес-процессы в формате MCP сервера (можно итератор)
+        lazy (bool): Разбирать типы документов при первом обращении
+
+    Yields:
+        Process: Процесс
+    """
+    from_dict = Process.from_dict
+    for process in processes:
+        yield from_dict(process, lazy)
+
+def load_processes(filename="mcp_processes_info.json", lazy=False):
+    """
+    Загружает процессы из файла снимка любого формата (см. mcp_snapshot.py).
+
+    Args:
+        filename (str): Путь к файлу
+        lazy (bool): Разбирать типы документов при первом обращении
+
+    Returns:
+        list: Процессы (Process)
+    """
+    from mcp_snapshot import read_processes
+    return list(decode_processes(read_processes(filename), lazy))
+
+def clear_shared():
+    """Очищает общие таблицы полей и типов документов."""
+    _fields.clear()
+    _document_types.clear()
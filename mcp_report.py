@@ -0,0 +1,331 @@
+"""
+Вывод каталога бизнес-процессов в виде отчета.
+
+Процессы обрабатываются по одному по мере поступления (можно передавать
+итератор с сервера), а текст копится в буфере и записывается в поток
+крупными частями. Если процессы поступают медленно, буфер сбрасывается
+не реже раза в FLUSH_INTERVAL секунд, чтобы вывод начинался до окончания загрузки.
+
+Форматы:
+- text — подробный текст, как в get_mcp_processes.display_process_info();
+- table — одна строка на процесс (ID, название, число задач и типов документов);
+- ndjson — один процесс в JSON на строку;
+- csv — одна строка на процесс.
+
+Итоги (процессы, задачи, типы документов, поля) считаются за тот же проход.
+
+Запуск:
+python mcp_report.py mcp_processes_info.json --format table
+python mcp_report.py --server --format csv --task "Рассмотрение" > processes.csv
+python mcp_report.py mcp_processes_info.json --summary
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+from mcp_json import json_default
+
+FORMATS = ('text', 'table', 'ndjson', 'csv')
+# Размер буфера вывода в символах
+BUFFER_SIZE = 64 * 1024
+# Максимальное время между записями в поток, секунды
+FLUSH_INTERVAL = 0.5
+
+CSV_COLUMNS = ('id', 'name', 'description', 'tasks', 'document_types', 'task_names', 'document_type_names')
+
+SEPARATOR = "=" * 80
+TEXT_HEADER = f"\n{SEPARATOR}\nДОСТУПНЫЕ ШАБЛОНЫ БИЗНЕС-ПРОЦЕССОВ В MCP\n{SEPARATOR}\n"
+TEXT_EMPTY = "Нет доступных бизнес-процессов.\n"
+
+def format_process_text(number, process):
+    """
+    Форматирует один бизнес-процесс подробным текстом.
+
+    Args:
+        number (int): Порядковый номер процесса в списке
+        process (dict): Бизнес-процесс
+
+    Returns:
+        str: Текст с завершающим переводом строки
+    """
+    tasks = process['tasks']
+    document_types = process['document_types']
+    parts = [
+        f"\n{number}. {process['name']}\n"
+        f"   ID: {process['id']}\n"
+        f"   Описание: {process['description']}\n"
+        f"\n   Задачи ({len(tasks)}):\n"
+    ]
+    for task in tasks:
+        parts.append(f"     - {task['name']} (ID: {task['id']}, Порядок: {task['order']})\n"
+                     f"       {task['description']}\n")
+    parts.append(f"\n   Типы документов ({len(document_types)}):\n")
+    for doc_type in document_types:
+        fields = ', '.join([f"{field['name']} ({field['type']})" for field in doc_type['fields']])
+        parts.append(f"     - {doc_type['name']} (ID: {doc_type['id']})\n"
+                     f"       Поля: {fields}\n")
+    return ''.join(parts)
+
+class ReportTotals:
+    """Итоги по выведенным процессам."""
+
+    __slots__ = ('processes', 'tasks', 'document_types', 'fields')
+
+    def __init__(self):
+        self.processes = 0
+        self.tasks = 0
+        self.document_types = 0
+        self.fields = 0
+
+    def add(self, process):
+        document_types = process.get('document_types', ())
+        self.processes += 1
+        self.tasks += len(process.get('tasks', ()))
+        self.document_types += len(document_types)
+        for doc_type in document_types:
+            self.fields += len(doc_type.get('fields', ()))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class ProcessFilter:
+    """
+    Отбор процессов для отчета.
+
+    Значения name, task и document_type — ID (int) или часть названия
+    (без учета регистра). Процесс попадает в отчет, если подходит под все
+    заданные условия; для task и document_type — если в нем есть такая задача
+    или такой тип документа.
+
+    Args:
+        process_ids (iterable): ID процессов
+        name: ID или часть названия процесса
+        task: ID или часть названия задачи
+        document_type: ID или часть названия типа документа
+    """
+
+    def __init__(self, process_ids=None, name=None, task=None, document_type=None):
+        self.process_ids = set(process_ids) if process_ids else None
+        self.name = _matcher(name)
+        self.task = _matcher(task)
+        self.document_type = _matcher(document_type)
+
+    def __call__(self, process):
+        if self.process_ids is not None and process.get('id') not in self.process_ids:
+            return False
+        if self.name is not None and not self.name(process):
+            return False
+        if self.task is not None and not any(self.task(task) for task in process.get('tasks', ())):
+            return False
+        if self.document_type is not None and \
+                not any(self.document_type(doc) for doc in process.get('document_types', ())):
+            return False
+        return True
+
+def _matcher(value):
+    if value is None:
+        return None
+    if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+        wanted_id = int(value)
+        return lambda item: item.get('id') == wanted_id
+    needle = value.casefold()
+    return lambda item: needle in item.get('name', '').casefold()
+
+class ReportRenderer:
+    """
+    Выводит процессы по одному через общий буфер.
+
+    Пример:
+        with ReportRenderer(fmt='table') as report:
+            for process in processes:
+                report.write(process)
+        print(report.totals.processes)
+
+    Args:
+        out: Текстовый поток (по умолчанию sys.stdout на момент вывода)
+        fmt (str): Формат из FORMATS
+        filters (callable): Функция отбора процессов (например, ProcessFilter)
+        summary_only (bool): Выводить только итоги
+    """
+
+    def __init__(self, out=None, fmt='text', filters=None, summary_only=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат отчета: {fmt}. Доступные форматы: {', '.join(FORMATS)}")
+        self.out = out
+        self.fmt = fmt
+        self.filters = filters
+        self.summary_only = summary_only
+        self.totals = ReportTotals()
+        self.closed = False
+        self._parts = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+        self._csv_buffer = None
+        self._csv_writer = None
+
+    def _write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= BUFFER_SIZE or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Записывает накопленный текст в поток."""
+        if self._parts:
+            out = self.out if self.out is not None else sys.stdout
+            out.write(''.join(self._parts))
+            out.flush()
+            self._parts = []
+            self._size = 0
+        self._last_flush = time.monotonic()
+
+    def _csv_row(self, row):
+        if self._csv_writer is None:
+            self._csv_buffer = io.StringIO()
+            self._csv_writer = csv.writer(self._csv_buffer, lineterminator='\n')
+        self._csv_writer.writerow(row)
+        text = self._csv_buffer.getvalue()
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+        return text
+
+    def _header(self):
+        if self.fmt == 'text':
+            return TEXT_HEADER
+        if self.fmt == 'table':
+            return f"{'ID':>8s}  {'Задач':>6s}  {'Документов':>10s}  Название\n"
+        if self.fmt == 'csv':
+            return self._csv_row(CSV_COLUMNS)
+        return ''
+
+    def _format(self, number, process):
+        if self.fmt == 'text':
+            return format_process_text(number, process)
+        if self.fmt == 'table':
+            return (f"{process['id']:>8}  {len(process['tasks']):>6d}  "
+                    f"{len(process['document_types']):>10d}  {process['name']}\n")
+        if self.fmt == 'ndjson':
+            return json.dumps(process, ensure_ascii=False, default=json_default) + '\n'
+        return self._csv_row((
+            process['id'],
+            process['name'],
+            process.get('description', ''),
+            len(process['tasks']),
+            len(process['document_types']),
+            ';'.join(task['name'] for task in process['tasks']),
+            ';'.join(doc_type['name'] for doc_type in process['document_types']),
+        ))
+
+    def write(self, process):
+        """
+        Выводит один процесс, если он проходит отбор.
+
+        Returns:
+            bool: True, если процесс попал в отчет
+        """
+        if self.filters is not None and not self.filters(process):
+            return False
+        self.totals.add(process)
+        if not self.summary_only:
+            if self.totals.processes == 1:
+                self._write(self._header())
+            self._write(self._format(self.totals.processes, process))
+        return True
+
+    def tee(self, processes):
+        """
+        Выводит процессы и отдает их дальше (например, для сохранения в файл за тот же проход).
+
+        Отдаются только процессы, прошедшие отбор. Когда процессы закончились,
+        буфер записывается в поток, чтобы следующий вывод не обогнал отчет.
+
+        Yields:
+            dict: Бизнес-процесс
+        """
+        for process in processes:
+            if self.write(process):
+                yield process
+        self.flush()
+
+    def summary(self):
+        """str: Итоги в формате отчета."""
+        totals = self.totals
+        if self.fmt == 'ndjson':
+            return json.dumps({'summary': totals.to_dict()}, ensure_ascii=False) + '\n'
+        if self.fmt == 'csv':
+            return self._csv_row(('processes', 'tasks', 'document_types', 'fields')) + \
+                self._csv_row((totals.processes, totals.tasks, totals.document_types, totals.fields))
+        return (f"Всего бизнес-процессов: {totals.processes}\n"
+                f"Общее количество задач: {totals.tasks}\n"
+                f"Общее количество типов документов: {totals.document_types}\n"
+                f"Общее количество полей: {totals.fields}\n")
+
+    def close(self):
+        """
+        Завершает отчет и записывает остаток буфера.
+
+        Returns:
+            ReportTotals: Итоги
+        """
+        if not self.closed:
+            self.closed = True
+            if self.summary_only:
+                self._write(self.summary())
+            elif not self.totals.processes and self.fmt == 'text':
+                self._write(TEXT_EMPTY)
+            self.flush()
+        return self.totals
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def render(processes, out=None, fmt='text', filters=None, summary_only=False):
+    """
+    Выводит процессы в выбранном формате за один проход.
+
+    Args:
+        processes (iterable): Бизнес-процессы (можно итератор)
+        out: Текстовый поток (по умолчанию sys.stdout)
+        fmt (str): Формат из FORMATS
+        filters (callable): Функция отбора процессов
+        summary_only (bool): Выводить только итоги
+
+    Returns:
+        ReportTotals: Итоги по выведенным процессам
+    """
+    renderer = ReportRenderer(out, fmt=fmt, filters=filters, summary_only=summary_only)
+    with renderer:
+        for process in processes:
+            renderer.write(process)
+    return renderer.totals
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Отчет по каталогу бизнес-процессов")
+    parser.add_argument('file', nargs='?', help="Файл снимка каталога (json, ndjson, .gz)")
+    parser.add_argument('--server', action='store_true', help="Получить каталог с MCP сервера")
+    parser.add_argument('--format', choices=FORMATS, default='text')
+    parser.add_argument('--id', type=int, action='append', dest='process_ids', help="ID процесса (можно несколько)")
+    parser.add_argument('--name', help="ID или часть названия процесса")
+    parser.add_argument('--task', help="ID или часть названия задачи")
+    parser.add_argument('--document-type', help="ID или часть названия типа документа")
+    parser.add_argument('--summary', action='store_true', help="Только итоги")
+    args = parser.parse_args()
+
+    if args.server:
+        from mcp_client import iter_processes
+        source = iter_processes()
+    else:
+        from mcp_snapshot import read_processes
+        source = read_processes(args.file or 'mcp_processes_info.json')
+
+    process_filter = None
+    if args.process_ids or args.name or args.task or args.document_type:
+        process_filter = ProcessFilter(args.process_ids, args.name, args.task, args.document_type)
+    render(source, fmt=args.format, filters=process_filter, summary_only=args.summary)
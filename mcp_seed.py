@@ -0,0 +1,68 @@
+"""
+Демонстрационный каталог: процесс "Обработка заявки" из документации
+(MCP_BUSINESS_PROCESS_TEMPLATES.md).
+
+Используется как данные без сервера в get_mcp_processes.py и как первый
+процесс каталога сервера-заглушки mcp_fake_server.py.
+"""
+
+# Процесс "Обработка заявки" из документации — первый процесс каталога
+SEED_PROCESSES = [
+    {
+        "id": 1,
+        "name": "Обработка заявки",
+        "description": "Тестовый бизнес-процесс обработки заявки с тремя этапами",
+        "tasks": [
+            {
+                "id": 1,
+                "name": "Создание заявки",
+                "order": 1,
+                "description": "Первый этап процесса - создание заявки с указанием основных данных"
+            },
+            {
+                "id": 2,
+                "name": "Рассмотрение заявки",
+                "order": 2,
+                "description": "Второй этап - рассмотрение созданной заявки и принятие решения"
+            },
+            {
+                "id": 3,
+                "name": "Утверждение заявки",
+                "order": 3,
+                "description": "Финальный этап - утверждение заявки на основе решения"
+            }
+        ],
+        "document_types": [
+            {
+                "id": 1,
+                "name": "Заявка",
+                "fields": [
+                    {"name": "номер", "type": "строка", "required": True, "unique": True},
+                    {"name": "дата", "type": "дата", "required": True},
+                    {"name": "название", "type": "строка", "required": True},
+                    {"name": "описание", "type": "текст", "required": False}
+                ]
+            },
+            {
+                "id": 2,
+                "name": "Решение по заявке",
+                "fields": [
+                    {"name": "номер", "type": "строка", "required": True, "unique": True},
+                    {"name": "дата", "type": "дата", "required": True},
+                    {"name": "решение", "type": "текст", "required": True},
+                    {"name": "комментарий", "type": "текст", "required": False}
+                ]
+            },
+            {
+                "id": 3,
+                "name": "Утверждение заявки",
+                "fields": [
+                    {"name": "номер", "type": "строка", "required": True, "unique": True},
+                    {"name": "дата", "type": "дата", "required": True},
+                    {"name": "утверждено", "type": "булево", "required": True},
+                    {"name": "комментарий", "type": "текст", "required": False}
+                ]
+            }
+        ]
+    }
+]
@@ -0,0 +1,182 @@
+"""
+Объединение одновременных одинаковых запросов (single-flight).
+
+Когда кэш пуст, десятки потоков Django одновременно запрашивают один и тот
+же популярный шаблон (например, "Обработка заявки", ID 1) и отправляют на
+MCP сервер десятки одинаковых GET запросов. SingleFlight пропускает к
+серверу только первый вызов с данным ключом ("ведущий"); остальные вызовы,
+пришедшие, пока он выполняется, ждут и получают его результат или его
+исключение. Следующий вызов после завершения снова идет на сервер —
+это не кэш.
+
+- SingleFlight — для потоков;
+- AsyncSingleFlight — для корутин одного цикла событий asyncio.
+
+Ожидание ограничено таймаутом, который задается при каждом вызове (то есть
+для каждого ключа свой): не дождавшийся вызов получает TimeoutError, а
+запрос ведущего продолжается для остальных.
+
+Пример:
+    flights = SingleFlight()
+    process = flights.do(('GET', url), lambda: fetch(url), timeout=10)
+"""
+
+import asyncio
+import threading
+
+class SingleFlightStats:
+    """Счетчики SingleFlight."""
+
+    __slots__ = ('calls', 'leaders', 'shared', 'errors', 'timeouts')
+
+    def __init__(self):
+        self.calls = 0
+        self.leaders = 0
+        self.shared = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Объединяет одновременные вызовы с одинаковым ключом (для потоков).
+
+    Args:
+        clone (callable): Копирование результата для ожидавших вызовов
+            (например, copy.deepcopy, если результат могут изменять). None — общий объект
+    """
+
+    def __init__(self, clone=None):
+        self.clone = clone
+        self.stats = SingleFlightStats()
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, timeout=None):
+        """
+        Выполняет func() или присоединяется к уже идущему вызову с тем же ключом.
+
+        Args:
+            key: Ключ вызова (hashable), например URL запроса
+            func (callable): Функция без аргументов, выполняющая запрос
+            timeout (float): Сколько ждать чужой вызов, секунды (None — без ограничения)
+
+        Returns:
+            Результат func()
+
+        Raises:
+            TimeoutError: Если чужой вызов не завершился за timeout
+            Exception: Исключение, которое выбросил func()
+        """
+        with self._lock:
+            self.stats.calls += 1
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.stats.leaders += 1
+                leader = True
+            else:
+                self.stats.shared += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+                with self._lock:
+                    self.stats.errors += 1
+                raise
+            finally:
+                # Ключ освобождается до пробуждения ожидающих: новый вызов пойдет на сервер
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self.stats.timeouts += 1
+            raise TimeoutError(f"Не дождались выполняющегося запроса {key!r} за {timeout} с")
+        if call.error is not None:
+            raise call.error
+        return self.clone(call.result) if self.clone is not None else call.result
+
+    def in_flight(self):
+        """int: Сколько ключей сейчас выполняется."""
+        with self._lock:
+            return len(self._calls)
+
+class AsyncSingleFlight:
+    """
+    Объединяет одновременные вызовы с одинаковым ключом (для корутин asyncio).
+
+    Запрос ведущего выполняется отдельной задачей, поэтому отмена или
+    таймаут одного из ожидающих не отменяет запрос для остальных.
+
+    Args:
+        clone (callable): Копирование результата для ожидавших вызовов. None — общий объект
+    """
+
+    def __init__(self, clone=None):
+        self.clone = clone
+        self.stats = SingleFlightStats()
+        # (цикл событий, ключ) → задача; у разных циклов свои задачи
+        self._tasks = {}
+
+    async def do(self, key, func, timeout=None):
+        """
+        Выполняет await func() или присоединяется к уже идущему вызову с тем же ключом.
+
+        Args:
+            key: Ключ вызова (hashable)
+            func (callable): Функция без аргументов, возвращающая корутину или future
+            timeout (float): Сколько ждать результат, секунды (None — без ограничения)
+
+        Returns:
+            Результат корутины
+
+        Raises:
+            TimeoutError: Если вызов не завершился за timeout
+            Exception: Исключение, которое выбросила корутина
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+        self.stats.calls += 1
+        task = self._tasks.get(task_key)
+        leader = task is None
+        if leader:
+            self.stats.leaders += 1
+            task = self._tasks[task_key] = asyncio.ensure_future(func(), loop=loop)
+            task.add_done_callback(lambda done: self._finish(task_key, done))
+        else:
+            self.stats.shared += 1
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise TimeoutError(f"Не дождались выполняющегося запроса {key!r} за {timeout} с") from None
+        if leader or self.clone is None:
+            return result
+        return self.clone(result)
+
+    def _finish(self, task_key, task):
+        if self._tasks.get(task_key) is task:
+            del self._tasks[task_key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats.errors += 1
+
+    def in_flight(self):
+        """int: Сколько ключей сейчас выполняется."""
+        return len(self._tasks)
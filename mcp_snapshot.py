@@ -0,0 +1,265 @@
+"""
+Запись и чтение снимков каталога бизнес-процессов (mcp_processes_info.json).
+
+Процессы записываются по одному во временный файл рядом с целевым, после чего
+файл атомарно переименовывается. Если запись прервется, предыдущий снимок
+останется целым.
+
+Поддерживаемые форматы:
+- "json" — JSON массив с отступами (по умолчанию, как раньше);
+- "compact" — JSON массив без отступов и пробелов;
+- "ndjson" — один процесс на строку.
+
+Любой формат можно дополнительно сжать gzip (compress=True или имя файла
+с расширением .gz). read_processes() определяет формат и сжатие автоматически.
+"""
+
+import gzip
+import json
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+
+from mcp_json import iter_json_array, json_default
+
+FORMATS = ('json', 'compact', 'ndjson')
+# Размер части при потоковом чтении и записи
+CHUNK_SIZE = 64 * 1024
+# Уровень сжатия gzip: 6 — разумный баланс скорости и размера
+GZIP_LEVEL = 6
+# Права нового файла снимка
+DEFAULT_FILE_MODE = 0o644
+# ID процесса в начале строки NDJSON (так его записывает _encode())
+_NDJSON_ID = re.compile(rb'^\{"id":(-?\d+)[,}]')
+
+@contextmanager
+def atomic_open(path, mode='wb'):
+    """
+    Открывает временный файл рядом с path и атомарно заменяет им path при успешном выходе.
+
+    Если внутри блока возникло исключение, временный файл удаляется,
+    а существующий файл path остается без изменений.
+
+    Args:
+        path (str): Путь к итоговому файлу
+        mode (str): 'wb' или 'w' (текстовый режим в UTF-8)
+
+    Yields:
+        file: Открытый временный файл
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        # mkstemp создает файл с правами 0600 — сохраняем права заменяемого файла
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, DEFAULT_FILE_MODE)
+        if 'b' in mode:
+            f = os.fdopen(fd, mode)
+        else:
+            f = os.fdopen(fd, mode, encoding='utf-8')
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def atomic_write(path, data):
+    """
+    Атомарно записывает данные в файл.
+
+    Args:
+        path (str): Путь к файлу
+        data (bytes | iterable): Данные или итератор частей данных (bytes)
+    """
+    with atomic_open(path, 'wb') as f:
+        if isinstance(data, bytes):
+            f.write(data)
+        else:
+            for chunk in data:
+                f.write(chunk)
+
+def _encode(processes, fmt):
+    """Отдает части текста снимка в заданном формате."""
+    if fmt == 'ndjson':
+        for process in processes:
+            yield json.dumps(process, ensure_ascii=False, separators=(',', ':'), default=json_default)
+            yield '\n'
+        return
+
+    if fmt == 'compact':
+        separator, first, last, empty = ',', '[', ']', '[]'
+        dumps_kwargs = {'separators': (',', ':')}
+    else:
+        # Тот же формат, что и json.dump(..., indent=2) для всего списка
+        separator, first, last, empty = ',\n  ', '[\n  ', '\n]', '[]'
+        dumps_kwargs = {'indent': 2}
+
+    count = 0
+    for process in processes:
+        item = json.dumps(process, ensure_ascii=False, default=json_default, **dumps_kwargs)
+        yield separator if count else first
+        yield item.replace('\n', '\n  ') if fmt == 'json' else item
+        count += 1
+    yield last if count else empty
+
+def write_processes(processes, filename, fmt='json', compress=None):
+    """
+    Потоково и атомарно записывает бизнес-процессы в файл.
+
+    Args:
+        processes (iterable): Бизнес-процессы (список или итератор)
+        filename (str): Путь к файлу
+        fmt (str): Формат: "json", "compact" или "ndjson"
+        compress (bool): Сжать gzip (по умолчанию — если имя оканчивается на .gz)
+
+    Returns:
+        int: Количество записанных процессов
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат снимка: {fmt}. Допустимые: {', '.join(FORMATS)}")
+    if compress is None:
+        compress = filename.endswith('.gz')
+
+    count = 0
+
+    def counted():
+        nonlocal count
+        for process in processes:
+            count += 1
+            yield process
+
+    with _open_output(filename, compress) as stream:
+        buffer = []
+        size = 0
+        for part in _encode(counted(), fmt):
+            buffer.append(part)
+            size += len(part)
+            if size >= CHUNK_SIZE:
+                stream.write(''.join(buffer).encode('utf-8'))
+                buffer.clear()
+                size = 0
+        stream.write(''.join(buffer).encode('utf-8'))
+    return count
+
+@contextmanager
+def _open_output(filename, compress):
+    """Открывает файл для атомарной записи, при необходимости со сжатием gzip."""
+    with atomic_open(filename, 'wb') as raw:
+        if not compress:
+            yield raw
+            return
+        # mtime=0 — одинаковые данные дают одинаковый файл
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=GZIP_LEVEL, mtime=0) as stream:
+            yield stream
+
+def merge_processes(filename, upserts, deletes=(), fmt='json', compress=None):
+    """
+    Применяет к снимку обновления и удаления процессов за один потоковый проход.
+
+    Обновленные процессы остаются на своих местах, новые добавляются в конец.
+    Снимок заменяется атомарно. В формате NDJSON строки неизмененных процессов
+    копируются как есть, без разбора JSON, поэтому небольшие изменения большого
+    снимка применяются быстро.
+
+    Args:
+        filename (str): Путь к файлу снимка
+        upserts (dict): ID процесса → новый процесс
+        deletes (iterable): ID удаляемых процессов
+        fmt (str): Формат снимка (см. write_processes())
+        compress (bool): Сжать gzip (по умолчанию — если имя оканчивается на .gz)
+
+    Returns:
+        tuple: (обновлено, удалено, добавлено)
+    """
+    if compress is None:
+        compress = filename.endswith('.gz')
+    deletes = set(deletes)
+    remaining = dict(upserts)
+    counts = {'updated': 0, 'deleted': 0}
+
+    def merge(process_id, process):
+        if process_id in deletes:
+            counts['deleted'] += 1
+            return None
+        if process_id in remaining:
+            counts['updated'] += 1
+            return remaining.pop(process_id)
+        return process
+
+    if fmt == 'ndjson' and not _is_array(filename):
+        with _open_binary(filename) as src, _open_output(filename, compress) as stream:
+            for line in _iter_lines(src, src.read(CHUNK_SIZE)):
+                match = _NDJSON_ID.match(line)
+                process_id = int(match.group(1)) if match else json.loads(line).get('id')
+                merged = merge(process_id, line)
+                if merged is line:
+                    stream.write(line + b'\n')
+                elif merged is not None:
+                    stream.write(''.join(_encode([merged], fmt)).encode('utf-8'))
+            if remaining:
+                stream.write(''.join(_encode(remaining.values(), fmt)).encode('utf-8'))
+    else:
+        def merged():
+            for process in read_processes(filename):
+                process = merge(process.get('id'), process)
+                if process is not None:
+                    yield process
+            yield from remaining.values()
+        write_processes(merged(), filename, fmt=fmt, compress=compress)
+    return counts['updated'], counts['deleted'], len(remaining)
+
+def _open_binary(filename):
+    """Открывает файл снимка, прозрачно распаковывая gzip."""
+    with open(filename, 'rb') as f:
+        magic = f.read(2)
+    if magic == b'\x1f\x8b':
+        return gzip.open(filename, 'rb')
+    return open(filename, 'rb')
+
+def read_processes(filename):
+    """
+    Потоково читает бизнес-процессы из файла снимка любого формата.
+
+    Args:
+        filename (str): Путь к файлу
+
+    Yields:
+        dict: Бизнес-процесс
+    """
+    with _open_binary(filename) as f:
+        first = f.read(CHUNK_SIZE)
+        if first.lstrip()[:1] == b'[':
+            chunks = iter(lambda: f.read(CHUNK_SIZE), b'')
+            yield from iter_json_array(_prepend(first, chunks))
+            return
+        # NDJSON: один процесс на строку
+        for line in _iter_lines(f, first):
+            yield json.loads(line)
+
+def _is_array(filename):
+    with _open_binary(filename) as f:
+        return f.read(CHUNK_SIZE).lstrip()[:1] == b'['
+
+def _iter_lines(f, first):
+    """Отдает непустые строки файла (без перевода строки), начиная с уже прочитанной части first."""
+    rest = b''
+    while first:
+        lines = (rest + first).split(b'\n')
+        rest = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+        first = f.read(CHUNK_SIZE)
+    if rest.strip():
+        yield rest
+
+def _prepend(first, chunks):
+    yield first
+    yield from chunks
@@ -0,0 +1,260 @@
+"""
+Инкрементальная синхронизация снимка каталога с MCP сервером.
+
+Вместо повторной загрузки всего каталога запрашиваются только изменения
+после последней синхронизации: GET {url}/processes/changes/?since=<курсор>.
+Сервер отвечает списком изменений ({"op": "upsert", "process": {...}} или
+{"op": "delete", "id": ...}), новым курсором и признаком has_more.
+
+Курсор хранится рядом со снимком в файле <снимок>.sync.json. Изменения
+применяются к снимку за один потоковый проход: файл переписывается
+атомарно (см. mcp_snapshot.merge_processes()), в памяти держатся только
+изменения. В формате ndjson неизмененные строки снимка копируются без
+разбора JSON — для часто синхронизируемых снимков это самый быстрый формат.
+Если курсора нет, курсор относится к другому серверу или сервер сообщил,
+что курсор устарел (410), снимок загружается заново через ту же ленту (since=0).
+
+Параметры берутся из раздела "pdm.sync" конфигурации:
+- interval — период опроса в секундах (по умолчанию 60);
+- limit — сколько изменений запрашивать за раз (по умолчанию 500).
+
+Запуск:
+python mcp_sync.py --once                       # одна синхронизация
+python mcp_sync.py --interval 30                # опрос каждые 30 секунд до Ctrl+C
+python mcp_sync.py --snapshot catalog.ndjson.gz --format ndjson
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from mcp_client import get_client
+from mcp_config import get_config
+from mcp_snapshot import atomic_write, merge_processes, write_processes
+
+DEFAULT_SNAPSHOT = 'mcp_processes_info.json'
+DEFAULT_INTERVAL = 60
+DEFAULT_LIMIT = 500
+CHANGES_PATH = 'processes/changes/'
+
+class SyncResult:
+    """Результат одной синхронизации."""
+
+    __slots__ = ('upserted', 'deleted', 'cursor', 'full', 'elapsed')
+
+    def __init__(self, upserted=0, deleted=0, cursor=None, full=False, elapsed=0.0):
+        self.upserted = upserted
+        self.deleted = deleted
+        self.cursor = cursor
+        self.full = full
+        self.elapsed = elapsed
+
+    @property
+    def changed(self):
+        return bool(self.upserted or self.deleted or self.full)
+
+    def __repr__(self):
+        return (f"SyncResult(upserted={self.upserted}, deleted={self.deleted}, "
+                f"cursor={self.cursor!r}, full={self.full})")
+
+class ProcessSync:
+    """
+    Синхронизирует файл снимка каталога с лентой изменений MCP сервера.
+
+    Пример:
+        sync = ProcessSync("mcp_processes_info.json")
+        result = sync.sync_once()          # только изменения с прошлого раза
+        sync.poll(interval=30)             # опрос до Ctrl+C
+
+    Args:
+        snapshot (str): Файл снимка
+        client (MCPClient): Клиент (по умолчанию общий клиент mcp_client)
+        fmt (str): Формат снимка ("json", "compact", "ndjson")
+        limit (int): Сколько изменений запрашивать за раз
+        catalog (ProcessCatalog): Каталог в памяти, к которому тоже применяются изменения
+    """
+
+    def __init__(self, snapshot=DEFAULT_SNAPSHOT, client=None, fmt='json', limit=None, catalog=None):
+        self.snapshot = snapshot
+        self.state_file = f"{snapshot}.sync.json"
+        self.client = client or get_client()
+        self.fmt = fmt
+        if limit is None:
+            limit = get_config().get('pdm', {}).get('sync', {}).get('limit', DEFAULT_LIMIT)
+        self.limit = limit
+        self.catalog = catalog
+
+    def load_cursor(self):
+        """
+        Возвращает курсор последней синхронизации с этим сервером.
+
+        Returns:
+            str: Курсор или None, если синхронизации не было или снимка нет
+        """
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if state.get('url') != self.client.base_url or not os.path.exists(self.snapshot):
+            return None
+        return state.get('cursor')
+
+    def _save_cursor(self, cursor):
+        state = {
+            'url': self.client.base_url,
+            'cursor': cursor,
+            'synced_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        atomic_write(self.state_file, json.dumps(state, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    def _fetch_changes(self, since):
+        response = self.client.get(CHANGES_PATH, params={'since': since, 'limit': self.limit})
+        if response.status_code == 410:
+            return None
+        response.raise_for_status()
+        return self.client.decode(response)
+
+    def _iter_feed(self, since, state):
+        """Отдает изменения страница за страницей; последний курсор сохраняет в state."""
+        while True:
+            page = self._fetch_changes(since)
+            if page is None:
+                raise _CursorExpired()
+            yield from page['changes']
+            since = state['cursor'] = page['cursor']
+            if not page.get('has_more'):
+                return
+
+    def sync_once(self):
+        """
+        Загружает изменения после последней синхронизации и применяет их к снимку.
+
+        Returns:
+            SyncResult: Сколько процессов обновлено и удалено
+
+        Raises:
+            requests.HTTPError: Если сервер вернул код ошибки
+        """
+        started = time.perf_counter()
+        cursor = self.load_cursor()
+        try:
+            result = self._apply_delta(cursor) if cursor is not None else self._bootstrap()
+        except _CursorExpired:
+            print("Курсор синхронизации устарел, снимок загружается заново")
+            result = self._bootstrap()
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _bootstrap(self):
+        """Записывает снимок заново из ленты изменений с самого начала."""
+        state = {'cursor': '0'}
+        result = SyncResult(full=True)
+
+        def processes():
+            for change in self._iter_feed('0', state):
+                if change['op'] == 'upsert':
+                    result.upserted += 1
+                    yield change['process']
+
+        write_processes(processes(), self.snapshot, fmt=self.fmt)
+        if self.catalog is not None:
+            from mcp_catalog import ProcessCatalog
+            fresh = ProcessCatalog.from_file(self.snapshot)
+            for process_id in [process['id'] for process in self.catalog if process['id'] not in fresh]:
+                self.catalog.remove(process_id)
+            for process in fresh:
+                self.catalog.upsert(process)
+        self._save_cursor(state['cursor'])
+        result.cursor = state['cursor']
+        return result
+
+    def _apply_delta(self, cursor):
+        """Применяет изменения после cursor к существующему снимку."""
+        state = {'cursor': cursor}
+        upserts = {}
+        deletes = set()
+        # Изменения обычно небольшие — собираем их в памяти, снимок читаем потоково
+        for change in self._iter_feed(cursor, state):
+            if change['op'] == 'upsert':
+                process = change['process']
+                upserts[process['id']] = process
+                deletes.discard(process['id'])
+            else:
+                upserts.pop(change['id'], None)
+                deletes.add(change['id'])
+
+        result = SyncResult(cursor=state['cursor'])
+        if upserts or deletes:
+            updated, result.deleted, added = merge_processes(self.snapshot, upserts, deletes, fmt=self.fmt)
+            result.upserted = updated + added
+            if self.catalog is not None:
+                for process in upserts.values():
+                    self.catalog.upsert(process)
+                for process_id in deletes:
+                    self.catalog.remove(process_id)
+        if state['cursor'] != cursor:
+            self._save_cursor(state['cursor'])
+        return result
+
+    def poll(self, interval=None, stop_event=None, max_iterations=None):
+        """
+        Периодически синхронизирует снимок, пока не установлен stop_event.
+
+        Ошибки соединения выводятся и не прерывают опрос. К интервалу добавляется
+        случайный разброс до 10%, чтобы несколько экземпляров не опрашивали
+        сервер одновременно.
+
+        Args:
+            interval (float): Период опроса в секундах (по умолчанию pdm.sync.interval)
+            stop_event (threading.Event): Событие остановки
+            max_iterations (int): Максимальное число синхронизаций (None — без ограничения)
+        """
+        if interval is None:
+            interval = get_config().get('pdm', {}).get('sync', {}).get('interval', DEFAULT_INTERVAL)
+        stop_event = stop_event or threading.Event()
+        iteration = 0
+        while not stop_event.is_set():
+            try:
+                result = self.sync_once()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"✗ Ошибка синхронизации: {e}")
+            else:
+                if result.changed:
+                    print_result(result)
+            iteration += 1
+            if max_iterations is not None and iteration >= max_iterations:
+                return
+            stop_event.wait(interval * random.uniform(1.0, 1.1))
+
+def print_result(result):
+    """Выводит результат синхронизации одной строкой."""
+    kind = "полная загрузка" if result.full else "изменения"
+    print(f"✓ Синхронизация ({kind}): обновлено {result.upserted}, удалено {result.deleted} "
+          f"за {result.elapsed:.2f} с")
+
+class _CursorExpired(Exception):
+    """Сервер больше не хранит изменения после этого курсора."""
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Инкрементальная синхронизация снимка каталога")
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT, help="Файл снимка")
+    parser.add_argument('--format', default='json', choices=('json', 'compact', 'ndjson'))
+    parser.add_argument('--interval', type=float, default=None, help="Период опроса, с")
+    parser.add_argument('--once', action='store_true', help="Синхронизировать один раз и выйти")
+    args = parser.parse_args()
+
+    sync = ProcessSync(args.snapshot, fmt=args.format)
+    if args.once:
+        print_result(sync.sync_once())
+    else:
+        try:
+            sync.poll(args.interval)
+        except KeyboardInterrupt:
+            pass
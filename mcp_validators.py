@@ -0,0 +1,370 @@
+"""
+Проверка документов по типам документов шаблонов до отправки на сервер.
+
+Сейчас неверный документ отклоняет только MCP сервер — по одному запросу
+на документ. compile_validator() один раз превращает список полей типа
+документа (document_types[].fields) в функцию проверки: для каждого поля
+заранее выбрано приведение типа, поэтому при проверке нет разбора
+описания полей и ветвлений по типу.
+
+Приведение типов (результат пригоден для JSON):
+- строка, текст — str; числа приводятся к строке;
+- дата — строка "ГГГГ-ММ-ДД"; принимаются date/datetime, "ГГГГ-ММ-ДД"
+  и "ДД.ММ.ГГГГ";
+- булево — True/False; принимаются также "true"/"false", "да"/"нет",
+  "1"/"0", 1/0;
+- прочие типы — значение без изменений.
+
+Пустое значение (нет ключа, None, пустая строка) — ошибка для обязательного
+поля; необязательное пустое поле в результат не попадает.
+
+validate_batch() дополнительно проверяет уникальность полей с флагом
+"unique" (например, "номер") внутри пакета — по хэш-таблице значений.
+Таблицу можно передавать из пакета в пакет, чтобы проверять уникальность
+во всем загружаемом файле.
+
+Пример:
+    validators = compile_validators(load_processes("mcp_processes_info.json"))
+    result = validators[1].validate_batch(documents)
+    for error in result.errors:
+        print(error)
+"""
+
+from datetime import date, datetime
+
+from mcp_models import SHARED_LIMIT, FieldType
+
+_TRUE = frozenset(('true', '1', 'да', 'yes', 'on'))
+_FALSE = frozenset(('false', '0', 'нет', 'no', 'off'))
+
+def _to_string(value):
+    if type(value) is str:
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"ожидается строка, получено {type(value).__name__}")
+
+def _to_date(value):
+    if type(value) is str:
+        try:
+            if len(value) == 10 and value[4] == '-' and value[7] == '-':
+                # Проверяем, что дата существует, но возвращаем исходную строку
+                date.fromisoformat(value)
+                return value
+            if len(value) == 10 and value[2] == '.' and value[5] == '.':
+                return date(int(value[6:]), int(value[3:5]), int(value[:2])).isoformat()
+        except ValueError:
+            pass
+        raise ValueError(f"дата должна быть в формате ГГГГ-ММ-ДД или ДД.ММ.ГГГГ: {value!r}")
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise ValueError(f"ожидается дата, получено {type(value).__name__}")
+
+def _to_boolean(value):
+    if value is True or value is False:
+        return value
+    if type(value) is str:
+        lowered = value.strip().lower()
+        if lowered in _TRUE:
+            return True
+        if lowered in _FALSE:
+            return False
+    elif type(value) is int and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"ожидается булево значение: {value!r}")
+
+# Тип поля → приведение значения; для неизвестных типов значение не меняется
+COERCERS = {
+    FieldType.STRING: _to_string,
+    FieldType.TEXT: _to_string,
+    FieldType.DATE: _to_date,
+    FieldType.BOOLEAN: _to_boolean,
+}
+
+class FieldError:
+    """
+    Ошибка проверки документа.
+
+    Attributes:
+        index (int): Номер документа в пакете (None для одиночной проверки)
+        field (str): Название поля (None — ошибка документа целиком)
+        message (str): Описание ошибки
+    """
+
+    __slots__ = ('index', 'field', 'message')
+
+    def __init__(self, index, field, message):
+        self.index = index
+        self.field = field
+        self.message = message
+
+    def to_dict(self):
+        return {'index': self.index, 'field': self.field, 'message': self.message}
+
+    def __str__(self):
+        prefix = f"документ #{self.index}: " if self.index is not None else ''
+        if self.field is not None:
+            prefix += f"поле '{self.field}': "
+        return prefix + self.message
+
+    def __repr__(self):
+        return f"FieldError({self.index!r}, {self.field!r}, {self.message!r})"
+
+class BatchResult:
+    """
+    Результат проверки пакета документов.
+
+    Attributes:
+        valid (list): Пары (номер документа, проверенный документ)
+        errors (list): Ошибки (FieldError), по порядку документов
+        seen (dict): Поле → {значение: номер документа} для уникальных полей
+    """
+
+    __slots__ = ('valid', 'errors', 'seen')
+
+    def __init__(self, valid, errors, seen):
+        self.valid = valid
+        self.errors = errors
+        self.seen = seen
+
+    @property
+    def ok(self):
+        """bool: Все документы пакета прошли проверку."""
+        return not self.errors
+
+    def invalid_indexes(self):
+        """list: Номера документов с ошибками (по возрастанию)."""
+        return sorted({error.index for error in self.errors})
+
+# Проверенные строки дат → дата в формате ГГГГ-ММ-ДД. В пакете документов
+# обычно немного разных дат, поэтому повторная проверка — один поиск в словаре
+_dates = {}
+DATE_CACHE_LIMIT = 65536
+
+def _cached_date(value):
+    result = _to_date(value)
+    if len(_dates) < DATE_CACHE_LIMIT:
+        _dates[value] = result
+    return result
+
+# Проверка одного поля: код подставляется в функцию проверки документа.
+# {name} — название поля, значение уже в переменной value и не пустое
+_FIELD_CODE = {
+    FieldType.STRING: (
+        "if type(value) is not str:",
+        "    value = _to_string(value)",
+    ),
+    FieldType.DATE: (
+        "if type(value) is str:",
+        "    value = _dates.get(value) or _cached_date(value)",
+        "else:",
+        "    value = _to_date(value)",
+    ),
+    FieldType.BOOLEAN: (
+        "if value is not True and value is not False:",
+        "    value = _to_boolean(value)",
+    ),
+}
+_FIELD_CODE[FieldType.TEXT] = _FIELD_CODE[FieldType.STRING]
+
+def _compile(specs, strict):
+    """
+    Строит функцию проверки документа по описаниям полей (название, тип, обязательность, уникальность).
+
+    Код проверки каждого поля подставляется в тело функции (без цикла по
+    описаниям и вызова функции на каждое поле), для типичного значения
+    (строка, уже ISO-дата, bool) приведение не вызывается вовсе.
+    """
+    lines = ["def validate(document):",
+             "    get = document.get",
+             "    cleaned = {}",
+             "    errors = None"]
+    for name, type, required, _ in specs:
+        key = repr(name)
+        lines += [f"    value = get({key})",
+                  "    if value is None or value == '':"]
+        if required:
+            lines += ["        errors = errors or []",
+                      f"        errors.append(({key}, _REQUIRED))"]
+        else:
+            lines += ["        pass"]
+        code = _FIELD_CODE.get(type)
+        if code is None:
+            lines += ["    else:", f"        cleaned[{key}] = value"]
+            continue
+        lines += ["    else:",
+                  "        try:"]
+        lines += [f"            {line}" for line in code]
+        lines += ["        except (ValueError, TypeError) as e:",
+                  "            errors = errors or []",
+                  f"            errors.append(({key}, str(e)))",
+                  "        else:",
+                  f"            cleaned[{key}] = value"]
+    if strict:
+        lines += ["    if len(document) > len(cleaned) and not _names.issuperset(document):",
+                  "        errors = errors or []",
+                  "        errors.extend((name, _UNKNOWN) for name in document if name not in _names)"]
+    lines += ["    return cleaned, errors"]
+
+    namespace = {
+        '_to_string': _to_string,
+        '_to_date': _to_date,
+        '_to_boolean': _to_boolean,
+        '_cached_date': _cached_date,
+        '_dates': _dates,
+        '_names': frozenset(spec[0] for spec in specs),
+        '_REQUIRED': "обязательное поле не заполнено",
+        '_UNKNOWN': "поле не описано в типе документа",
+    }
+    exec(compile('\n'.join(lines), '<mcp_validators>', 'exec'), namespace)
+    return namespace['validate']
+
+# Одинаковые списки полей (например, в синтетических процессах) компилируются один раз
+_compiled = {}
+
+class DocumentValidator:
+    """
+    Скомпилированная проверка документов одного типа.
+
+    Args:
+        fields (iterable): Поля типа документа — словари или mcp_models.Field
+            (name, type, required, unique)
+        document_type_id (int): ID типа документа
+        name (str): Название типа документа
+        strict (bool): Считать ошибкой поля, которых нет в типе документа
+    """
+
+    __slots__ = ('document_type_id', 'name', 'fields', 'unique_fields', 'strict', '_validate')
+
+    def __init__(self, fields, document_type_id=None, name=None, strict=False):
+        specs = tuple((field['name'], field['type'], bool(field.get('required', False)),
+                       bool(field.get('unique', False))) for field in fields)
+        self.document_type_id = document_type_id
+        self.name = name
+        self.fields = specs
+        self.unique_fields = tuple(spec[0] for spec in specs if spec[3])
+        self.strict = strict
+        key = (specs, strict)
+        validate = _compiled.get(key)
+        if validate is None:
+            validate = _compile(specs, strict)
+            if len(_compiled) < SHARED_LIMIT:
+                validate = _compiled.setdefault(key, validate)
+        self._validate = validate
+
+    def __call__(self, document):
+        """
+        Проверяет один документ и приводит значения полей к их типам.
+
+        Args:
+            document (dict): Значения полей по названию
+
+        Returns:
+            tuple: (проверенный документ, список пар (поле, ошибка) или None)
+        """
+        return self._validate(document)
+
+    def validate_batch(self, documents, seen=None, start=0, indexes=None):
+        """
+        Проверяет пакет документов, включая уникальность полей внутри пакета.
+
+        Документ с ошибкой не занимает значения уникальных полей — следующий
+        документ с тем же номером будет проверен как первый.
+
+        Args:
+            documents (iterable): Документы (словари)
+            seen (dict): Значения уникальных полей предыдущих пакетов
+                (BatchResult.seen); None — новая таблица
+            start (int): Номер первого документа пакета (для сообщений об ошибках)
+            indexes (iterable): Номера документов вместо start, start + 1, ...
+                (например, номера строк файла, если часть строк пропущена)
+
+        Returns:
+            BatchResult: Проверенные документы и ошибки
+        """
+        validate = self._validate
+        unique = self.unique_fields
+        if seen is None:
+            seen = {}
+        tables = [seen.setdefault(name, {}) for name in unique]
+        valid = []
+        errors = []
+        numbered = zip(indexes, documents) if indexes is not None else enumerate(documents, start)
+        if len(unique) == 1:
+            # Частый случай — одно уникальное поле ("номер"): без цикла по полям
+            name, table = unique[0], tables[0]
+            for index, document in numbered:
+                cleaned, document_errors = validate(document)
+                if document_errors:
+                    errors.extend(FieldError(index, field, message) for field, message in document_errors)
+                    continue
+                value = cleaned.get(name)
+                if value is not None:
+                    first = table.get(value)
+                    if first is not None:
+                        errors.append(FieldError(index, name, f"значение {value!r} уже есть в документе #{first}"))
+                        continue
+                    table[value] = index
+                valid.append((index, cleaned))
+            return BatchResult(valid, errors, seen)
+
+        for index, document in numbered:
+            cleaned, document_errors = validate(document)
+            if document_errors:
+                errors.extend(FieldError(index, field, message) for field, message in document_errors)
+                continue
+            if unique:
+                duplicate = False
+                for name, table in zip(unique, tables):
+                    value = cleaned.get(name)
+                    if value is None:
+                        continue
+                    first = table.get(value)
+                    if first is not None:
+                        errors.append(FieldError(index, name, f"значение {value!r} уже есть в документе #{first}"))
+                        duplicate = True
+                if duplicate:
+                    continue
+                for name, table in zip(unique, tables):
+                    value = cleaned.get(name)
+                    if value is not None:
+                        table[value] = index
+            valid.append((index, cleaned))
+        return BatchResult(valid, errors, seen)
+
+    def __repr__(self):
+        return f"DocumentValidator(document_type_id={self.document_type_id!r}, name={self.name!r})"
+
+def compile_validator(document_type, strict=False):
+    """
+    Компилирует проверку для типа документа.
+
+    Args:
+        document_type (dict | DocumentType): Тип документа с полями
+        strict (bool): Считать ошибкой поля, которых нет в типе документа
+
+    Returns:
+        DocumentValidator: Проверка документов этого типа
+    """
+    return DocumentValidator(document_type.get('fields', ()), document_type.get('id'),
+                             document_type.get('name'), strict)
+
+def compile_validators(processes, strict=False):
+    """
+    Компилирует проверки для всех типов документов каталога.
+
+    Args:
+        processes (iterable): Бизнес-процессы (словари или mcp_models.Process)
+        strict (bool): Считать ошибкой поля, которых нет в типе документа
+
+    Returns:
+        dict: ID типа документа → DocumentValidator
+    """
+    validators = {}
+    for process in processes:
+        for document_type in process.get('document_types', ()):
+            if document_type['id'] not in validators:
+                validators[document_type['id']] = compile_validator(document_type, strict)
+    return validators
@@ -0,0 +1,360 @@
+"""
+Единая точка входа для работы с MCP сервером и настройки PDM.
+
+Подкоманды:
+    config                      показать действующую конфигурацию
+    ping                        проверить соединение с MCP сервером
+    catalog fetch               получить каталог процессов с сервера и вывести отчет
+    catalog show [файл]         вывести отчет по сохраненному снимку каталога
+    catalog save                получить каталог с сервера и сохранить снимок
+    import файл                 загрузить документы из CSV/NDJSON (с продолжением после остановки)
+    provision users             создать пользователей и группы
+    provision responsibles      назначить ответственных для задач
+    provision process           применить шаблоны бизнес-процессов
+
+Тяжелые модули импортируются только в подкомандах, которым они нужны:
+requests — в ping, catalog fetch/save и import, Django — в provision. Поэтому
+config и catalog show запускаются за десятки миллисекунд
+(см. benchmarks/bench_startup.py).
+
+Команды provision выполняют скрипты из scripts/ без manage.py shell:
+Django настраивается по --settings (или DJANGO_SETTINGS_MODULE, или
+настройке из manage.py в каталоге проекта), каталог проекта задается
+--project (или PDM_DJANGO_PROJECT, по умолчанию текущий каталог).
+
+Запуск:
+./pdm-agent config
+./pdm-agent catalog show mcp_processes_info.json --format table
+./pdm-agent import applications.csv --document-type Заявка --rejects rejects.ndjson
+./pdm-agent provision users --file users.csv --project /srv/pdm
+"""
+
+import argparse
+import os
+import re
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(BASE_DIR, 'scripts')
+DEFAULT_SNAPSHOT = 'mcp_processes_info.json'
+REPORT_FORMATS = ('text', 'table', 'ndjson', 'csv')
+SNAPSHOT_FORMATS = ('json', 'compact', 'ndjson')
+ENV_PROJECT_VAR = 'PDM_DJANGO_PROJECT'
+
+def _mask(value):
+    """Скрывает середину токена в значении заголовка."""
+    prefix, _, token = value.rpartition(' ')
+    if len(token) > 20:
+        token = f"{token[:10]}...{token[-10:]}"
+    return f"{prefix} {token}" if prefix else token
+
+# config
+
+def cmd_config(args):
+    from mcp_config import CONFIG_FILE, get_mcp_config
+
+    config = get_mcp_config()
+    if not args.show_token:
+        config['headers'] = {key: _mask(value) if key.lower() == 'authorization' else value
+                             for key, value in config.get('headers', {}).items()}
+    if args.json:
+        import json
+        print(json.dumps(config, ensure_ascii=False, indent=2))
+        return 0
+    print(f"Файл конфигурации: {CONFIG_FILE}")
+    print(f"URL: {config.get('url', 'http://localhost:8001/mcp')}")
+    for key, value in config.get('headers', {}).items():
+        print(f"{key}: {value}")
+    for key, value in config.items():
+        if key not in ('url', 'headers'):
+            print(f"{key}: {value}")
+    return 0
+
+# ping
+
+def cmd_ping(args):
+    import time
+
+    import requests
+
+    from mcp_client import get_client
+
+    client = get_client()
+    balancer = client.balancer
+    # Несколько реплик проверяются каждая по отдельности
+    urls = balancer.urls if balancer is not None else [client.base_url]
+    failed = 0
+    for url in urls:
+        print(f"Проверка соединения: {url}")
+        started = time.perf_counter()
+        try:
+            response = client.ping(url)
+        except requests.exceptions.RequestException as e:
+            print(f"✗ Ошибка соединения: {e}")
+            failed += 1
+            continue
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            print(f"✗ Статус код: {response.status_code} ({elapsed:.0f} мс)")
+            failed += 1
+            continue
+        print(f"✓ Соединение установлено ({elapsed:.0f} мс)")
+    return 1 if failed else 0
+
+# catalog
+
+def _report_filter(args):
+    if not (args.process_ids or args.name or args.task or args.document_type):
+        return None
+    from mcp_report import ProcessFilter
+    return ProcessFilter(args.process_ids, args.name, args.task, args.document_type)
+
+def _server_processes(args):
+    """Возвращает итератор процессов с сервера (через дисковый кэш, если не --no-cache)."""
+    if args.no_cache:
+        from mcp_client import get_client
+        return get_client().iter_processes(page_size=args.page_size)
+    from mcp_cache import TemplateCache
+    return TemplateCache().iter_processes(page_size=args.page_size)
+
+def _dump_metrics():
+    from mcp_metrics import dump_metrics_file
+    metrics_file = dump_metrics_file()
+    if metrics_file:
+        print(f"Метрики запросов сохранены в файл: {metrics_file}", file=sys.stderr)
+
+def _run_network(func):
+    """Выполняет команду, которой нужен сервер, и переводит ошибки requests в код выхода."""
+    import requests
+
+    try:
+        return func()
+    except requests.exceptions.HTTPError as e:
+        print(f"✗ Ошибка сервера. Статус код: {e.response.status_code}", file=sys.stderr)
+    except requests.exceptions.RequestException as e:
+        print(f"✗ Ошибка соединения: {e}", file=sys.stderr)
+    finally:
+        _dump_metrics()
+    return 1
+
+def cmd_catalog_fetch(args):
+    from mcp_report import render
+
+    def fetch():
+        render(_server_processes(args), fmt=args.format, filters=_report_filter(args),
+               summary_only=args.summary)
+        return 0
+    return _run_network(fetch)
+
+def cmd_catalog_show(args):
+    from mcp_report import render
+    from mcp_snapshot import read_processes
+
+    try:
+        render(read_processes(args.file), fmt=args.format, filters=_report_filter(args),
+               summary_only=args.summary)
+    except FileNotFoundError:
+        print(f"✗ Файл снимка не найден: {args.file}", file=sys.stderr)
+        return 1
+    return 0
+
+def cmd_catalog_save(args):
+    from mcp_report import ReportRenderer
+    from mcp_snapshot import write_processes
+
+    def save():
+        # Итоги считаются за тот же проход, что и запись
+        with ReportRenderer(fmt='text', summary_only=True) as report:
+            write_processes(report.tee(_server_processes(args)), args.output,
+                            fmt=args.snapshot_format)
+            print(f"Снимок каталога сохранен в файл: {args.output}")
+        return 0
+    return _run_network(save)
+
+# import
+
+def cmd_import(args):
+    from mcp_import import DEFAULT_PROGRESS_INTERVAL, import_file, parse_mapping
+
+    options = {name: getattr(args, name) for name in ('batch_size', 'workers') if getattr(args, name)}
+
+    def run():
+        stats = import_file(args.file, args.document_type, catalog=args.catalog, fmt=args.format,
+                            checkpoint=args.checkpoint, rejects=args.rejects, restart=args.restart,
+                            mapping=parse_mapping(args.mapping), delimiter=args.delimiter,
+                            strict=args.strict, progress_interval=0 if args.quiet else DEFAULT_PROGRESS_INTERVAL,
+                            **options)
+        return 1 if stats.rejected else 0
+    return _run_network(run)
+
+# provision
+
+def _settings_from_manage_py(project):
+    try:
+        with open(os.path.join(project, 'manage.py'), encoding='utf-8') as f:
+            source = f.read()
+    except OSError:
+        return None
+    match = re.search(r"""DJANGO_SETTINGS_MODULE['"]\s*,\s*['"]([\w.]+)['"]""", source)
+    return match.group(1) if match else None
+
+def setup_django(settings=None, project=None):
+    """
+    Настраивает Django для работы с моделями PDM вне manage.py.
+
+    Args:
+        settings (str): Модуль настроек (по умолчанию DJANGO_SETTINGS_MODULE
+            или значение из manage.py проекта)
+        project (str): Каталог проекта Django (по умолчанию PDM_DJANGO_PROJECT
+            или текущий каталог)
+
+    Raises:
+        RuntimeError: Если модуль настроек не удалось определить
+    """
+    project = os.path.abspath(project or os.environ.get(ENV_PROJECT_VAR) or os.getcwd())
+    if project not in sys.path:
+        sys.path.insert(0, project)
+    settings = settings or os.environ.get('DJANGO_SETTINGS_MODULE') or _settings_from_manage_py(project)
+    if not settings:
+        raise RuntimeError(f"Не удалось определить настройки Django: укажите --settings "
+                           f"или DJANGO_SETTINGS_MODULE (каталог проекта: {project})")
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings
+
+    import django
+    django.setup()
+
+def _load_script(name):
+    """Выполняет скрипт из scripts/ как модуль (без блока __main__) и возвращает его пространство имен."""
+    import runpy
+    return runpy.run_path(os.path.join(SCRIPTS_DIR, name), run_name=f"pdm_agent_{name[:-3]}")
+
+def cmd_provision_users(args):
+    script = _load_script('create_users_and_groups.py')
+    if args.file:
+        groups, users = script['load_provisioning_data'](args.file)
+        print(f"Массовое создание: {len(groups)} групп, {len(users)} пользователей из {args.file}")
+        script['bulk_provision'](groups, users, workers=args.workers)
+    else:
+        script['create_groups_and_users']()
+    print("\n✓ Готово!")
+    return 0
+
+def cmd_provision_responsibles(args):
+    script = _load_script('assign_responsibles.py')
+    script['assign_responsibles'](script['load_responsibles'](args.file) if args.file else None)
+    return 0
+
+def cmd_provision_process(args):
+    script = _load_script('apply_process_templates.py')
+    if args.template:
+        templates = script['load_templates'](args.template)
+    else:
+        templates = [script['TEST_PROCESS_TEMPLATE']]
+    plan = script['apply_templates'](templates, plan_only=args.plan)
+    return 1 if plan.errors else 0
+
+def _provision(func):
+    def run(args):
+        setup_django(args.settings, args.project)
+        return func(args)
+    return run
+
+# Разбор аргументов
+
+def _add_report_arguments(parser):
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='text', help="Формат отчета")
+    parser.add_argument('--id', type=int, action='append', dest='process_ids', help="ID процесса (можно несколько)")
+    parser.add_argument('--name', help="ID или часть названия процесса")
+    parser.add_argument('--task', help="ID или часть названия задачи")
+    parser.add_argument('--document-type', help="ID или часть названия типа документа")
+    parser.add_argument('--summary', action='store_true', help="Только итоги")
+
+def _add_server_arguments(parser):
+    parser.add_argument('--page-size', type=int, default=None, help="Размер страницы каталога")
+    parser.add_argument('--no-cache', action='store_true', help="Не использовать дисковый кэш ответов")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pdm-agent', description="Работа с MCP сервером и настройка PDM")
+    commands = parser.add_subparsers(dest='command', metavar='команда')
+    commands.required = True
+
+    config = commands.add_parser('config', help="Показать конфигурацию")
+    config.add_argument('--json', action='store_true', help="Вывести в JSON")
+    config.add_argument('--show-token', action='store_true', help="Не скрывать токен авторизации")
+    config.set_defaults(func=cmd_config)
+
+    ping = commands.add_parser('ping', help="Проверить соединение с MCP сервером")
+    ping.set_defaults(func=cmd_ping)
+
+    catalog = commands.add_parser('catalog', help="Каталог бизнес-процессов")
+    catalog_commands = catalog.add_subparsers(dest='catalog_command', metavar='действие')
+    catalog_commands.required = True
+
+    fetch = catalog_commands.add_parser('fetch', help="Получить каталог с сервера и вывести отчет")
+    _add_server_arguments(fetch)
+    _add_report_arguments(fetch)
+    fetch.set_defaults(func=cmd_catalog_fetch)
+
+    show = catalog_commands.add_parser('show', help="Вывести отчет по снимку каталога")
+    show.add_argument('file', nargs='?', default=DEFAULT_SNAPSHOT, help="Файл снимка (json, ndjson, .gz)")
+    _add_report_arguments(show)
+    show.set_defaults(func=cmd_catalog_show)
+
+    save = catalog_commands.add_parser('save', help="Получить каталог с сервера и сохранить снимок")
+    save.add_argument('--output', '-o', default=DEFAULT_SNAPSHOT, help="Файл снимка")
+    save.add_argument('--snapshot-format', choices=SNAPSHOT_FORMATS, default='json', help="Формат снимка")
+    _add_server_arguments(save)
+    save.set_defaults(func=cmd_catalog_save)
+
+    documents = commands.add_parser('import', help="Загрузить документы из CSV/NDJSON файла")
+    documents.add_argument('file', help="CSV (с заголовком) или NDJSON файл, можно .gz")
+    documents.add_argument('--document-type', required=True, help="ID или название типа документа")
+    documents.add_argument('--catalog', default=DEFAULT_SNAPSHOT, help="Снимок каталога с типами документов")
+    documents.add_argument('--format', choices=('csv', 'ndjson'), default=None,
+                           help="Формат файла (по умолчанию — по расширению)")
+    documents.add_argument('--map', action='append', dest='mapping', metavar='КОЛОНКА=ПОЛЕ',
+                           help="Соответствие колонки полю (можно несколько)")
+    documents.add_argument('--delimiter', default=',', help="Разделитель CSV")
+    documents.add_argument('--strict', action='store_true', help="Отклонять строки с лишними колонками")
+    documents.add_argument('--batch-size', type=int, default=None, help="Строк в пакете")
+    documents.add_argument('--workers', type=int, default=None, help="Потоков загрузки")
+    documents.add_argument('--checkpoint', help="Файл контрольной точки (по умолчанию <файл>.checkpoint)")
+    documents.add_argument('--rejects', help="NDJSON файл для отклоненных строк")
+    documents.add_argument('--restart', action='store_true', help="Начать сначала, не учитывая контрольную точку")
+    documents.add_argument('--quiet', action='store_true', help="Не выводить ход импорта")
+    documents.set_defaults(func=cmd_import)
+
+    provision = commands.add_parser('provision', help="Настройка PDM через Django")
+    provision.add_argument('--settings', help="Модуль настроек Django")
+    provision.add_argument('--project', help=f"Каталог проекта Django (по умолчанию ${ENV_PROJECT_VAR} или текущий)")
+    provision_commands = provision.add_subparsers(dest='provision_command', metavar='действие')
+    provision_commands.required = True
+
+    users = provision_commands.add_parser('users', help="Создать пользователей и группы")
+    users.add_argument('--file', help="CSV или JSON файл (см. docs/provisioning.md)")
+    users.add_argument('--workers', type=int, default=None, help="Процессов для хэширования паролей")
+    users.set_defaults(func=_provision(cmd_provision_users))
+
+    responsibles = provision_commands.add_parser('responsibles', help="Назначить ответственных для задач")
+    responsibles.add_argument('--file', help="JSON файл с назначениями")
+    responsibles.set_defaults(func=_provision(cmd_provision_responsibles))
+
+    process = provision_commands.add_parser('process', help="Применить шаблоны бизнес-процессов")
+    process.add_argument('--template', help="JSON файл с шаблонами (см. docs/processes/)")
+    process.add_argument('--plan', action='store_true', help="Только показать план изменений")
+    process.set_defaults(func=_provision(cmd_provision_process))
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except (RuntimeError, ImportError, OSError, ValueError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Скрипт для применения шаблонов бизнес-процессов, описанных в файлах ("процесс как код").
+
+Скрипт сравнивает описание шаблона с текущим состоянием в базе данных,
+выводит план изменений и применяет только изменившиеся привязки в одной транзакции.
+
+Выполните этот скрипт через Django shell:
+python manage.py shell < scripts/apply_process_templates.py
+
+Описание шаблонов можно передать файлом (один шаблон или список шаблонов):
+PROCESS_TEMPLATE=docs/processes/test-application-process.json python manage.py shell < scripts/apply_process_templates.py
+
+Только показать план, ничего не меняя:
+PLAN_ONLY=1 python manage.py shell < scripts/apply_process_templates.py
+
+Формат описания шаблона (типы документов — ID или название):
+{
+  "business_process": 1,
+  "entity_types": ["Заявка", "Решение по заявке"],
+  "tasks": [
+    {"id": 1, "readable": [], "editable": ["Заявка"]},
+    {"id": 2, "readable": ["Заявка"], "editable": ["Решение по заявке"],
+     "start_condition": {"assignment_task": "Создание заявки", "operator": "equals", "value": "completed"}}
+  ]
+}
+Если в шаблоне нет ключа "entity_types", типы документов процесса не меняются.
+Если у задачи нет ключа "readable" или "editable", соответствующие привязки
+не меняются; пустой список [] удаляет все привязки.
+Название типа документа, которому соответствует несколько типов, считается
+ошибкой — такой тип нужно указать по ID.
+Если у задачи нет ключа "start_condition", её условия запуска не меняются;
+значение null удаляет условия запуска задачи.
+"""
+
+import json
+import os
+
+from django.db import transaction
+from processes.models import BusinessProcess, Task, TaskStartCondition, EntityType
+
+# Шаблон тестового бизнес-процесса "Обработка заявки"
+TEST_PROCESS_TEMPLATE = {
+    'business_process': 1,
+    'entity_types': [1, 2, 3],
+    'tasks': [
+        {'id': 1, 'readable': [], 'editable': [1]},
+        {
+            'id': 2,
+            'readable': [1],
+            'editable': [2],
+            'start_condition': {
+                'assignment_task': 'Создание заявки',
+                'operator': 'equals',
+                'value': 'completed'
+            }
+        },
+        {
+            'id': 3,
+            'readable': [1, 2],
+            'editable': [3],
+            'start_condition': {
+                'assignment_task': 'Рассмотрение заявки',
+                'operator': 'equals',
+                'value': 'completed'
+            }
+        }
+    ]
+}
+
+# Размер пакета для массовых операций
+BATCH_SIZE = 1000
+
+# Связи многие-ко-многим, которыми управляет шаблон
+RELATIONS = {
+    'process_entity_types': (BusinessProcess.entity_types, 'типы документов процесса'),
+    'readable': (Task.readable_entity_types, 'документы для чтения'),
+    'editable': (Task.editable_entity_types, 'документы для редактирования'),
+}
+
+def load_templates(path):
+    """
+    Загружает описание шаблонов из JSON файла.
+
+    Returns:
+        list: Описания шаблонов
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+class Plan:
+    """План изменений: что добавить и удалить, чтобы база соответствовала шаблонам."""
+
+    def __init__(self):
+        # Имя связи → множество пар (ID объекта, ID типа документа)
+        self.add = {name: set() for name in RELATIONS}
+        self.remove = {name: set() for name in RELATIONS}
+        self.conditions_to_delete = []
+        self.conditions_to_create = []
+        self.lines = []
+        self.errors = []
+
+    @property
+    def changes(self):
+        """int: Количество изменений в плане."""
+        return (sum(len(pairs) for pairs in self.add.values())
+                + sum(len(pairs) for pairs in self.remove.values())
+                + len(self.conditions_to_delete)
+                + len(self.conditions_to_create))
+
+    def print(self):
+        for line in self.lines:
+            print(line)
+        for error in self.errors:
+            print(f"Ошибка: {error}")
+        if self.changes:
+            print(f"\nИтого изменений: {self.changes}")
+        else:
+            print("\nИзменений нет: база данных соответствует шаблонам")
+
+def _resolve_entity_types(templates):
+    """
+    Загружает все упомянутые типы документов двумя запросами (по ID и по названию).
+
+    Название типа документа не обязано быть уникальным: названия, которым
+    соответствует несколько типов, возвращаются отдельно.
+
+    Returns:
+        tuple: (ссылка → EntityType, название → список ID неоднозначных типов)
+    """
+    refs = set()
+    for template in templates:
+        refs.update(template.get('entity_types', []))
+        for task in template.get('tasks', []):
+            refs.update(task.get('readable', []))
+            refs.update(task.get('editable', []))
+    ids = [ref for ref in refs if isinstance(ref, int)]
+    names = [ref for ref in refs if not isinstance(ref, int)]
+    resolved = {}
+    ambiguous = {}
+    if ids:
+        resolved.update(EntityType.objects.in_bulk(ids))
+    if names:
+        for entity_type in EntityType.objects.filter(name__in=names).order_by('id'):
+            if entity_type.name in ambiguous:
+                ambiguous[entity_type.name].append(entity_type.id)
+            elif entity_type.name in resolved:
+                ambiguous[entity_type.name] = [resolved.pop(entity_type.name).id, entity_type.id]
+            else:
+                resolved[entity_type.name] = entity_type
+    return resolved, ambiguous
+
+def _diff(plan, relation, owner_id, current, desired, title):
+    """Добавляет в план разницу между текущим и желаемым набором типов документов."""
+    added = desired.keys() - current.keys()
+    removed = current.keys() - desired.keys()
+    for entity_type_id in sorted(added):
+        plan.add[relation].add((owner_id, entity_type_id))
+        plan.lines.append(f"  + {title}: {desired[entity_type_id].name} (ID: {entity_type_id})")
+    for entity_type_id in sorted(removed):
+        plan.remove[relation].add((owner_id, entity_type_id))
+        plan.lines.append(f"  - {title}: {current[entity_type_id].name} (ID: {entity_type_id})")
+
+def build_plan(templates):
+    """
+    Сравнивает шаблоны с состоянием базы данных и строит план изменений.
+
+    Текущее состояние всех шаблонов загружается несколькими общими запросами:
+    процессы и задачи с предзагруженными привязками, условия запуска и типы документов.
+
+    Args:
+        templates (list): Описания шаблонов
+
+    Returns:
+        Plan: План изменений
+    """
+    plan = Plan()
+    entity_types, ambiguous = _resolve_entity_types(templates)
+    processes = BusinessProcess.objects.prefetch_related('entity_types').in_bulk(
+        [template['business_process'] for template in templates]
+    )
+    task_ids = [task['id'] for template in templates for task in template.get('tasks', [])]
+    tasks = Task.objects.prefetch_related('readable_entity_types', 'editable_entity_types').in_bulk(task_ids)
+    conditions = {}
+    for condition in TaskStartCondition.objects.filter(task_id__in=task_ids):
+        conditions.setdefault(condition.task_id, []).append(condition)
+
+    def lookup(refs, context):
+        found = {}
+        for ref in refs:
+            entity_type = entity_types.get(ref)
+            if ref in ambiguous:
+                ids = ', '.join(str(entity_type_id) for entity_type_id in ambiguous[ref])
+                plan.errors.append(f"Типов документов с названием {ref} несколько (ID: {ids}), "
+                                   f"укажите ID ({context})")
+            elif entity_type is None:
+                plan.errors.append(f"Тип документа {ref} не найден ({context})")
+            else:
+                found[entity_type.id] = entity_type
+        return found
+
+    for template in templates:
+        bp = processes.get(template['business_process'])
+        if bp is None:
+            plan.errors.append(f"Бизнес-процесс с ID {template['business_process']} не найден")
+            continue
+        plan.lines.append(f"\nБизнес-процесс '{bp.name}' (ID: {bp.id}):")
+
+        current_process_types = {et.id: et for et in bp.entity_types.all()}
+        if 'entity_types' in template:
+            desired_process_types = lookup(template['entity_types'], f"процесс '{bp.name}'")
+            _diff(plan, 'process_entity_types', bp.id, current_process_types, desired_process_types,
+                  RELATIONS['process_entity_types'][1])
+        else:
+            desired_process_types = current_process_types
+
+        for task_template in template.get('tasks', []):
+            task = tasks.get(task_template['id'])
+            if task is None:
+                plan.errors.append(f"Задача с ID {task_template['id']} не найдена")
+                continue
+            context = f"задача '{task.name}'"
+
+            for relation, prefetched in (('readable', task.readable_entity_types),
+                                         ('editable', task.editable_entity_types)):
+                if relation not in task_template:
+                    continue
+                desired = lookup(task_template[relation], context)
+                # К задаче можно привязать только типы документов, привязанные к процессу
+                foreign = [et.name for et_id, et in desired.items() if et_id not in desired_process_types]
+                if foreign:
+                    plan.errors.append(f"{', '.join(foreign)} не привязаны к процессу '{bp.name}' ({context})")
+                    continue
+                current = {et.id: et for et in prefetched.all()}
+                _diff(plan, relation, task.id, current, desired, f"{context}, {RELATIONS[relation][1]}")
+
+            if 'start_condition' in task_template:
+                desired_tree = task_template['start_condition']
+                existing = conditions.get(task.id, [])
+                current_trees = [condition.condition_tree for condition in existing]
+                wanted_trees = [desired_tree] if desired_tree is not None else []
+                if current_trees != wanted_trees:
+                    plan.conditions_to_delete.extend(condition.id for condition in existing)
+                    plan.conditions_to_create.extend((task.id, tree) for tree in wanted_trees)
+                    plan.lines.append(f"  ~ {context}, условие запуска: "
+                                      f"{json.dumps(desired_tree, ensure_ascii=False)}")
+    return plan
+
+def _apply_relation(descriptor, add, remove, batch_size):
+    """Добавляет и удаляет строки промежуточной таблицы связи пакетными операциями."""
+    if not add and not remove:
+        return
+    field = descriptor.field
+    through = descriptor.through
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+    if remove:
+        rows = through.objects.filter(**{f"{source}__in": {owner_id for owner_id, _ in remove}})
+        stale_ids = [row_id for row_id, owner_id, target_id in rows.values_list('pk', source, target)
+                     if (owner_id, target_id) in remove]
+        through.objects.filter(pk__in=stale_ids).delete()
+    through.objects.bulk_create(
+        [through(**{source: owner_id, target: target_id}) for owner_id, target_id in add],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+@transaction.atomic
+def apply_plan(plan, batch_size=BATCH_SIZE):
+    """
+    Применяет план изменений в одной транзакции.
+
+    Сначала меняются типы документов процессов, затем привязки документов
+    к задачам и условия запуска.
+    """
+    for relation in ('process_entity_types', 'readable', 'editable'):
+        descriptor = RELATIONS[relation][0]
+        _apply_relation(descriptor, plan.add[relation], plan.remove[relation], batch_size)
+    if plan.conditions_to_delete:
+        TaskStartCondition.objects.filter(id__in=plan.conditions_to_delete).delete()
+    TaskStartCondition.objects.bulk_create(
+        [TaskStartCondition(task_id=task_id, condition_tree=tree) for task_id, tree in plan.conditions_to_create],
+        batch_size=batch_size,
+    )
+
+def apply_templates(templates, plan_only=False):
+    """
+    Строит план изменений для шаблонов, выводит его и применяет.
+
+    Args:
+        templates (list): Описания шаблонов
+        plan_only (bool): Только вывести план, ничего не меняя
+
+    Returns:
+        Plan: План изменений
+    """
+    plan = build_plan(templates)
+    print("План изменений:")
+    plan.print()
+    if plan.errors:
+        print("\n✗ План содержит ошибки, изменения не применены")
+    elif plan_only:
+        print("\nРежим просмотра плана: изменения не применены")
+    elif plan.changes:
+        apply_plan(plan)
+        print(f"\n✓ Применено изменений: {plan.changes}")
+    return plan
+
+if __name__ == '__main__':
+    template_file = os.environ.get('PROCESS_TEMPLATE')
+    templates = load_templates(template_file) if template_file else [TEST_PROCESS_TEMPLATE]
+    apply_templates(templates, plan_only=bool(os.environ.get('PLAN_ONLY')))
@@ -7,10 +7,27 @@ python manage.py shell < scripts/assign_responsibles.py
 Или в интерактивном режиме:
 python manage.py shell
 >>> exec(open('scripts/assign_responsibles.py').read())
+
+Назначения можно описать в JSON файле и передать его через переменную окружения:
+RESPONSIBLES_FILE=responsibles.json python manage.py shell < scripts/assign_responsibles.py
+
+Формат файла (пользователи — ID или username, группы — ID или название,
+ключи "groups" и "observers" необязательны):
+{
+  "tasks": [
+    {"task": 1, "user": "creator_user", "groups": ["Создатели заявок"], "observers": []}
+  ]
+}
+
+Назначения применяются за постоянное число запросов независимо от количества задач.
 """
 
+import json
+import os
+
 from processes.models import Task
 from django.contrib.auth.models import User, Group
+from django.db import transaction
 
 # ID задач
 TASK_CREATE_ID = 1  # Создание заявки
@@ -27,99 +44,181 @@ GROUP_CREATORS_ID = 1    # Создатели заявок
 GROUP_REVIEWERS_ID = 2   # Рассматривающие заявки
 GROUP_APPROVERS_ID = 3   # Утверждающие заявки
 
-def assign_responsibles():
-    """Назначает ответственных пользователей и группы для задач"""
-    
-    # Задача 1: Создание заявки
-    try:
-        task_create = Task.objects.get(id=TASK_CREATE_ID)
-        user_creator = User.objects.get(id=USER_CREATOR_ID)
-        group_creators = Group.objects.get(id=GROUP_CREATORS_ID)
-        
-        task_create.responsible = user_creator
-        task_create.responsible_groups.set([group_creators])
-        task_create.save()
-        
-        print(f"✓ Назначен ответственный для задачи '{task_create.name}':")
-        print(f"  - Пользователь: {user_creator.username} (ID: {user_creator.id})")
-        print(f"  - Группа: {group_creators.name} (ID: {group_creators.id})")
-    except Task.DoesNotExist:
-        print(f"Ошибка: Задача с ID {TASK_CREATE_ID} не найдена")
-    except User.DoesNotExist:
-        print(f"Ошибка: Пользователь с ID {USER_CREATOR_ID} не найден")
-    except Group.DoesNotExist:
-        print(f"Ошибка: Группа с ID {GROUP_CREATORS_ID} не найдена")
-    
-    # Задача 2: Рассмотрение заявки
-    try:
-        task_review = Task.objects.get(id=TASK_REVIEW_ID)
-        user_reviewer = User.objects.get(id=USER_REVIEWER_ID)
-        group_reviewers = Group.objects.get(id=GROUP_REVIEWERS_ID)
-        
-        task_review.responsible = user_reviewer
-        task_review.responsible_groups.set([group_reviewers])
-        task_review.save()
-        
-        print(f"✓ Назначен ответственный для задачи '{task_review.name}':")
-        print(f"  - Пользователь: {user_reviewer.username} (ID: {user_reviewer.id})")
-        print(f"  - Группа: {group_reviewers.name} (ID: {group_reviewers.id})")
-    except Task.DoesNotExist:
-        print(f"Ошибка: Задача с ID {TASK_REVIEW_ID} не найдена")
-    except User.DoesNotExist:
-        print(f"Ошибка: Пользователь с ID {USER_REVIEWER_ID} не найден")
-    except Group.DoesNotExist:
-        print(f"Ошибка: Группа с ID {GROUP_REVIEWERS_ID} не найдена")
-    
-    # Задача 3: Утверждение заявки
-    try:
-        task_approve = Task.objects.get(id=TASK_APPROVE_ID)
-        user_approver = User.objects.get(id=USER_APPROVER_ID)
-        group_approvers = Group.objects.get(id=GROUP_APPROVERS_ID)
-        
-        task_approve.responsible = user_approver
-        task_approve.responsible_groups.set([group_approvers])
-        task_approve.save()
-        
-        print(f"✓ Назначен ответственный для задачи '{task_approve.name}':")
-        print(f"  - Пользователь: {user_approver.username} (ID: {user_approver.id})")
-        print(f"  - Группа: {group_approvers.name} (ID: {group_approvers.id})")
-    except Task.DoesNotExist:
-        print(f"Ошибка: Задача с ID {TASK_APPROVE_ID} не найдена")
-    except User.DoesNotExist:
-        print(f"Ошибка: Пользователь с ID {USER_APPROVER_ID} не найден")
-    except Group.DoesNotExist:
-        print(f"Ошибка: Группа с ID {GROUP_APPROVERS_ID} не найдена")
-    
+# Назначения по умолчанию для процесса "Обработка заявки"
+RESPONSIBLES = [
+    {'task': TASK_CREATE_ID, 'user': USER_CREATOR_ID, 'groups': [GROUP_CREATORS_ID]},
+    {'task': TASK_REVIEW_ID, 'user': USER_REVIEWER_ID, 'groups': [GROUP_REVIEWERS_ID]},
+    {'task': TASK_APPROVE_ID, 'user': USER_APPROVER_ID, 'groups': [GROUP_APPROVERS_ID]},
+]
+
+# Размер пакета для массовых операций
+BATCH_SIZE = 1000
+
+def load_responsibles(path):
+    """
+    Загружает описание назначений из JSON файла.
+
+    Args:
+        path (str): Путь к файлу
+
+    Returns:
+        list: Назначения в формате RESPONSIBLES
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data['tasks'] if isinstance(data, dict) else data
+
+def _resolve(model, refs, name_field):
+    """
+    Загружает объекты по ID и по названию двумя запросами.
+
+    Returns:
+        dict: Ссылка (ID или название) → объект
+    """
+    ids = {ref for ref in refs if isinstance(ref, int)}
+    names = {ref for ref in refs if not isinstance(ref, int)}
+    resolved = {}
+    if ids:
+        resolved.update(model.objects.in_bulk(list(ids)))
+    if names:
+        resolved.update(model.objects.in_bulk(list(names), field_name=name_field))
+    return resolved
+
+def _sync_m2m(descriptor, desired, batch_size=BATCH_SIZE):
+    """
+    Приводит связи многие-ко-многим к заданному состоянию пакетными операциями.
+
+    Аналог related.set() для множества объектов сразу: одним запросом
+    читаются существующие строки промежуточной таблицы, лишние удаляются
+    одним запросом, недостающие добавляются одним bulk_create.
+
+    Args:
+        descriptor: Атрибут модели, например Task.responsible_groups
+        desired (dict): ID исходного объекта → множество ID связанных объектов
+
+    Returns:
+        tuple: (количество добавленных, количество удаленных связей)
+    """
+    field = descriptor.field
+    through = descriptor.through
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+    existing = {}
+    for row_id, source_id, target_id in (
+        through.objects.filter(**{f"{source}__in": list(desired)}).values_list('pk', source, target)
+    ):
+        existing[(source_id, target_id)] = row_id
+    wanted = {(source_id, target_id) for source_id, targets in desired.items() for target_id in targets}
+
+    stale_ids = [row_id for pair, row_id in existing.items() if pair not in wanted]
+    if stale_ids:
+        through.objects.filter(pk__in=stale_ids).delete()
+    new_rows = [through(**{source: source_id, target: target_id}) for source_id, target_id in wanted - existing.keys()]
+    through.objects.bulk_create(new_rows, batch_size=batch_size)
+    return len(new_rows), len(stale_ids)
+
+@transaction.atomic
+def assign_responsibles(responsibles=None, batch_size=BATCH_SIZE):
+    """
+    Назначает ответственных пользователей, группы и наблюдателей для задач.
+
+    Args:
+        responsibles (list): Назначения в формате RESPONSIBLES
+            (по умолчанию — назначения процесса "Обработка заявки")
+        batch_size (int): Размер пакета для массовых операций
+    """
+    if responsibles is None:
+        responsibles = RESPONSIBLES
+    has_observers = any('observers' in entry for entry in responsibles)
+
+    # Загружаем все задачи, пользователей и группы за несколько запросов
+    tasks = Task.objects.in_bulk([entry['task'] for entry in responsibles])
+    users = _resolve(User, {
+        ref for entry in responsibles
+        for ref in [entry.get('user'), *entry.get('observers', [])] if ref is not None
+    }, 'username')
+    groups = _resolve(Group, {ref for entry in responsibles for ref in entry.get('groups', [])}, 'name')
+
+    changed_tasks = []
+    desired_groups = {}
+    desired_observers = {}
+    for entry in responsibles:
+        task = tasks.get(entry['task'])
+        if task is None:
+            print(f"Ошибка: Задача с ID {entry['task']} не найдена")
+            continue
+        missing_users = [ref for ref in [entry.get('user'), *entry.get('observers', [])]
+                         if ref is not None and ref not in users]
+        if missing_users:
+            print(f"Ошибка: Пользователь {missing_users[0]} не найден (задача '{task.name}')")
+            continue
+        missing_groups = [ref for ref in entry.get('groups', []) if ref not in groups]
+        if missing_groups:
+            print(f"Ошибка: Группа {missing_groups[0]} не найдена (задача '{task.name}')")
+            continue
+
+        if 'user' in entry:
+            responsible = users[entry['user']] if entry['user'] is not None else None
+            if task.responsible_id != (responsible.id if responsible else None):
+                task.responsible = responsible
+                changed_tasks.append(task)
+        if 'groups' in entry:
+            desired_groups[task.id] = {groups[ref].id for ref in entry['groups']}
+        if 'observers' in entry:
+            desired_observers[task.id] = {users[ref].id for ref in entry['observers']}
+
+    Task.objects.bulk_update(changed_tasks, ['responsible'], batch_size=batch_size)
+    print(f"✓ Изменены ответственные пользователи у задач: {len(changed_tasks)}")
+
+    added, removed = _sync_m2m(Task.responsible_groups, desired_groups, batch_size)
+    print(f"✓ Ответственные группы: добавлено связей {added}, удалено {removed}")
+
+    if desired_observers:
+        added, removed = _sync_m2m(Task.observers, desired_observers, batch_size)
+        print(f"✓ Наблюдатели: добавлено связей {added}, удалено {removed}")
+
     print("\n" + "="*60)
     print("Проверка назначенных ответственных:")
     print("="*60)
-    
-    # Проверяем результат
-    for task_id, task_name in [
-        (TASK_CREATE_ID, "Создание заявки"),
-        (TASK_REVIEW_ID, "Рассмотрение заявки"),
-        (TASK_APPROVE_ID, "Утверждение заявки")
-    ]:
-        try:
-            task = Task.objects.get(id=task_id)
-            responsible = task.responsible
-            groups = task.responsible_groups.all()
-            
-            print(f"\nЗадача: {task_name} (ID: {task_id})")
-            if responsible:
-                print(f"  Ответственный пользователь: {responsible.username} (ID: {responsible.id})")
-            else:
-                print(f"  Ответственный пользователь: не назначен")
-            
-            if groups:
-                print(f"  Ответственные группы: {', '.join([g.name for g in groups])}")
-            else:
-                print(f"  Ответственные группы: не назначены")
-        except Task.DoesNotExist:
+
+    # Проверяем результат: задачи, пользователи и группы загружаются тремя-четырьмя запросами
+    prefetch = ['responsible_groups'] + (['observers'] if has_observers else [])
+    checked = (
+        Task.objects.filter(id__in=[entry['task'] for entry in responsibles])
+        .select_related('responsible')
+        .prefetch_related(*prefetch)
+        .in_bulk()
+    )
+    for entry in responsibles:
+        task_id = entry['task']
+        task = checked.get(task_id)
+        if task is None:
             print(f"Задача с ID {task_id} не найдена")
+            continue
 
-if __name__ == '__main__':
-    assign_responsibles()
-    print("\n✓ Готово!")
+        responsible = task.responsible
+        task_groups = task.responsible_groups.all()
+
+        print(f"\nЗадача: {task.name} (ID: {task_id})")
+        if responsible:
+            print(f"  Ответственный пользователь: {responsible.username} (ID: {responsible.id})")
+        else:
+            print(f"  Ответственный пользователь: не назначен")
 
+        if task_groups:
+            print(f"  Ответственные группы: {', '.join([g.name for g in task_groups])}")
+        else:
+            print(f"  Ответственные группы: не назначены")
 
+        if has_observers:
+            observers = task.observers.all()
+            if observers:
+                print(f"  Наблюдатели: {', '.join([u.username for u in observers])}")
+            else:
+                print(f"  Наблюдатели: не назначены")
+
+if __name__ == '__main__':
+    responsibles_file = os.environ.get('RESPONSIBLES_FILE')
+    assign_responsibles(load_responsibles(responsibles_file) if responsibles_file else None)
+    print("\n✓ Готово!")
@@ -7,10 +7,38 @@ python manage.py shell < scripts/create_users_and_groups.py
 Или в интерактивном режиме:
 python manage.py shell
 >>> exec(open('scripts/create_users_and_groups.py').read())
+
+Массовое создание пользователей и групп из файла (CSV или JSON):
+PROVISION_FILE=users.csv python manage.py shell < scripts/create_users_and_groups.py
+
+Формат JSON:
+{
+  "groups": [{"name": "Создатели заявок"}],
+  "users": [{"username": "creator_user", "email": "creator@example.com",
+             "first_name": "Иван", "last_name": "Создатель",
+             "password": "creator123", "groups": ["Создатели заявок"]}]
+}
+
+Формат CSV (группы перечисляются через ";", недостающие группы создаются):
+username,email,first_name,last_name,password,groups
+creator_user,creator@example.com,Иван,Создатель,creator123,Создатели заявок
 """
 
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User, Group
-from django.db import transaction
+from django.db import connections, transaction
+
+# Поля пользователя, которые обновляются у существующих пользователей
+USER_FIELDS = ('email', 'first_name', 'last_name')
+# Размер пакета для bulk_create / bulk_update
+BATCH_SIZE = 1000
+# С какого количества паролей хэшировать их в пуле процессов
+PARALLEL_HASH_THRESHOLD = 8
 
 # Создаем группы (роли)
 GROUPS = [
@@ -107,8 +135,12 @@ def create_groups_and_users():
         print(f"  - {group.name} (ID: {group.id})")
     
     print("\nПользователи:")
+    # Группы всех пользователей загружаются одним дополнительным запросом
+    users_with_groups = User.objects.filter(
+        id__in=[user.id for user in created_users.values()]
+    ).prefetch_related('groups').in_bulk()
     for username, user in created_users.items():
-        groups = ', '.join([g.name for g in user.groups.all()])
+        groups = ', '.join([g.name for g in users_with_groups[user.id].groups.all()])
         print(f"  - {user.username} (ID: {user.id}, Группы: {groups})")
     
     print("\n" + "="*60)
@@ -131,7 +163,176 @@ def create_groups_and_users():
         'users': created_users
     }
 
+def load_provisioning_data(path):
+    """
+    Загружает описание групп и пользователей из CSV или JSON файла.
+    
+    Args:
+        path (str): Путь к файлу (.csv или .json)
+    
+    Returns:
+        tuple: (список групп, список пользователей) в формате GROUPS и USERS;
+        у каждого пользователя список групп в ключе 'groups'
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            users = []
+            for row in csv.DictReader(f):
+                row['groups'] = [name.strip() for name in (row.get('groups') or '').split(';') if name.strip()]
+                users.append(row)
+        groups = []
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        groups = data.get('groups', [])
+        users = data.get('users', [])
+    
+    for user_data in users:
+        # Поддерживаем и формат USERS с одной группой в ключе 'group'
+        if 'groups' not in user_data:
+            user_data['groups'] = [user_data['group']] if user_data.get('group') else []
+    
+    # Группы, упомянутые у пользователей, но не описанные отдельно
+    known = {group_data['name'] for group_data in groups}
+    for user_data in users:
+        for name in user_data['groups']:
+            if name not in known:
+                groups.append({'name': name})
+                known.add(name)
+    return groups, users
+
+def hash_passwords(passwords, workers=None):
+    """
+    Вычисляет хэши паролей; большие наборы — параллельно в пуле процессов.
+    
+    Args:
+        passwords (list): Пароли в открытом виде
+        workers (int): Количество процессов (по умолчанию — число ядер)
+    
+    Returns:
+        list: Хэши паролей в том же порядке
+    """
+    if len(passwords) < PARALLEL_HASH_THRESHOLD:
+        return [make_password(password) for password in passwords]
+    # Дочерние процессы не должны унаследовать открытые соединения с базой данных
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(passwords) // ((workers or os.cpu_count() or 1) * 4))
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+def bulk_provision(groups, users, workers=None, batch_size=BATCH_SIZE):
+    """
+    Массово создает группы и пользователей и добавляет пользователей в группы.
+    
+    Текущее состояние читается одним запросом на каждую таблицу, после чего
+    создаются только недостающие строки (bulk_create), у существующих
+    пользователей обновляются изменившиеся поля (bulk_update), а членство
+    в группах добавляется одной вставкой в промежуточную таблицу. Пароли
+    задаются только новым пользователям. Повторный запуск ничего не меняет.
+    
+    Пароли новых пользователей хэшируются до начала транзакции, чтобы
+    не держать ее открытой на время самой медленной операции.
+    
+    Args:
+        groups (list): Группы в формате GROUPS
+        users (list): Пользователи в формате USERS, группы — в ключе 'groups'
+        workers (int): Количество процессов для хэширования паролей
+        batch_size (int): Размер пакета для массовых операций
+    
+    Returns:
+        dict: Количество созданных и обновленных записей
+    """
+    users_by_name = {user_data['username']: user_data for user_data in users}
+    existing = set(User.objects.filter(username__in=list(users_by_name)).values_list('username', flat=True))
+    new_usernames = [username for username in users_by_name if username not in existing]
+    password_hashes = dict(zip(new_usernames, hash_passwords(
+        [users_by_name[username].get('password') or None for username in new_usernames], workers=workers)))
+    return _write_provisioning(groups, users, password_hashes, batch_size)
+
+@transaction.atomic
+def _write_provisioning(groups, users, password_hashes, batch_size):
+    """
+    Записывает группы, пользователей и членство в группах в одной транзакции.
+    
+    Args:
+        password_hashes (dict): Имя пользователя → хэш пароля для новых пользователей
+    """
+    # Группы
+    group_names = [group_data['name'] for group_data in groups]
+    existing_groups = Group.objects.filter(name__in=group_names).in_bulk(field_name='name')
+    new_groups = [Group(name=name) for name in dict.fromkeys(group_names) if name not in existing_groups]
+    Group.objects.bulk_create(new_groups, batch_size=batch_size)
+    groups_by_name = Group.objects.filter(name__in=group_names).in_bulk(field_name='name')
+    print(f"✓ Групп создано: {len(new_groups)}, уже существовало: {len(existing_groups)}")
+    
+    # Пользователи
+    users_by_name = {user_data['username']: user_data for user_data in users}
+    existing_users = User.objects.filter(username__in=list(users_by_name)).in_bulk(field_name='username')
+    
+    changed_users = []
+    for username, user in existing_users.items():
+        user_data = users_by_name[username]
+        changed = False
+        for field in USER_FIELDS:
+            value = user_data.get(field)
+            if value is not None and getattr(user, field) != value:
+                setattr(user, field, value)
+                changed = True
+        if changed:
+            changed_users.append(user)
+    User.objects.bulk_update(changed_users, USER_FIELDS, batch_size=batch_size)
+    
+    new_user_data = [user_data for username, user_data in users_by_name.items()
+                     if username not in existing_users]
+    new_users = [
+        User(
+            username=user_data['username'],
+            # Пользователь мог быть удален после хэширования — хэшируем на месте
+            password=(password_hashes.get(user_data['username'])
+                      or make_password(user_data.get('password') or None)),
+            **{field: user_data.get(field) or '' for field in USER_FIELDS}
+        )
+        for user_data in new_user_data
+    ]
+    User.objects.bulk_create(new_users, batch_size=batch_size)
+    user_ids = dict(User.objects.filter(username__in=list(users_by_name)).values_list('username', 'id'))
+    print(f"✓ Пользователей создано: {len(new_users)}, обновлено: {len(changed_users)}, "
+          f"без изменений: {len(existing_users) - len(changed_users)}")
+    
+    # Членство в группах — одна вставка в промежуточную таблицу
+    Membership = User.groups.through
+    wanted = {
+        (user_ids[user_data['username']], groups_by_name[name].id)
+        for user_data in users
+        for name in user_data['groups']
+    }
+    existing_memberships = set(
+        Membership.objects
+        .filter(user_id__in=user_ids.values(), group_id__in=[group.id for group in groups_by_name.values()])
+        .values_list('user_id', 'group_id')
+    )
+    new_memberships = [
+        Membership(user_id=user_id, group_id=group_id)
+        for user_id, group_id in wanted - existing_memberships
+    ]
+    Membership.objects.bulk_create(new_memberships, batch_size=batch_size, ignore_conflicts=True)
+    print(f"✓ Добавлено пользователей в группы: {len(new_memberships)}")
+    
+    return {
+        'groups_created': len(new_groups),
+        'users_created': len(new_users),
+        'users_updated': len(changed_users),
+        'memberships_created': len(new_memberships),
+    }
+
 if __name__ == '__main__':
-    result = create_groups_and_users()
-    print("\n✓ Готово! Теперь можно назначить ответственных через MCP API.")
+    provision_file = os.environ.get('PROVISION_FILE')
+    if provision_file:
+        groups, users = load_provisioning_data(provision_file)
+        print(f"Массовое создание: {len(groups)} групп, {len(users)} пользователей из {provision_file}")
+        bulk_provision(groups, users)
+        print("\n✓ Готово!")
+    else:
+        result = create_groups_and_users()
+        print("\n✓ Готово! Теперь можно назначить ответственных через MCP API.")
 
@@ -5,8 +5,13 @@
 для выполнения запросов к API.
 """
 
+import itertools
+
 import requests
 from mcp_config import get_mcp_url, get_mcp_headers
+from mcp_client import get_client
+from mcp_async import fetch_processes
+from mcp_metrics import dump_metrics_file, get_metrics
 
 def test_mcp_connection():
     """
@@ -23,13 +28,18 @@ def test_mcp_connection():
         print(f"Используемые заголовки: {headers}")
         
         # Выполняем GET запрос к корневому URL MCP сервера
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_client().ping()
         
         print(f"Статус код: {response.status_code}")
         
         if response.status_code == 200:
             print("✓ Соединение с MCP сервером успешно!")
             print(f"Ответ: {response.text[:200]}...")  # Показываем первые 200 символов
+            balancer = get_client().balancer
+            if balancer is not None:
+                # Тот же ping для каждой реплики; неисправные исключаются из балансировки
+                for replica, healthy in balancer.check().items():
+                    print(f"{'✓' if healthy else '✗'} Реплика {replica}")
             return True
         else:
             print(f"✗ Ошибка соединения. Статус код: {response.status_code}")
@@ -42,27 +52,31 @@ def test_mcp_connection():
 
 def get_processes():
     """
-    Получает список бизнес-процессов с MCP сервера.
+    Получает бизнес-процессы с MCP сервера.
+    
+    Процессы отдаются по одному по мере получения с сервера,
+    весь список в памяти не собирается.
     
     Returns:
-        list: Список бизнес-процессов или None в случае ошибки
+        iterator: Бизнес-процессы или None в случае ошибки
     """
     try:
-        url = f"{get_mcp_url()}/processes/"
-        headers = get_mcp_headers()
+        client = get_client()
+        url = client.url("processes/")
         
         print(f"Получение списка бизнес-процессов: {url}")
         
-        response = requests.get(url, headers=headers, timeout=10)
+        processes = client.iter_processes()
         
-        if response.status_code == 200:
-            processes = response.json()
-            print(f"✓ Получено {len(processes)} бизнес-процессов")
-            return processes
-        else:
-            print(f"✗ Ошибка получения бизнес-процессов. Статус код: {response.status_code}")
-            return None
+        # Первый процесс получаем сразу, чтобы проверить ответ сервера
+        first = next(processes, None)
+        if first is None:
+            return iter([])
+        return itertools.chain([first], processes)
             
+    except requests.exceptions.HTTPError as e:
+        print(f"✗ Ошибка получения бизнес-процессов. Статус код: {e.response.status_code}")
+        return None
     except requests.exceptions.RequestException as e:
         print(f"✗ Ошибка при получении бизнес-процессов: {e}")
         return None
@@ -81,10 +95,25 @@ if __name__ == '__main__':
         # Получаем бизнес-процессы
         processes = get_processes()
         
-        if processes:
+        if processes is not None:
             print("\nСписок бизнес-процессов:")
+            process_ids = []
             for i, process in enumerate(processes, 1):
                 print(f"{i}. {process.get('name', 'Неизвестный процесс')}")
+                if 'id' in process:
+                    process_ids.append(process['id'])
+            print(f"✓ Получено {len(process_ids)} бизнес-процессов")
+            
+            # Получаем полные шаблоны процессов параллельными запросами
+            details = fetch_processes(process_ids, concurrency=8, timeout=10)
+            received = sum(1 for process in details if process is not None)
+            print(f"\n✓ Получено шаблонов процессов по ID: {received} из {len(process_ids)}")
+    
+    # Время и размер запросов к MCP серверу
+    get_metrics().print_summary()
+    metrics_file = dump_metrics_file()
+    if metrics_file:
+        print(f"Метрики запросов сохранены в файл: {metrics_file}")
     
     print("\n" + "=" * 60)
     print("Тестирование завершено")
@@ -0,0 +1,55 @@
+"""
+Тестовый скрипт для проверки потокового разбора JSON массива (mcp_json).
+
+Один и тот же документ подается в iter_json_array() частями всех размеров
+(от одного байта до всего документа сразу) — результат должен совпадать
+с json.loads() независимо от того, где проходит граница части.
+"""
+
+import json
+
+from mcp_json import iter_json_array
+
+DOCUMENTS = [
+    '[]',
+    ' [ ] ',
+    '[2.5,1]',
+    '[1e5,2]',
+    '[-0.25, 1E-7, 3e+2, 10, -4]',
+    '[123456789012345678901234567890, 0.000001]',
+    '["строка", "с \\"кавычками\\" и \\\\", "\\u0436", ""]',
+    '[true, false, null]',
+    '[{"id": 1, "tasks": [{"id": 2, "name": "Задача"}], "score": 1.5}, [[], [1, [2.25]]], {}]',
+    '\n[\n  1 ,\n\t"a"  ,\r\n  {"b" : [ 3 , 4.5 ] }\n]\n',
+]
+
+INVALID = ['[1,]', '[1 2]', '{"a": 1}', '[1', '[2.]', '[1e]']
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)] or [b'']
+
+def test_chunk_sizes():
+    """Все документы при любом размере части разбираются как json.loads()."""
+    for document in DOCUMENTS:
+        data = document.encode('utf-8')
+        expected = json.loads(document)
+        for size in range(1, len(data) + 1):
+            result = list(iter_json_array(split(data, size)))
+            assert result == expected, f"{document!r}, часть {size} байт: {result!r}"
+
+def test_invalid():
+    """Некорректные документы отклоняются при любом размере части."""
+    for document in INVALID:
+        data = document.encode('utf-8')
+        for size in range(1, len(data) + 1):
+            try:
+                list(iter_json_array(split(data, size)))
+            except ValueError:
+                continue
+            raise AssertionError(f"{document!r}, часть {size} байт: ошибка не обнаружена")
+
+if __name__ == '__main__':
+    test_chunk_sizes()
+    print(f"[OK] {len(DOCUMENTS)} документов разобраны при всех размерах частей")
+    test_invalid()
+    print(f"[OK] {len(INVALID)} некорректных документов отклонены")